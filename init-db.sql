@@ -1,5 +1,22 @@
 -- Initialize TripC.AI Chatbot Database with PgVector extension
 
+-- Chat history lives in the application database (POSTGRES_DB / DATABASE_URL: tripc_chatbot)
+CREATE TABLE IF NOT EXISTS chat_history (
+    id SERIAL PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    user_message TEXT NOT NULL,
+    bot_response TEXT NOT NULL,
+    intent TEXT,
+    platform TEXT,
+    device TEXT,
+    language TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create index for chat history
+CREATE INDEX IF NOT EXISTS chat_history_session_idx ON chat_history(session_id);
+CREATE INDEX IF NOT EXISTS chat_history_created_idx ON chat_history(created_at);
+
 -- Create vector database
 CREATE DATABASE tripc_vectors;
 
@@ -24,23 +41,6 @@ CREATE INDEX IF NOT EXISTS embedding_vector_idx ON embedding USING ivfflat (embe
 -- Create index for content search
 CREATE INDEX IF NOT EXISTS embedding_content_idx ON embedding USING gin(to_tsvector('english', raw_content));
 
--- Create table for chat history (optional)
-CREATE TABLE IF NOT EXISTS chat_history (
-    id SERIAL PRIMARY KEY,
-    session_id TEXT NOT NULL,
-    user_message TEXT NOT NULL,
-    bot_response TEXT NOT NULL,
-    intent TEXT,
-    platform TEXT,
-    device TEXT,
-    language TEXT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-);
-
--- Create index for chat history
-CREATE INDEX IF NOT EXISTS chat_history_session_idx ON chat_history(session_id);
-CREATE INDEX IF NOT EXISTS chat_history_created_idx ON chat_history(created_at);
-
 -- Create table for user bookings (optional)
 CREATE TABLE IF NOT EXISTS user_bookings (
     id SERIAL PRIMARY KEY,
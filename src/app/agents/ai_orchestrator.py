@@ -4,43 +4,372 @@ AI Agent Orchestrator - LangGraph-based workflow for TripC.AI Chatbot
 Replaces the traditional orchestrator with a visual workflow
 """
 
-from typing import Dict, Any, Optional, TypedDict
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple, Union
+from collections import OrderedDict
+from dataclasses import dataclass
+import asyncio
 import re
+import json
+import os
+import unicodedata
+import orjson
 from langgraph.graph import StateGraph, END
 
 from ..models.platform_models import PlatformContext, PlatformType, DeviceType, LanguageType
-from ..models.schemas import ChatRequest, ChatResponse, QnAResponse, Suggestion
+from ..models.schemas import ChatRequest, ChatResponse, QnAResponse, ServiceResponse, Suggestion
 from ..agents.qna_agent import QnAAgent
 from ..agents.service_agent import ServiceAgent
 from ..agents.booking_agent import BookingAgent
 from ..core.cta_engine import CTAEngine
+from ..core.platform_context import get_platform_context
 from ..core.conversation_memory import ConversationMemory
 from ..core.error_handling import ErrorHandler, ValidationError, AgentError, LLMError
+from ..core.micro_batcher import MicroBatcher
 
 from ..llm.rate_limited_client import RateLimitedLLMClient
 from ..services.email_service import EmailService
 
 
-class WorkflowState(TypedDict):
+# Maximum number of cached intent classifications
+INTENT_CACHE_SIZE = 4096
+
+# Messages without any intent keyword are only sent to the LLM above this word count
+LLM_INTENT_MIN_WORDS = 6
+
+# Messages longer than this are rejected before any LLM call
+MAX_MESSAGE_CHARS = 2000
+
+# Only this many leading characters are used for intent classification
+INTENT_MESSAGE_CHARS = 512
+
+# Concurrent LLM intent classifications are grouped into one call per batch window
+INTENT_BATCH_SIZE = 16
+INTENT_BATCH_WINDOW = 0.010  # seconds
+
+# Service intent keywords - tìm kiếm, khám phá, xem danh sách, nhu cầu sử dụng dịch vụ
+SERVICE_KEYWORDS = (
+    # Từ khóa tìm kiếm
+    "tìm", "search", "find", "khám phá", "explore", "discover",
+    "xem", "show", "danh sách", "list",
+    # Địa điểm cụ thể (chỉ khi tìm kiếm)
+    "nhà hàng", "restaurant", "quán ăn", "food", "dining",
+    "khách sạn", "hotel", "resort", "accommodation",
+    "tour", "sightseeing", "tham quan",
+    # Từ khóa vị trí
+    "ở đâu", "where", "địa chỉ", "address", "gần đây", "nearby",
+    "xung quanh", "around", "khu vực", "area", "đường", "street",
+    # Nhu cầu sử dụng dịch vụ
+    "ăn uống", "ăn", "bữa", "ngủ", "nghỉ ngơi", "thư giãn", "rest", "relax"
+)
+
+# Booking intent keywords - đặt chỗ, giao dịch
+BOOKING_KEYWORDS = (
+    # Từ khóa đặt chỗ
+    "đặt", "book", "reserve", "booking", "reservation",
+    "đặt bàn", "book table", "đặt chỗ", "book seat",
+    "đặt tour", "book tour", "đặt vé", "book ticket",
+    "đặt phòng", "book room", "đặt khách sạn", "book hotel",
+    # Từ khóa giao dịch
+    "thanh toán", "payment", "pay", "mua", "buy", "purchase"
+)
+
+# Price/confirmation words only mean booking while a booking is in progress
+BOOKING_FOLLOWUP_KEYWORDS = (
+    # Từ khóa giá
+    "giá", "price", "cost", "chi phí", "fee", "phí",
+    # Từ khóa xác nhận
+    "xác nhận", "confirm", "đồng ý", "agree", "ok", "okay"
+)
+
+# Booking statuses during which follow-up words continue the booking
+ACTIVE_BOOKING_STATUSES = ("collecting", "ready")
+
+# QnA intent keywords - câu hỏi, tư vấn, thông tin chung
+QNA_KEYWORDS = (
+    # Câu hỏi
+    "là gì", "what is", "tại sao", "why", "như thế nào", "how",
+    "bao giờ", "when", "ai", "who", "cái gì", "what",
+    # Từ khóa tư vấn
+    "tư vấn", "advice", "gợi ý", "suggest", "khuyên", "recommend",
+    "nên", "should", "có nên", "is it good", "có tốt không",
+    # Từ khóa thông tin chung
+    "xin chào", "hello", "hi", "chào", "greeting",
+    "giờ mở cửa", "opening hours", "giờ đóng cửa", "closing time",
+    "chính sách", "policy", "điều kiện", "condition", "quy định", "rule",
+    # Thông tin/đánh giá/vé
+    "đẹp không", "review", "đánh giá", "giá vé", "vé bao nhiêu", "ticket", "ticket price"
+)
+
+# QnA indicators take priority over every other intent (câu hỏi thông tin có priority cao)
+QNA_INDICATORS = (
+    "giới thiệu về", "introduce about", "thông tin về", "info about",
+    "có gì", "what is", "là gì", "what's", "như thế nào", "how is",
+    "bảo tàng", "museum", "di tích", "heritage", "di sản", "heritage site",
+    "đẹp không", "giá vé", "ticket price", "opening hours"
+)
+
+
+def _compile_keywords(keywords) -> "re.Pattern":
+    """Compile keywords into a single whole-word alternation (longest first)
+
+    Keywords longer than two characters also match their plural ("hotels",
+    "restaurants"); two-letter ones ("hi", "ok") stay exact so "his" is no greeting.
+    """
+    alternation = "|".join(
+        re.escape(k) + ("(?:s|es)?" if len(k) > 2 else "")
+        for k in sorted(set(keywords), key=len, reverse=True)
+    )
+    return re.compile(rf"(?<!\w)(?:{alternation})(?!\w)")
+
+
+# Intent classifier system prompts; kept byte-identical across calls for provider prompt caching
+INTENT_SYSTEM_PROMPT_VI = """Bạn là chuyên gia phân tích ý định người dùng với khả năng suy luận sâu.
+
+NHIỆM VỤ: Phân tích câu hỏi của người dùng và xác định ý định chính xác nhất.
+
+3 LOẠI Ý ĐỊNH:
+1. service: Người dùng muốn TÌM/KHÁM PHÁ/ĐỀ XUẤT dịch vụ để sử dụng
+   - Tìm nhà hàng, khách sạn, tour, địa điểm
+   - Khám phá ẩm thực, văn hóa, điểm đến
+   - Đề xuất nơi ăn, nơi nghỉ, nơi tham quan
+
+2. booking: Người dùng có Ý ĐỊNH ĐẶT CHỖ/GIAO DỊCH
+   - Đặt bàn, đặt phòng, đặt tour
+   - Xác nhận giữ chỗ, thanh toán
+   - Yêu cầu liên hệ để đặt
+
+3. qna: Người dùng HỎI THÔNG TIN/TƯ VẤN
+   - Thông tin mô tả, đánh giá, so sánh
+   - Giá vé, giờ mở cửa, chính sách
+   - Tư vấn, gợi ý, khuyên bảo
+
+QUY TẮC SUY LUẬN:
+- Phân tích ngữ cảnh cuộc hội thoại gần đây
+- Xem xét trạng thái booking hiện tại
+- Hiểu ý định ẩn trong câu hỏi
+- Nếu chưa chắc chắn, hỏi lại để làm rõ
+
+TRẢ VỀ JSON:
+{
+  "intent": "service|booking|qna",
+  "confidence": "high|medium|low",
+  "reasoning": "lý do chi tiết",
+  "clarification_question": "câu hỏi làm rõ (nếu confidence=low)"
+}"""
+
+INTENT_SYSTEM_PROMPT_EN = """You are an expert user intent analyzer with deep reasoning capabilities.
+
+TASK: Analyze the user's question and determine the most accurate intent.
+
+3 INTENT TYPES:
+1. service: User wants to FIND/EXPLORE/RECOMMEND services to use
+   - Find restaurants, hotels, tours, destinations
+   - Explore cuisine, culture, attractions
+   - Suggest places to eat, stay, visit
+
+2. booking: User INTENDS to BOOK/MAKE TRANSACTION
+   - Book table, room, tour
+   - Confirm reservation, payment
+   - Request contact for booking
+
+3. qna: User ASKS for INFORMATION/ADVICE
+   - Description, reviews, comparisons
+   - Ticket prices, opening hours, policies
+   - Advice, suggestions, recommendations
+
+REASONING RULES:
+- Analyze recent conversation context
+- Consider current booking state
+- Understand hidden intent in questions
+- If uncertain, ask for clarification
+
+RETURN JSON:
+{
+  "intent": "service|booking|qna",
+  "confidence": "high|medium|low",
+  "reasoning": "detailed reasoning",
+  "clarification_question": "clarification question (if confidence=low)"
+}"""
+
+# Appended to the system prompt when several messages are classified in one call
+INTENT_BATCH_INSTRUCTIONS_VI = """
+
+CHẾ ĐỘ NHIỀU CÂU HỎI: Bạn sẽ nhận được nhiều mục được đánh số, mỗi mục có ngữ cảnh riêng.
+Phân tích từng mục độc lập và trả về MỘT mảng JSON gồm các đối tượng như trên, đúng thứ tự các mục."""
+
+INTENT_BATCH_INSTRUCTIONS_EN = """
+
+BATCH MODE: You will receive several numbered items, each with its own context.
+Analyze each item independently and return ONE JSON array of the objects above, in item order."""
+
+# Standalone-query rewrite system prompts (pronoun resolution)
+REWRITE_SYSTEM_PROMPT_VI = (
+    "Bạn là trợ lý suy luận ngữ cảnh. NHIỆM VỤ: nếu câu của người dùng dùng đại từ mơ hồ "
+    "(ví dụ: 'ở đó', 'cái đó', 'nó', 'đó') thì hãy QUYẾT ĐỊNH:\n"
+    "- Nếu xác định được chủ thể từ ngữ cảnh, trả về JSON: {\"action\":\"rewrite\", \"rewritten\": \"...\"}\n"
+    "- Nếu KHÔNG chắc chắn, trả về JSON: {\"action\":\"clarify\", \"question\": \"Câu hỏi làm rõ ngắn gọn\"}\n"
+    "KHÔNG trả lời tự do, CHỈ JSON."
+)
+
+REWRITE_SYSTEM_PROMPT_EN = (
+    "You are a context reasoner. If the user message uses ambiguous pronouns "
+    "(e.g., 'there', 'it', 'that'), DECIDE:\n"
+    "- If you can infer the subject from context, return JSON: {\"action\":\"rewrite\", \"rewritten\": \"...\"}\n"
+    "- If NOT confident, return JSON: {\"action\":\"clarify\", \"question\": \"Short clarification question\"}\n"
+    "Return JSON ONLY."
+)
+
+# Language enrichment system prompts
+ENRICH_SYSTEM_PROMPT_VI = """Bạn là chuyên gia làm giàu ngôn ngữ tự nhiên. NHIỆM VỤ: Làm giàu câu trả lời để tự nhiên hơn, thân thiện hơn nhưng KHÔNG thay đổi ý nghĩa cốt lõi.
+
+QUY TẮC:
+1. GIỮ NGUYÊN ý nghĩa chính và thông tin quan trọng
+2. Thêm từ ngữ tự nhiên, thân thiện, ấm áp
+3. Sử dụng ngôn ngữ giao tiếp tự nhiên
+4. KHÔNG thêm thông tin mới không có trong câu gốc
+5. KHÔNG thay đổi cấu trúc logic
+
+VÍ DỤ:
+- Gốc: "Tìm thấy 5 nhà hàng"
+- Làm giàu: "Tôi đã tìm thấy 5 nhà hàng tuyệt vời cho bạn"
+- Gốc: "Đặt bàn thành công"
+- Làm giàu: "Tuyệt vời! Việc đặt bàn của bạn đã được xác nhận thành công"
+
+Chỉ trả về câu trả lời đã làm giàu, không có giải thích."""
+
+ENRICH_SYSTEM_PROMPT_EN = """You are a natural language enrichment expert. TASK: Enrich the response to make it more natural, friendly, and warm while NOT changing the core meaning.
+
+RULES:
+1. KEEP the main meaning and important information intact
+2. Add natural, friendly, warm language
+3. Use conversational, natural language
+4. DO NOT add new information not in the original
+5. DO NOT change the logical structure
+
+EXAMPLES:
+- Original: "Found 5 restaurants"
+- Enriched: "I found 5 wonderful restaurants for you"
+- Original: "Booking successful"
+- Enriched: "Great! Your booking has been successfully confirmed"
+
+Return only the enriched response, no explanations."""
+
+# Static clarification response templates, keyed by language value
+_DEFAULT_CLARIFY_QUESTIONS = {
+    "vi": "Bạn đang nói đến địa điểm hay nội dung nào ạ?",
+    "en": "Which place or topic do you mean?",
+}
+_CLARIFY_SUGGESTIONS = {
+    language: tuple(
+        Suggestion(label=label, action=action)
+        for label, action in suggestions
+    )
+    for language, suggestions in {
+        "vi": (("Mô tả rõ", "clarify_subject"), ("Tìm nhà hàng", "search_services"), ("Đặt bàn", "start_booking")),
+        "en": (("Specify", "clarify_subject"), ("Find restaurants", "search_services"), ("Book table", "start_booking")),
+    }.items()
+}
+
+# Canned responses for messages rejected before the workflow runs, keyed by language value
+_EMPTY_MESSAGE_RESPONSES = {
+    "vi": ChatResponse(
+        type="QnA",
+        answerAI="Bạn muốn tìm hiểu hoặc đặt dịch vụ gì ạ?",
+        sources=[],
+        suggestions=list(_CLARIFY_SUGGESTIONS["vi"])
+    ),
+    "en": ChatResponse(
+        type="QnA",
+        answerAI="What would you like to know or book?",
+        sources=[],
+        suggestions=list(_CLARIFY_SUGGESTIONS["en"])
+    ),
+}
+
+_TOO_LONG_MESSAGE_RESPONSES = {
+    "vi": ChatResponse(
+        type="Error",
+        answerAI=f"Tin nhắn quá dài (tối đa {MAX_MESSAGE_CHARS} ký tự). Vui lòng rút gọn câu hỏi.",
+        sources=[],
+        suggestions=[Suggestion(label="Thử lại", action="retry")]
+    ),
+    "en": ChatResponse(
+        type="Error",
+        answerAI=f"Your message is too long (maximum {MAX_MESSAGE_CHARS} characters). Please shorten it.",
+        sources=[],
+        suggestions=[Suggestion(label="Try again", action="retry")]
+    ),
+}
+
+# Intent keyword patterns in priority order
+_INTENT_KEYWORD_PATTERNS = (
+    ("qna", _compile_keywords(QNA_INDICATORS)),
+    ("booking", _compile_keywords(BOOKING_KEYWORDS)),
+    ("service", _compile_keywords(SERVICE_KEYWORDS)),
+    ("qna", _compile_keywords(QNA_KEYWORDS)),
+)
+
+_BOOKING_FOLLOWUP_PATTERN = _compile_keywords(BOOKING_FOLLOWUP_KEYWORDS)
+
+
+# Direct value -> member lookups for request validation
+_PLATFORM_MAP = {member.value: member for member in PlatformType}
+_DEVICE_MAP = {member.value: member for member in DeviceType}
+_LANGUAGE_MAP = {member.value: member for member in LanguageType}
+
+# Platform/device combinations that are rejected
+_INCOMPATIBLE_PLATFORM_DEVICES = frozenset({(PlatformType.MOBILE_APP, DeviceType.DESKTOP)})
+
+
+def _lookup_enum(mapping: Dict[str, Any], value: Any, enum_name: str):
+    """Resolve an enum member from its value, mirroring the enum constructor error"""
+    member = mapping.get(value)
+    if member is None:
+        raise ValueError(f"{value!r} is not a valid {enum_name}")
+    return member
+
+
+def _stream_event(event: str, **data: Any) -> bytes:
+    """Serialize one NDJSON streaming event"""
+    return orjson.dumps({"event": event, **data}) + b"\n"
+
+
+def _dump_json(response: ChatResponse) -> bytes:
+    """Serialize a response straight to JSON bytes with pydantic-core (no intermediate dict)"""
+    return response.__pydantic_serializer__.to_json(response)
+
+
+def _normalize_message(message: str) -> str:
+    """Normalize a user message for keyword matching and cache lookups"""
+    return unicodedata.normalize("NFKC", message).strip().casefold()
+
+
+@dataclass(slots=True)
+class WorkflowState:
     """State for the LangGraph workflow"""
     # Input
     message: str
     platform: str
     device: str
     language: str
-    conversationId: Optional[str]
+    conversationId: Optional[str] = None
     
     # Processing
-    platform_context: Optional[PlatformContext]
-    intent: Optional[str]
-    response: Optional[Dict[str, Any]]
+    normalized_message: Optional[str] = None
+    platform_context: Optional[PlatformContext] = None
+    intent: Optional[str] = None
+    response: Optional[Union[QnAResponse, ServiceResponse]] = None
+    
+    # Clarification requested by intent classification or query rewriting
+    needs_clarification: bool = False
+    clarify_question: Optional[str] = None
     
     # Language enrichment
-    language_enriched: Optional[bool]
+    language_enriched: bool = False
     
     # Output
-    final_response: Optional[ChatResponse]
-    error: Optional[str]
+    final_response: Optional[ChatResponse] = None
+    error: Optional[str] = None
 
 
 class AIAgentOrchestrator:
@@ -53,16 +382,48 @@ class AIAgentOrchestrator:
         # Create rate-limited LLM client if not provided
         if llm_client is None:
             from ..llm.open_client import OpenAIClient
-            base_llm_client = OpenAIClient()
+            base_llm_client = OpenAIClient.get_default()
             self.llm_client = RateLimitedLLMClient(base_llm_client)
         else:
             self.llm_client = llm_client
             
         self.cta_engine = CTAEngine()
         self.memory = ConversationMemory()
+        # LRU cache of confident intent classifications keyed by (message, language, context)
+        self._intent_cache: "OrderedDict[Tuple[str, str, str], dict]" = OrderedDict()
+        # Concurrent LLM intent classifications share one call per language and batch window
+        self._intent_batcher = MicroBatcher(
+            self._classify_intent_batch, INTENT_BATCH_SIZE, INTENT_BATCH_WINDOW, group_key=lambda item: item[2]
+        )
         self.booking_agent = BookingAgent(self.memory, email_service, self.llm_client, service_agent)
 
         self.workflow = self._build_workflow()
+        
+        # Optional boot-time warmup so the first request does not pay first-use costs
+        if os.getenv("WARMUP") == "1":
+            self.warmup()
+    
+    async def aclose(self) -> None:
+        """Stop the background intent batch worker"""
+        await self._intent_batcher.aclose()
+    
+    def warmup(self) -> None:
+        """Exercise the per-request hot paths once with representative inputs"""
+        for message, language in (("Tìm nhà hàng hải sản ở Đà Nẵng", "vi"), ("Find a hotel near the beach", "en")):
+            state = self._validate_platform(WorkflowState(
+                message=message,
+                platform=PlatformType.WEB_BROWSER.value,
+                device=DeviceType.DESKTOP.value,
+                language=language
+            ))
+            self._match_intent_keywords(state.normalized_message)
+            response = QnAResponse(type="QnA", answerAI=message, sources=[], suggestions=[])
+            response.cta = self.cta_engine.generate_platform_cta_dict(
+                platform=state.platform_context.platform,
+                device=state.platform_context.device
+            )
+            _dump_json(ChatResponse(type="QnA", answerAI=message, sources=[], suggestions=[], cta=response.cta))
+        print("🔥 [WARMUP] Orchestrator hot paths warmed up")
     
     def _build_workflow(self) -> StateGraph:
         """Build the LangGraph workflow"""
@@ -71,8 +432,7 @@ class AIAgentOrchestrator:
         workflow = StateGraph(WorkflowState)
         
         # Add nodes
-        workflow.add_node("validate_platform", self._validate_platform)
-        workflow.add_node("classify_intent", self._classify_intent)
+        workflow.add_node("validate_and_classify", self._validate_and_classify)
         workflow.add_node("rewrite_to_standalone", self._rewrite_to_standalone)
         workflow.add_node("route_to_agent", self._route_to_agent)
         workflow.add_node("add_cta", self._add_cta)
@@ -80,25 +440,13 @@ class AIAgentOrchestrator:
         workflow.add_node("format_response", self._format_response)
         
         # Add edges
-        workflow.set_entry_point("validate_platform")
-        workflow.add_edge("validate_platform", "classify_intent")
-        workflow.add_edge("classify_intent", "rewrite_to_standalone")
-        workflow.add_edge("rewrite_to_standalone", "route_to_agent")
+        workflow.set_entry_point("validate_and_classify")
+        workflow.add_edge("validate_and_classify", "rewrite_to_standalone")
         workflow.add_edge("route_to_agent", "add_cta")
         workflow.add_edge("add_cta", "enrich_language")
         workflow.add_edge("enrich_language", "format_response")
         workflow.add_edge("format_response", END)
         
-        # Add conditional edges for error handling
-        workflow.add_conditional_edges(
-            "validate_platform",
-            self._should_continue,
-            {
-                "continue": "classify_intent",
-                "error": END
-            }
-        )
-        
         # Add conditional edges for rewrite_to_standalone clarification handling
         workflow.add_conditional_edges(
             "rewrite_to_standalone",
@@ -111,25 +459,20 @@ class AIAgentOrchestrator:
         
         return workflow.compile()
     
-    async def _validate_platform(self, state: WorkflowState) -> WorkflowState:
+    def _validate_platform(self, state: WorkflowState) -> WorkflowState:
         """Validate platform-device compatibility"""
         try:
-            platform = PlatformType(state["platform"])
-            device = DeviceType(state["device"])
-            language = LanguageType(state["language"])
+            platform = _lookup_enum(_PLATFORM_MAP, state.platform, "PlatformType")
+            device = _lookup_enum(_DEVICE_MAP, state.device, "DeviceType")
+            language = _lookup_enum(_LANGUAGE_MAP, state.language, "LanguageType")
             
             # Validate platform-device compatibility
-            if platform == PlatformType.MOBILE_APP and device == DeviceType.DESKTOP:
+            if (platform, device) in _INCOMPATIBLE_PLATFORM_DEVICES:
                 raise ValidationError("Mobile app platform cannot be used with desktop device")
             
-            # Create platform context
-            platform_context = PlatformContext(
-                platform=platform,
-                device=device,
-                language=language
-            )
-            
-            state["platform_context"] = platform_context
+            # Shared (interned) platform context for this combination
+            state.platform_context = get_platform_context(platform, device, language)
+            state.normalized_message = _normalize_message(state.message[:INTENT_MESSAGE_CHARS])
             return state
             
         except ValidationError:
@@ -137,24 +480,23 @@ class AIAgentOrchestrator:
         except Exception as e:
             raise ValidationError(f"Platform validation error: {str(e)}")
     
-    def _should_continue(self, state: WorkflowState) -> str:
-        """Determine if workflow should continue or end with error"""
-        if state.get("error"):
-            return "error"
-        return "continue"
-    
     def _should_continue_after_rewrite(self, state: WorkflowState) -> str:
         """Determine if workflow should continue to routing or skip to CTA for clarification"""
-        if state.get("needs_clarification"):
+        if state.needs_clarification:
             return "clarify"
         return "continue"
     
+    async def _validate_and_classify(self, state: WorkflowState) -> WorkflowState:
+        """Validate the platform context and classify intent in a single graph node"""
+        state = self._validate_platform(state)
+        return await self._classify_intent(state)
+    
     async def _classify_intent(self, state: WorkflowState) -> WorkflowState:
         """Classify user intent using LLM for intelligent classification with deep reasoning"""
         try:
-            message = state["message"]
-            language = state.get("language", "vi")
-            conversation_id = state.get("conversationId") or "default"
+            message = state.message
+            language = state.language
+            conversation_id = state.conversationId or "default"
             
             # Extract user identifier from conversation_id if available
             user_identifier = None
@@ -174,39 +516,52 @@ class AIAgentOrchestrator:
             print(f"🤔 [INTENT ANALYSIS] Analyzing message: '{message}'")
             print(f"📚 [CONTEXT] Recent turns: {len(recent_turns)}, Entities: {list(entities.keys()) if entities else 'None'}")
             
+            # Keyword patterns resolve most messages without an LLM round-trip
+            normalized_message = state.normalized_message or _normalize_message(message)
+            booking_state = context_info.get("booking_state") or {}
+            booking_active = booking_state.get("status") in ACTIVE_BOOKING_STATUSES
+            keyword_intent = self._match_intent_keywords(normalized_message, booking_active)
+            # Price/confirmation words outside a booking are ambiguous: leave them to the LLM
+            ambiguous_followup = not booking_active and _BOOKING_FOLLOWUP_PATTERN.search(normalized_message)
+            if keyword_intent:
+                state.intent = keyword_intent
+                print(f"⚡ [INTENT] Keyword match: {keyword_intent}")
+            elif len(message.split()) <= LLM_INTENT_MIN_WORDS and not ambiguous_followup:
+                state.intent = "qna"
+                print(f"🔍 [INTENT] Short message without keywords, defaulting to qna")
             # Enhanced LLM-based intent classification with deep reasoning
-            if self.llm_client and self.llm_client.is_configured():
+            elif self.llm_client and self.llm_client.is_configured():
                 try:
                     intent_result = await self._llm_deep_intent_classification(
-                        message, context_info, language
+                        message[:INTENT_MESSAGE_CHARS], context_info, language, normalized_message
                     )
                     
                     if intent_result.get("confidence") == "high":
-                        state["intent"] = intent_result["intent"]
+                        state.intent = intent_result["intent"]
                         print(f"✅ [INTENT] High confidence: {intent_result['intent']} - {intent_result['reasoning']}")
                     elif intent_result.get("confidence") == "medium":
-                        state["intent"] = intent_result["intent"]
+                        state.intent = intent_result["intent"]
                         print(f"⚠️ [INTENT] Medium confidence: {intent_result['intent']} - {intent_result['reasoning']}")
                     else:
                         # Low confidence - ask for clarification
-                        state["needs_clarification"] = True
-                        state["clarify_question"] = intent_result.get("clarification_question", "")
-                        state["intent"] = "qna"  # Default to qna while clarifying
+                        state.needs_clarification = True
+                        state.clarify_question = intent_result.get("clarification_question", "")
+                        state.intent = "qna"  # Default to qna while clarifying
                         print(f"❓ [INTENT] Low confidence - asking: {intent_result.get('clarification_question', '')}")
                         
                 except Exception as e:
                     print(f"❌ [INTENT] LLM classification failed: {e}, falling back to keywords")
-                    state["intent"] = self._fallback_keyword_classification(message)
+                    state.intent = self._fallback_keyword_classification(normalized_message, booking_active)
             else:
                 # Fallback to keyword-based classification if no LLM client
-                state["intent"] = self._fallback_keyword_classification(message)
-                print(f"🔍 [INTENT] Using keyword fallback: {state['intent']}")
+                state.intent = self._fallback_keyword_classification(normalized_message, booking_active)
+                print(f"🔍 [INTENT] Using keyword fallback: {state.intent}")
             
             return state
             
         except Exception as e:
             print(f"❌ [INTENT] Intent classification error: {e}")
-            state["intent"] = "qna"
+            state.intent = "qna"
             return state
 
     def _build_context_for_intent(self, recent_turns: list, entities: dict, language: str) -> dict:
@@ -264,126 +619,130 @@ class AIAgentOrchestrator:
         
         return context
 
-    async def _llm_deep_intent_classification(self, message: str, context: dict, language: str) -> dict:
-        """Deep intent classification using LLM with context and reasoning"""
-        
+    def _build_intent_user_prompt(self, message: str, context_text: str, language: str) -> str:
+        """Build the per-message part of the intent classification prompt"""
         if language == "vi":
-            system_prompt = """Bạn là chuyên gia phân tích ý định người dùng với khả năng suy luận sâu.
-
-NHIỆM VỤ: Phân tích câu hỏi của người dùng và xác định ý định chính xác nhất.
-
-3 LOẠI Ý ĐỊNH:
-1. service: Người dùng muốn TÌM/KHÁM PHÁ/ĐỀ XUẤT dịch vụ để sử dụng
-   - Tìm nhà hàng, khách sạn, tour, địa điểm
-   - Khám phá ẩm thực, văn hóa, điểm đến
-   - Đề xuất nơi ăn, nơi nghỉ, nơi tham quan
-
-2. booking: Người dùng có Ý ĐỊNH ĐẶT CHỖ/GIAO DỊCH
-   - Đặt bàn, đặt phòng, đặt tour
-   - Xác nhận giữ chỗ, thanh toán
-   - Yêu cầu liên hệ để đặt
-
-3. qna: Người dùng HỎI THÔNG TIN/TƯ VẤN
-   - Thông tin mô tả, đánh giá, so sánh
-   - Giá vé, giờ mở cửa, chính sách
-   - Tư vấn, gợi ý, khuyên bảo
-
-QUY TẮC SUY LUẬN:
-- Phân tích ngữ cảnh cuộc hội thoại gần đây
-- Xem xét trạng thái booking hiện tại
-- Hiểu ý định ẩn trong câu hỏi
-- Nếu chưa chắc chắn, hỏi lại để làm rõ
-
-TRẢ VỀ JSON:
-{
-  "intent": "service|booking|qna",
-  "confidence": "high|medium|low",
-  "reasoning": "lý do chi tiết",
-  "clarification_question": "câu hỏi làm rõ (nếu confidence=low)"
-}"""
-            
-            user_prompt = f"""NGỮ CẢNH HỘI THOẠI:
-{self._format_context_for_prompt(context, language)}
+            return f"""NGỮ CẢNH HỘI THOẠI:
+{context_text}
 
 CÂU HỎI HIỆN TẠI: "{message}"
 
 Hãy phân tích và trả về JSON."""
             
-        else:
-            system_prompt = """You are an expert user intent analyzer with deep reasoning capabilities.
-
-TASK: Analyze the user's question and determine the most accurate intent.
-
-3 INTENT TYPES:
-1. service: User wants to FIND/EXPLORE/RECOMMEND services to use
-   - Find restaurants, hotels, tours, destinations
-   - Explore cuisine, culture, attractions
-   - Suggest places to eat, stay, visit
-
-2. booking: User INTENDS to BOOK/MAKE TRANSACTION
-   - Book table, room, tour
-   - Confirm reservation, payment
-   - Request contact for booking
-
-3. qna: User ASKS for INFORMATION/ADVICE
-   - Description, reviews, comparisons
-   - Ticket prices, opening hours, policies
-   - Advice, suggestions, recommendations
-
-REASONING RULES:
-- Analyze recent conversation context
-- Consider current booking state
-- Understand hidden intent in questions
-- If uncertain, ask for clarification
-
-RETURN JSON:
-{
-  "intent": "service|booking|qna",
-  "confidence": "high|medium|low",
-  "reasoning": "detailed reasoning",
-  "clarification_question": "clarification question (if confidence=low)"
-}"""
-            
-            user_prompt = f"""CONVERSATION CONTEXT:
-{self._format_context_for_prompt(context, language)}
+        return f"""CONVERSATION CONTEXT:
+{context_text}
 
 CURRENT QUESTION: "{message}"
 
 Please analyze and return JSON."""
+    
+    def _parse_intent_result(self, data: Any) -> Optional[dict]:
+        """Validate one classification object returned by the LLM"""
+        if not isinstance(data, dict):
+            return None
+        
+        # Validate intent
+        intent = str(data.get("intent", "")).lower()
+        if intent not in ["service", "booking", "qna"]:
+            intent = "qna"  # Default fallback
+        
+        return {
+            "intent": intent,
+            "confidence": str(data.get("confidence", "low")).lower(),
+            "reasoning": data.get("reasoning", ""),
+            "clarification_question": data.get("clarification_question", "")
+        }
+    
+    async def _submit_for_classification(self, message: str, context_text: str, language: str) -> Optional[dict]:
+        """Queue a message for batched LLM intent classification and wait for its result"""
+        return await self._intent_batcher.submit((message, context_text, language))
+    
+    async def _classify_intent_batch(self, items: List[Tuple[str, str, str]]) -> List[Any]:
+        """Classify a same-language batch with one LLM call; one result (or exception) per item"""
+        if len(items) == 1:
+            return [await self._llm_classify_single(*items[0])]
+        
+        results = await self._llm_classify_many(items)
+        if results is None:
+            # Batch answer unusable: classify the items one by one instead
+            print(f"⚠️ [INTENT] Batch of {len(items)} could not be parsed, classifying individually")
+            results = await asyncio.gather(*(self._llm_classify_single(*item) for item in items), return_exceptions=True)
+        return results
+    
+    async def _llm_classify_single(self, message: str, context_text: str, language: str) -> Optional[dict]:
+        """Classify one message with the LLM; None when the answer has no usable JSON"""
+        llm_response = await self.llm_client.generate_response(
+            prompt=self._build_intent_user_prompt(message, context_text, language),
+            system_prompt=INTENT_SYSTEM_PROMPT_VI if language == "vi" else INTENT_SYSTEM_PROMPT_EN,
+            max_tokens=300,
+            temperature=0.1,
+            # Case/spacing variants of a message classify the same way
+            normalize_cache_key=True
+        )
+        
+        if llm_response:
+            # Extract JSON from response
+            json_match = re.search(r'\{.*\}', llm_response, re.DOTALL)
+            if json_match:
+                try:
+                    return self._parse_intent_result(json.loads(json_match.group(0)))
+                except ValueError as e:
+                    print(f"⚠️ [INTENT] Unparseable classification JSON: {e}")
+        return None
+    
+    async def _llm_classify_many(self, items: List[Tuple[str, str, str]]) -> Optional[List[Optional[dict]]]:
+        """Classify several same-language messages with one LLM call; None if the answer is unusable"""
+        language = items[0][2]
+        if language == "vi":
+            system_prompt = INTENT_SYSTEM_PROMPT_VI + INTENT_BATCH_INSTRUCTIONS_VI
+        else:
+            system_prompt = INTENT_SYSTEM_PROMPT_EN + INTENT_BATCH_INSTRUCTIONS_EN
         
-        combined_prompt = f"System: {system_prompt}\n\nUser: {user_prompt}"
+        user_prompt = "\n\n".join(
+            f"### {index}\n{self._build_intent_user_prompt(message, context_text, language)}"
+            for index, (message, context_text, _) in enumerate(items, 1)
+        )
+        
+        llm_response = await self.llm_client.generate_response(
+            prompt=user_prompt,
+            system_prompt=system_prompt,
+            max_tokens=150 * len(items) + 150,
+            temperature=0.1,
+            normalize_cache_key=True
+        )
+        
+        if llm_response:
+            json_match = re.search(r'\[.*\]', llm_response, re.DOTALL)
+            if json_match:
+                try:
+                    data = json.loads(json_match.group(0))
+                except ValueError:
+                    return None
+                if isinstance(data, list) and len(data) == len(items):
+                    return [self._parse_intent_result(entry) for entry in data]
+        return None
+    
+    async def _llm_deep_intent_classification(self, message: str, context: dict, language: str, normalized_message: Optional[str] = None) -> dict:
+        """Deep intent classification using LLM with context and reasoning"""
+        context_text = self._format_context_for_prompt(context, language)
+        cache_key = (normalized_message or _normalize_message(message), language, context_text)
+        cached = self._intent_cache.get(cache_key)
+        if cached is not None:
+            self._intent_cache.move_to_end(cache_key)
+            print(f"⚡ [INTENT] Cache hit: {cached['intent']}")
+            return dict(cached)
         
         try:
-            llm_response = self.llm_client.generate_response_sync(
-                prompt=combined_prompt,
-                max_tokens=300,
-                temperature=0.1
-            )
+            result = await self._submit_for_classification(message, context_text, language)
             
-            if llm_response:
-                import json
-                import re
+            if result:
+                # Only cache confident classifications; low confidence triggers clarification
+                if result["confidence"] in ("high", "medium"):
+                    self._intent_cache[cache_key] = dict(result)
+                    if len(self._intent_cache) > INTENT_CACHE_SIZE:
+                        self._intent_cache.popitem(last=False)
                 
-                # Extract JSON from response
-                json_match = re.search(r'\{.*\}', llm_response, re.DOTALL)
-                if json_match:
-                    data = json.loads(json_match.group(0))
-                    
-                    # Validate intent
-                    intent = data.get("intent", "").lower()
-                    if intent not in ["service", "booking", "qna"]:
-                        intent = "qna"  # Default fallback
-                    
-                    confidence = data.get("confidence", "low").lower()
-                    reasoning = data.get("reasoning", "")
-                    clarification_question = data.get("clarification_question", "")
-                    
-                    return {
-                        "intent": intent,
-                        "confidence": confidence,
-                        "reasoning": reasoning,
-                        "clarification_question": clarification_question
-                    }
+                return result
             
             # Fallback if JSON parsing fails
             return {
@@ -470,7 +829,7 @@ Please analyze and return JSON."""
         
         return "\n".join(formatted)
 
-    def _user_wants_to_continue_booking(self, message: str, original_intent: str) -> bool:
+    async def _user_wants_to_continue_booking(self, message: str, original_intent: str) -> bool:
         """Check if user wants to continue booking or do something else"""
         message_lower = message.lower().strip()
         
@@ -530,12 +889,12 @@ Please analyze and return JSON."""
             return False  # User wants to do something else
         elif has_booking_keywords and has_other_keywords:
             # Mixed signals - use LLM to decide
-            return self._llm_decide_booking_continuation(message)
+            return await self._llm_decide_booking_continuation(message)
         else:
             # No clear keywords - default to continue booking if in booking flow
             return True
     
-    def _llm_decide_booking_continuation(self, message: str) -> bool:
+    async def _llm_decide_booking_continuation(self, message: str) -> bool:
         """Use LLM to decide if user wants to continue booking when signals are mixed"""
         try:
             if not self.llm_client or not self.llm_client.is_configured():
@@ -553,7 +912,7 @@ Trả về JSON:
 
 Chỉ trả về JSON, không có text khác."""
             
-            response = self.llm_client.generate_response_sync(prompt, max_tokens=100, temperature=0.1)
+            response = await self.llm_client.generate_response(prompt, max_tokens=100, temperature=0.1)
             
             if response:
                 import json
@@ -573,11 +932,11 @@ Chỉ trả về JSON, không có text khác."""
     async def _rewrite_to_standalone(self, state: WorkflowState) -> WorkflowState:
         """Rewrite current message to a standalone question using recent context"""
         try:
-            conversation_id = state.get("conversationId") or "default"
+            conversation_id = state.conversationId or "default"
             recent_turns = self.memory.get_recent(conversation_id, k=4)
             entities = self.memory.get_entities(conversation_id)
-            message = state["message"]
-            language = state.get("language", "vi")
+            message = state.message
+            language = state.language
 
             # Heuristic pronoun resolution
             def heuristic_fill(msg: str) -> Optional[str]:
@@ -622,13 +981,6 @@ Chỉ trả về JSON, không có text khác."""
                     "last_subject": entities.get("last_subject"),
                 }
                 if language == "vi":
-                    system = (
-                        "Bạn là trợ lý suy luận ngữ cảnh. NHIỆM VỤ: nếu câu của người dùng dùng đại từ mơ hồ "
-                        "(ví dụ: 'ở đó', 'cái đó', 'nó', 'đó') thì hãy QUYẾT ĐỊNH:\n"
-                        "- Nếu xác định được chủ thể từ ngữ cảnh, trả về JSON: {\"action\":\"rewrite\", \"rewritten\": \"...\"}\n"
-                        "- Nếu KHÔNG chắc chắn, trả về JSON: {\"action\":\"clarify\", \"question\": \"Câu hỏi làm rõ ngắn gọn\"}\n"
-                        "KHÔNG trả lời tự do, CHỈ JSON."
-                    )
                     user = (
                         f"Ngữ cảnh:\n{history_text}\n\n"
                         f"Chủ thể gợi ý: {subjects}\n\n"
@@ -636,21 +988,14 @@ Chỉ trả về JSON, không có text khác."""
                         "Trả về JSON."
                     )
                 else:
-                    system = (
-                        "You are a context reasoner. If the user message uses ambiguous pronouns "
-                        "(e.g., 'there', 'it', 'that'), DECIDE:\n"
-                        "- If you can infer the subject from context, return JSON: {\"action\":\"rewrite\", \"rewritten\": \"...\"}\n"
-                        "- If NOT confident, return JSON: {\"action\":\"clarify\", \"question\": \"Short clarification question\"}\n"
-                        "Return JSON ONLY."
-                    )
                     user = (
                         f"Context:\n{history_text}\n\n"
                         f"Subject hints: {subjects}\n\n"
                         f"User message: {message}\n"
                         "Return JSON."
                     )
-                prompt = f"System: {system}\n\nUser: {user}"
-                out = self.llm_client.generate_response_sync(prompt, max_tokens=160, temperature=0.1)
+                system = REWRITE_SYSTEM_PROMPT_VI if language == "vi" else REWRITE_SYSTEM_PROMPT_EN
+                out = await self.llm_client.generate_response(user, system_prompt=system, max_tokens=160, temperature=0.1)
                 if out:
                     try:
                         import json, re
@@ -662,12 +1007,12 @@ Chỉ trả về JSON, không có text khác."""
                                 rewritten = str(data["rewritten"]).strip()
                             elif action == "clarify" and data.get("question"):
                                 # Ask clarification in next node
-                                state["needs_clarification"] = True
-                                state["clarify_question"] = str(data["question"]).strip()
+                                state.needs_clarification = True
+                                state.clarify_question = str(data["question"]).strip()
                     except Exception:
                         pass
 
-            state["message"] = rewritten or message
+            state.message = rewritten or message
             # Persist resolved subject for next turns if we changed the message
             if rewritten and rewritten != message:
                 try:
@@ -684,87 +1029,28 @@ Chỉ trả về JSON, không có text khác."""
             print(f"❌ Rewrite error: {e}")
             return state
     
-    def _fallback_keyword_classification(self, message: str) -> str:
+    def _match_intent_keywords(self, normalized_message: str, booking_active: bool = False) -> Optional[str]:
+        """Match a normalized message against the precompiled intent keyword patterns"""
+        for intent, pattern in _INTENT_KEYWORD_PATTERNS:
+            if pattern.search(normalized_message):
+                return intent
+            # Price/confirmation words rank with booking keywords while a booking is in progress
+            if intent == "booking" and booking_active and _BOOKING_FOLLOWUP_PATTERN.search(normalized_message):
+                return "booking"
+        return None
+    
+    def _fallback_keyword_classification(self, normalized_message: str, booking_active: bool = False) -> str:
         """Fallback keyword-based intent classification when LLM is unavailable"""
-        message_lower = message.lower()
-        
-        # Service intent keywords - tìm kiếm, khám phá, xem danh sách, nhu cầu sử dụng dịch vụ
-        service_keywords = [
-            # Từ khóa tìm kiếm
-            "tìm", "search", "find", "khám phá", "explore", "discover",
-            "xem", "show", "danh sách", "list", 
-            # Địa điểm cụ thể (chỉ khi tìm kiếm)
-            "nhà hàng", "restaurant", "quán ăn", "food", "dining",
-            "khách sạn", "hotel", "resort", "accommodation",
-            "tour", "sightseeing", "tham quan",
-            # Từ khóa vị trí
-            "ở đâu", "where", "địa chỉ", "address", "gần đây", "nearby",
-            "xung quanh", "around", "khu vực", "area", "đường", "street",
-            # Nhu cầu sử dụng dịch vụ
-            "ăn uống", "ăn", "bữa", "ngủ", "nghỉ ngơi", "thư giãn", "rest", "relax"
-        ]
-        
-        # Booking intent keywords - đặt chỗ, giao dịch
-        booking_keywords = [
-            # Từ khóa đặt chỗ
-            "đặt", "book", "reserve", "booking", "reservation",
-            "đặt bàn", "book table", "đặt chỗ", "book seat",
-            "đặt tour", "book tour", "đặt vé", "book ticket",
-            "đặt phòng", "book room", "đặt khách sạn", "book hotel",
-            # Từ khóa giao dịch
-            "thanh toán", "payment", "pay", "mua", "buy", "purchase",
-            "giá", "price", "cost", "chi phí", "fee", "phí",
-            # Từ khóa xác nhận
-            "xác nhận", "confirm", "đồng ý", "agree", "ok", "okay"
-        ]
-        
-        # QnA intent keywords - câu hỏi, tư vấn, thông tin chung
-        qna_keywords = [
-            # Câu hỏi
-            "là gì", "what is", "tại sao", "why", "như thế nào", "how",
-            "bao giờ", "when", "ai", "who", "cái gì", "what",
-            # Từ khóa tư vấn
-            "tư vấn", "advice", "gợi ý", "suggest", "khuyên", "recommend",
-            "nên", "should", "có nên", "is it good", "có tốt không",
-            # Từ khóa thông tin chung
-            "xin chào", "hello", "hi", "chào", "greeting",
-            "giờ mở cửa", "opening hours", "giờ đóng cửa", "closing time",
-            "chính sách", "policy", "điều kiện", "condition", "quy định", "rule",
-            # Thông tin/đánh giá/vé
-            "đẹp không", "review", "đánh giá", "giá vé", "vé bao nhiêu", "ticket", "ticket price"
-        ]
-        
-        # Check for QnA intent first (câu hỏi thông tin có priority cao)
-        qna_indicators = [
-            "giới thiệu về", "introduce about", "thông tin về", "info about",
-            "có gì", "what is", "là gì", "what's", "như thế nào", "how is",
-            "bảo tàng", "museum", "di tích", "heritage", "di sản", "heritage site",
-            "đẹp không", "giá vé", "ticket price", "opening hours"
-        ]
-        
-        if any(indicator in message_lower for indicator in qna_indicators):
-            return "qna"
-        
-        # Check for booking intent (second priority)
-        if any(keyword in message_lower for keyword in booking_keywords):
-            return "booking"
-        # Check for service intent
-        elif any(keyword in message_lower for keyword in service_keywords):
-            return "service"
-        # Check for QnA intent
-        elif any(keyword in message_lower for keyword in qna_keywords):
-            return "qna"
-        else:
-            # Default to QnA for unclear intent
-            return "qna"
+        # Default to QnA for unclear intent
+        return self._match_intent_keywords(normalized_message, booking_active) or "qna"
     
     async def _route_to_agent(self, state: WorkflowState) -> WorkflowState:
         """Route request to appropriate agent with enhanced logging and clarification handling"""
-        intent = state["intent"]
+        intent = state.intent
         original_intent = intent
-        platform_context = state["platform_context"]
-        message = state["message"]
-        conversation_id = state.get("conversationId") or "default"
+        platform_context = state.platform_context
+        message = state.message
+        conversation_id = state.conversationId or "default"
         
         print(f"🔄 [ROUTING] Routing to agent: {intent}")
         print(f"📝 [MESSAGE] User message: '{message}'")
@@ -778,7 +1064,7 @@ Chỉ trả về JSON, không có text khác."""
                     status = booking_state.get("status")
                     if status in ("collecting", "ready"):
                         # Check if user wants to continue booking or do something else
-                        if self._user_wants_to_continue_booking(message, original_intent):
+                        if await self._user_wants_to_continue_booking(message, original_intent):
                             original_intent = intent
                             intent = "booking"
                             print(f"📋 [BOOKING FLOW] User wants to continue booking - overriding intent from {original_intent} to booking (status: {status})")
@@ -796,15 +1082,15 @@ Chỉ trả về JSON, không có text khác."""
                     platform_context=platform_context,
                     service_type="restaurant"
                 )
-                state["response"] = response.dict()
+                state.response = response
                 print(f"✅ [SERVICE AGENT] Response generated successfully")
                 
                 # Store entity for follow-ups
                 try:
-                    services = state["response"].get("services") or []
+                    services = response.services or []
                     if services:
                         top = services[0]
-                        place_name = top.get("name")
+                        place_name = top.name
                         if place_name:
                             self.memory.update_entities_safe(conversation_id, {
                                 "current_place": place_name,
@@ -822,7 +1108,7 @@ Chỉ trả về JSON, không có text khác."""
                     message=message,
                     platform_context=platform_context,
                 )
-                state["response"] = booking_response.dict()
+                state.response = booking_response
                 print(f"✅ [BOOKING AGENT] Response generated successfully")
                 
             else:
@@ -832,13 +1118,13 @@ Chỉ trả về JSON, không có text khác."""
                     query=message,
                     platform_context=platform_context
                 )
-                state["response"] = response.dict()
+                state.response = response
                 print(f"✅ [QNA AGENT] Response generated successfully")
                 
                 # Store topic/subject to help resolve follow-ups like "ở đó/cái đó"
                 try:
-                    sources = state["response"].get("sources") or []
-                    top_title = sources[0].get("title") if sources else None
+                    sources = response.sources or []
+                    top_title = sources[0].title if sources else None
                     subject = top_title or message
                     self.memory.update_entities_safe(conversation_id, {
                         "last_subject": subject,
@@ -856,56 +1142,41 @@ Chỉ trả về JSON, không có text khác."""
     
     async def _add_cta(self, state: WorkflowState) -> WorkflowState:
         """Add platform-specific CTA to response with enhanced clarification handling"""
-        if state.get("error"):
+        if state.error:
             return state
         
-        platform_context = state["platform_context"]
+        platform_context = state.platform_context
         
         # Handle clarification case - create response here
-        if state.get("needs_clarification"):
-            ask = state.get("clarify_question") or (
-                "Bạn đang nói đến địa điểm hay nội dung nào ạ?" if platform_context.language.value == "vi"
-                else "Which place or topic do you mean?"
-            )
+        if state.needs_clarification:
+            language = platform_context.language.value
+            ask = state.clarify_question or _DEFAULT_CLARIFY_QUESTIONS[language]
             
             print(f"❓ [CLARIFICATION] Asking for clarification: '{ask}'")
             
-            ask_response = QnAResponse(
+            state.response = QnAResponse.model_construct(
                 type="QnA",
                 answerAI=ask,
                 sources=[],
-                suggestions=[
-                    Suggestion(
-                        label=("Mô tả rõ" if platform_context.language.value == "vi" else "Specify"), 
-                        action="clarify_subject"
-                    ),
-                    Suggestion(
-                        label=("Tìm nhà hàng" if platform_context.language.value == "vi" else "Find restaurants"), 
-                        action="search_services"
-                    ),
-                    Suggestion(
-                        label=("Đặt bàn" if platform_context.language.value == "vi" else "Book table"), 
-                        action="start_booking"
-                    )
-                ]
+                suggestions=list(_CLARIFY_SUGGESTIONS[language]),
+                cta=None
             )
-            state["response"] = ask_response.dict()
             # Clear one-shot clarification flags
-            state.pop("needs_clarification", None)
-            state.pop("clarify_question", None)
+            state.needs_clarification = False
+            state.clarify_question = None
             print(f"✅ [CLARIFICATION] Clarification response created")
         
-        response = state["response"]
+        response = state.response
         
         try:
             # Generate CTA based on platform and response type
-            if response.get("type") == "Service" and response.get("services"):
+            if response.type == "Service" and getattr(response, "services", None):
                 # Get first service for CTA
-                first_service = response["services"][0] if response["services"] else None
-                service_id = first_service["id"] if first_service else None
-                service_type = first_service["type"] if first_service else "restaurant"
+                first_service = response.services[0]
+                service_id = first_service.id
+                service_type = first_service.type
                 
-                cta = self.cta_engine.generate_platform_cta(
+                cta_dict = self.cta_engine.generate_platform_cta_dict(
                     platform=platform_context.platform,
                     device=platform_context.device,
                     service_id=service_id,
@@ -913,19 +1184,12 @@ Chỉ trả về JSON, không có text khác."""
                 )
             else:
                 # General CTA
-                cta = self.cta_engine.generate_platform_cta(
+                cta_dict = self.cta_engine.generate_platform_cta_dict(
                     platform=platform_context.platform,
                     device=platform_context.device
                 )
             
-            # Convert CTA to dict, excluding None values
-            cta_dict = cta.dict()
-            if cta_dict.get("deeplink") is None:
-                cta_dict.pop("deeplink", None)
-            if cta_dict.get("url") is None:
-                cta_dict.pop("url", None)
-            response["cta"] = cta_dict
-            state["response"] = response
+            response.cta = cta_dict
             
             return state
             
@@ -935,10 +1199,10 @@ Chỉ trả về JSON, không có text khác."""
     async def _enrich_language(self, state: WorkflowState) -> WorkflowState:
         """Enrich answerAI language using LLM for booking and service responses only"""
         try:
-            response = state["response"]
-            response_type = response.get("type", "")
-            answer_ai = response.get("answerAI", "")
-            language = state.get("language", "vi")
+            response = state.response
+            response_type = response.type or ""
+            answer_ai = response.answerAI or ""
+            language = state.language
             
             # Only enrich for booking and service responses, not QnA embedding
             # QnA from booking agent can still be enriched
@@ -948,10 +1212,8 @@ Chỉ trả về JSON, không có text khác."""
                 if response_type == "QnA":
                     # Check if this is from QnAAgent (embedding-based) or booking agent
                     # We can detect this by checking if there are sources (embedding-based QnA has sources)
-                    sources = response.get("sources", [])
-                    if sources:
+                    if response.sources:
                         print(f"⏭️ [LANGUAGE ENRICHMENT] Skipping QnA embedding response (has sources)")
-                        state["response"] = response
                         return state
                     else:
                         print(f"🎨 [LANGUAGE ENRICHMENT] Enriching QnA from booking agent")
@@ -961,8 +1223,8 @@ Chỉ trả về JSON, không có text khác."""
                 try:
                     enriched_answer = await self._llm_enrich_language(answer_ai, response_type, language)
                     if enriched_answer and enriched_answer.strip():
-                        response["answerAI"] = enriched_answer
-                        state["language_enriched"] = True
+                        response.answerAI = enriched_answer
+                        state.language_enriched = True
                         print(f"✅ [LANGUAGE ENRICHMENT] Successfully enriched response")
                     else:
                         print(f"⚠️ [LANGUAGE ENRICHMENT] No enrichment applied, keeping original")
@@ -971,7 +1233,6 @@ Chỉ trả về JSON, không có text khác."""
             else:
                 print(f"⏭️ [LANGUAGE ENRICHMENT] Skipping enrichment for {response_type} response")
             
-            state["response"] = response
             return state
             
         except Exception as e:
@@ -982,56 +1243,21 @@ Chỉ trả về JSON, không có text khác."""
         """Use LLM to enrich language naturally without changing core meaning"""
         
         if language == "vi":
-            system_prompt = """Bạn là chuyên gia làm giàu ngôn ngữ tự nhiên. NHIỆM VỤ: Làm giàu câu trả lời để tự nhiên hơn, thân thiện hơn nhưng KHÔNG thay đổi ý nghĩa cốt lõi.
-
-QUY TẮC:
-1. GIỮ NGUYÊN ý nghĩa chính và thông tin quan trọng
-2. Thêm từ ngữ tự nhiên, thân thiện, ấm áp
-3. Sử dụng ngôn ngữ giao tiếp tự nhiên
-4. KHÔNG thêm thông tin mới không có trong câu gốc
-5. KHÔNG thay đổi cấu trúc logic
-
-VÍ DỤ:
-- Gốc: "Tìm thấy 5 nhà hàng"
-- Làm giàu: "Tôi đã tìm thấy 5 nhà hàng tuyệt vời cho bạn"
-- Gốc: "Đặt bàn thành công"
-- Làm giàu: "Tuyệt vời! Việc đặt bàn của bạn đã được xác nhận thành công"
-
-Chỉ trả về câu trả lời đã làm giàu, không có giải thích."""
-            
             user_prompt = f"""Loại phản hồi: {response_type}
 Câu trả lời gốc: "{original_answer}"
 
 Hãy làm giàu ngôn ngữ một cách tự nhiên."""
             
         else:
-            system_prompt = """You are a natural language enrichment expert. TASK: Enrich the response to make it more natural, friendly, and warm while NOT changing the core meaning.
-
-RULES:
-1. KEEP the main meaning and important information intact
-2. Add natural, friendly, warm language
-3. Use conversational, natural language
-4. DO NOT add new information not in the original
-5. DO NOT change the logical structure
-
-EXAMPLES:
-- Original: "Found 5 restaurants"
-- Enriched: "I found 5 wonderful restaurants for you"
-- Original: "Booking successful"
-- Enriched: "Great! Your booking has been successfully confirmed"
-
-Return only the enriched response, no explanations."""
-            
             user_prompt = f"""Response type: {response_type}
 Original response: "{original_answer}"
 
 Please enrich the language naturally."""
         
         try:
-            combined_prompt = f"System: {system_prompt}\n\nUser: {user_prompt}"
-            
-            enriched = self.llm_client.generate_response_sync(
-                prompt=combined_prompt,
+            enriched = await self.llm_client.generate_response(
+                prompt=user_prompt,
+                system_prompt=ENRICH_SYSTEM_PROMPT_VI if language == "vi" else ENRICH_SYSTEM_PROMPT_EN,
                 max_tokens=200,
                 temperature=0.3  # Low temperature for consistency
             )
@@ -1055,95 +1281,140 @@ Please enrich the language naturally."""
     
     async def _format_response(self, state: WorkflowState) -> WorkflowState:
         """Format final response"""
-        # Convert response to ChatResponse
-        response_data = state["response"]
+        # Agent responses are already validated models, so skip re-validation
+        response = state.response
         
         # Map response type to ChatResponse
-        if response_data.get("type") == "Service":
-            final_response = ChatResponse(
+        if response.type == "Service":
+            final_response = ChatResponse.model_construct(
                 type="Service",
-                answerAI=response_data.get("answerAI", ""),
-                services=response_data.get("services", []),
-                sources=response_data.get("sources", []),
-                suggestions=response_data.get("suggestions", []),
-                cta=response_data.get("cta")
+                answerAI=response.answerAI,
+                services=response.services,
+                sources=response.sources,
+                suggestions=response.suggestions,
+                cta=response.cta
             )
         else:
-            final_response = ChatResponse(
+            final_response = ChatResponse.model_construct(
                 type="QnA",
-                answerAI=response_data.get("answerAI", ""),
-                sources=response_data.get("sources", []),
-                suggestions=response_data.get("suggestions", []),
-                cta=response_data.get("cta")
+                answerAI=response.answerAI,
+                services=None,
+                sources=response.sources,
+                suggestions=response.suggestions,
+                cta=response.cta
             )
         
-        state["final_response"] = final_response
+        state.final_response = final_response
         
         return state
     
-    async def process_request(self, request: ChatRequest) -> ChatResponse:
-        """Process a chat request through the LangGraph workflow"""
+    async def _iter_workflow(self, state: WorkflowState) -> AsyncIterator[Tuple[str, WorkflowState]]:
+        """Run the workflow, yielding (node name, state) after each node completes.
+        
+        When keywords resolve the intent the nodes are run directly; otherwise
+        the LangGraph workflow is streamed for LLM classification.
+        """
+        state = self._validate_platform(state)
+        intent = self._match_intent_keywords(state.normalized_message)
+        if intent is None:
+            async for update in self.workflow.astream(state, stream_mode="updates"):
+                for node, values in update.items():
+                    yield node, WorkflowState(**values)
+            return
         
-        # Initialize state
+        print(f"⚡ [FAST PATH] Keyword intent: {intent}")
+        state.intent = intent
+        yield "validate_and_classify", state
+        state = await self._rewrite_to_standalone(state)
+        yield "rewrite_to_standalone", state
+        if not state.needs_clarification:
+            state = await self._route_to_agent(state)
+            yield "route_to_agent", state
+        state = await self._add_cta(state)
+        yield "add_cta", state
+        state = await self._enrich_language(state)
+        yield "enrich_language", state
+        yield "format_response", await self._format_response(state)
+    
+    def _rejected_response(self, request: ChatRequest) -> Optional[ChatResponse]:
+        """Canned response for empty or oversized messages, None when the message is acceptable"""
+        if not request.message.strip():
+            return _EMPTY_MESSAGE_RESPONSES.get(request.language, _EMPTY_MESSAGE_RESPONSES["vi"])
+        if len(request.message) > MAX_MESSAGE_CHARS:
+            return _TOO_LONG_MESSAGE_RESPONSES.get(request.language, _TOO_LONG_MESSAGE_RESPONSES["vi"])
+        return None
+    
+    def _begin_request(self, request: ChatRequest) -> Tuple[WorkflowState, str]:
+        """Build the initial workflow state and record the user turn in memory"""
         initial_state = WorkflowState(
             message=request.message,
             platform=request.platform,
             device=request.device,
             language=request.language,
-            conversationId=getattr(request, "conversationId", None),
-            platform_context=None,
-            intent=None,
-            response=None,
-            language_enriched=False,
-            final_response=None,
-            error=None
+            conversationId=getattr(request, "conversationId", None)
         )
         
-        # Execute workflow
-        try:
-            # Save user turn
-            conversation_id = getattr(request, "conversationId", None) or "default"
-            
-            # Extract user identifier from conversation_id if available
-            user_identifier = None
-            if conversation_id and conversation_id != "default":
-                parts = conversation_id.split("_")
-                if len(parts) >= 2 and parts[0] in ["user", "session"]:
-                    user_identifier = f"{parts[0]}_{parts[1]}"
-            
-            self.memory.add_turn(
-                conversation_id, 
-                "user", 
-                request.message,
-                meta={
-                    "platform": request.platform,
-                    "device": request.device, 
-                    "language": request.language,
-                    "user_identifier": user_identifier
-                }
-            )
+        # Save user turn
+        conversation_id = getattr(request, "conversationId", None) or "default"
+        
+        # Extract user identifier from conversation_id if available
+        user_identifier = None
+        if conversation_id and conversation_id != "default":
+            parts = conversation_id.split("_")
+            if len(parts) >= 2 and parts[0] in ["user", "session"]:
+                user_identifier = f"{parts[0]}_{parts[1]}"
+        
+        self.memory.add_turn(
+            conversation_id, 
+            "user", 
+            request.message,
+            meta={
+                "platform": request.platform,
+                "device": request.device, 
+                "language": request.language,
+                "user_identifier": user_identifier
+            }
+        )
 
-            # Update persistent user entities (name/email/phone) from the latest message
+        # Update persistent user entities (name/email/phone) from the latest message
+        try:
+            self._update_user_entities_from_message(conversation_id, request.message)
+        except Exception:
+            pass
+        
+        return initial_state, conversation_id
+    
+    def _finish_request(self, request: ChatRequest, conversation_id: str, result: Optional[WorkflowState]) -> ChatResponse:
+        """Record the assistant turn and return the final response (or the fallback)"""
+        if result is not None and result.final_response:
+            # Save assistant turn
             try:
-                self._update_user_entities_from_message(conversation_id, request.message)
+                self.memory.add_turn(conversation_id, "assistant", result.final_response.answerAI, meta={"type": result.final_response.type})
             except Exception:
                 pass
-
-            # Run the workflow
-            result = await self.workflow.ainvoke(initial_state)
+            return result.final_response
+        
+        # Fallback error response
+        error_response = ErrorHandler.create_fallback_response(request.language)
+        return ChatResponse(**error_response)
+    
+    async def process_request(self, request: ChatRequest) -> ChatResponse:
+        """Process a chat request through the LangGraph workflow"""
+        
+        # Reject empty and oversized messages before any memory write or LLM call
+        rejected = self._rejected_response(request)
+        if rejected is not None:
+            return rejected
+        
+        # Execute workflow
+        try:
+            initial_state, conversation_id = self._begin_request(request)
             
-            # Return final response
-            if result.get("final_response"):
-                # Save assistant turn
-                try:
-                    self.memory.add_turn(conversation_id, "assistant", result["final_response"].answerAI, meta={"type": result["final_response"].type})
-                except Exception:
-                    pass
-                return result["final_response"]
-            else:
-                # Fallback error response
-                error_response = ErrorHandler.create_fallback_response(request.language)
-                return ChatResponse(**error_response)
+            result = None
+            async for _, result in self._iter_workflow(initial_state):
+                pass
+            
+            return self._finish_request(request, conversation_id, result)
                 
         except (ValidationError, AgentError, LLMError) as e:
             # Handle known workflow errors
@@ -1154,12 +1425,48 @@ Please enrich the language naturally."""
             error_response = ErrorHandler.handle_generic_error(e, request.language)
             return ChatResponse(**error_response)
     
+    async def process_request_stream(self, request: ChatRequest,
+                                     on_response: Optional[Callable[[ChatResponse], Awaitable[None]]] = None) -> AsyncIterator[bytes]:
+        """Process a chat request, yielding NDJSON events as workflow stages complete.
+        
+        Events: "intent", "answer" (agent answer before language enrichment),
+        one "service" per service, "cta", and a final "done" carrying the
+        complete ChatResponse, which is authoritative. on_response, if given,
+        receives that final response before it is sent.
+        """
+        response = self._rejected_response(request)
+        if response is None:
+            try:
+                initial_state, conversation_id = self._begin_request(request)
+                
+                result = None
+                async for node, result in self._iter_workflow(initial_state):
+                    if node == "validate_and_classify":
+                        yield _stream_event("intent", intent=result.intent)
+                    elif node == "route_to_agent" and result.response is not None:
+                        yield _stream_event("answer", type=result.response.type, answerAI=result.response.answerAI)
+                        for service in getattr(result.response, "services", None) or []:
+                            yield _stream_event("service", service=service.model_dump() if hasattr(service, "model_dump") else service)
+                    elif node == "add_cta" and result.response is not None:
+                        yield _stream_event("cta", cta=result.response.cta)
+                
+                response = self._finish_request(request, conversation_id, result)
+                
+            except (ValidationError, AgentError, LLMError) as e:
+                response = ChatResponse(**ErrorHandler.handle_workflow_error(e, request.language))
+            except Exception as e:
+                response = ChatResponse(**ErrorHandler.handle_generic_error(e, request.language))
+        
+        if on_response is not None:
+            await on_response(response)
+        yield _stream_event("done", response=response.model_dump())
+    
+    
     def get_workflow_graph(self) -> Dict[str, Any]:
         """Get workflow graph for visualization"""
         return {
             "nodes": [
-                {"id": "validate_platform", "type": "validation"},
-                {"id": "classify_intent", "type": "classification"},
+                {"id": "validate_and_classify", "type": "classification"},
                 {"id": "rewrite_to_standalone", "type": "rewriting"},
                 {"id": "route_to_agent", "type": "routing"},
                 {"id": "add_cta", "type": "enhancement"},
@@ -1167,8 +1474,7 @@ Please enrich the language naturally."""
                 {"id": "format_response", "type": "formatting"}
             ],
             "edges": [
-                {"from": "validate_platform", "to": "classify_intent"},
-                {"from": "classify_intent", "to": "rewrite_to_standalone"},
+                {"from": "validate_and_classify", "to": "rewrite_to_standalone"},
                 {"from": "rewrite_to_standalone", "to": "route_to_agent"},
                 {"from": "route_to_agent", "to": "add_cta"},
                 {"from": "add_cta", "to": "enrich_language"},
@@ -1176,11 +1482,6 @@ Please enrich the language naturally."""
                 {"from": "format_response", "to": "END"}
             ],
             "conditional_edges": [
-                {
-                    "from": "validate_platform",
-                    "condition": "error",
-                    "to": "END"
-                },
                 {
                     "from": "rewrite_to_standalone",
                     "condition": "clarify",
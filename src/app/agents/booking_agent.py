@@ -2,8 +2,9 @@
 from __future__ import annotations
 
 from typing import Dict, Any, Optional, Tuple
+import asyncio
 import re
-import uuid
+import secrets
 import logging
 
 from ..models.schemas import QnAResponse, Suggestion, UserInfoRequest, ServiceResponse
@@ -26,7 +27,7 @@ class BookingAgent:
         # Create rate-limited LLM client if not provided
         if llm_client is None:
             from ..llm.open_client import OpenAIClient
-            base_llm_client = OpenAIClient()
+            base_llm_client = OpenAIClient.get_default()
             self.llm_client = RateLimitedLLMClient(base_llm_client)
         else:
             self.llm_client = llm_client
@@ -78,7 +79,7 @@ class BookingAgent:
 
         # If waiting for a restaurant choice, try to select from recommendations
         if state.get("awaiting_restaurant_selection") and state.get("recommendations"):
-            selection = self._extract_restaurant_selection(message, state["recommendations"], platform_context.language.value)
+            selection = await self._extract_restaurant_selection(message, state["recommendations"], platform_context.language.value)
             if selection:
                 state["restaurant"] = selection.get("name")
                 state["restaurant_id"] = selection.get("id")
@@ -108,11 +109,11 @@ class BookingAgent:
                 )
 
         # Extract info and understand user intent using LLM
-        llm_result = self._llm_extract_and_plan(state, message, platform_context.language.value)
+        llm_result = await self._llm_extract_and_plan(state, message, platform_context.language.value)
         
         # Fallback to simple extraction if LLM fails
         if not llm_result:
-            extracted = self._extract_booking_info(message, platform_context.language.value)
+            extracted = await self._extract_booking_info(message, platform_context.language.value)
         else:
             extracted = llm_result
         
@@ -458,7 +459,7 @@ class BookingAgent:
 
         # Check if user is asking about other topics while in booking flow
         # BUT only if we didn't extract any booking information from the message
-        if not extracted and self._is_asking_other_topics(message, platform_context.language.value):
+        if not extracted and await self._is_asking_other_topics(message, platform_context.language.value):
             # User is asking about something else, not booking info
             # We should answer their question first, then ask if they want to continue booking
             if platform_context.language.value == "vi":
@@ -562,12 +563,12 @@ class BookingAgent:
 
         # If ready and confirmed, send emails and finalize
         if state["status"] == "ready" and state.get("confirmed"):
-            booking_reference = f"TRIPC-{uuid.uuid4().hex[:8].upper()}"
+            booking_reference = f"TRIPC-{secrets.token_hex(4).upper()}"
 
-            # Build UserInfoRequest payload
+            # Build UserInfoRequest payload (fields come from the typed platform context and booking state)
             info_message = self._compose_summary_message(state, platform_context.language.value)
 
-            user_info = UserInfoRequest(
+            user_info = UserInfoRequest.from_trusted(
                 name=state.get("name") or "",
                 email=state.get("email") or "",
                 phone=state.get("phone") or "",
@@ -583,12 +584,14 @@ class BookingAgent:
             sent_company = False
             sent_user = False
             if self.email_service and self.email_service.is_smtp_configured():
-                try:
-                    sent_company = await self.email_service.send_booking_inquiry(user_info)
-                    sent_user = await self.email_service.send_confirmation_email(user_info)
-                except Exception:
-                    sent_company = False
-                    sent_user = False
+                # Both emails are independent SMTP sends; a failure in one does not void the other
+                sent_company, sent_user = await asyncio.gather(
+                    self.email_service.send_booking_inquiry(user_info),
+                    self.email_service.send_confirmation_email(user_info),
+                    return_exceptions=True
+                )
+                sent_company = sent_company is True
+                sent_user = sent_user is True
 
             # Finalize state
             state["status"] = "submitted"
@@ -634,7 +637,7 @@ class BookingAgent:
                 else:
                     ask_text = f"Updated information: {summary}. Do you want to modify anything else?"
             else:
-                ask_text = self._compose_next_question(state, priority_missing, platform_context.language.value)
+                ask_text = await self._compose_next_question(state, priority_missing, platform_context.language.value)
         
         suggestions = self._next_suggestions(missing_required, platform_context.language.value)
 
@@ -671,7 +674,7 @@ class BookingAgent:
         words = vi_words if lang == "vi" else en_words
         return any(w in t for w in words)
 
-    def _extract_booking_info(self, text: str, lang: str) -> Dict[str, Optional[str]]:
+    async def _extract_booking_info(self, text: str, lang: str) -> Dict[str, Optional[str]]:
         """Very lightweight extraction for name/email/phone/party size/time/restaurant/special.
         These are best-effort heuristics; robust extraction should be handled by LLM in future.
         """
@@ -714,7 +717,7 @@ class BookingAgent:
             result["party_size"] = people_match.group(1)
         else:
             # Try to extract party size from context using LLM
-            party_size_from_context = self._extract_party_size_from_context(text, lang)
+            party_size_from_context = await self._extract_party_size_from_context(text, lang)
             if party_size_from_context:
                 result["party_size"] = party_size_from_context
 
@@ -756,7 +759,7 @@ class BookingAgent:
 
         return result
 
-    def _llm_extract_and_plan(self, state: Dict[str, Any], message: str, lang: str) -> Optional[Dict[str, Optional[str]]]:
+    async def _llm_extract_and_plan(self, state: Dict[str, Any], message: str, lang: str) -> Optional[Dict[str, Optional[str]]]:
         """Use LLM to intelligently extract booking fields and plan next actions"""
         try:
             if not self.llm_client or not self.llm_client.is_configured():
@@ -848,7 +851,7 @@ Return JSON only, no other text."""
             user = f"Current booking state: {snapshot}\nUser message: '{message}'\nAnalyze and return JSON."
 
             prompt = f"System: {system}\n\nUser: {user}"
-            out = self.llm_client.generate_response_sync(prompt, max_tokens=300, temperature=0.1)
+            out = await self.llm_client.generate_response(prompt, max_tokens=300, temperature=0.1)
             if not out:
                 return None
 
@@ -887,7 +890,7 @@ Return JSON only, no other text."""
         triggers = vi_triggers if lang == "vi" else en_triggers
         return any(t in m for t in triggers)
 
-    def _extract_restaurant_selection(self, message: str, recommendations: list[Dict[str, Any]], lang: str) -> Optional[Dict[str, Any]]:
+    async def _extract_restaurant_selection(self, message: str, recommendations: list[Dict[str, Any]], lang: str) -> Optional[Dict[str, Any]]:
         """Extract restaurant selection from user message using LLM"""
         try:
             if not self.llm_client or not self.llm_client.is_configured():
@@ -926,7 +929,7 @@ If no restaurant can be determined, return:
 
 Return JSON only, no other text."""
             
-            response = self.llm_client.generate_response_sync(prompt, max_tokens=150, temperature=0.1)
+            response = await self.llm_client.generate_response(prompt, max_tokens=150, temperature=0.1)
             
             if response:
                 import json
@@ -996,7 +999,7 @@ Return JSON only, no other text."""
                 f"Notes: {state.get('special_request') or ''}"
             )
 
-    def _compose_next_question(self, state: Dict[str, Any], missing: Tuple[str, ...], lang: str) -> str:
+    async def _compose_next_question(self, state: Dict[str, Any], missing: Tuple[str, ...], lang: str) -> str:
         # Prefer LLM suggested question only if aligned with next target field
         if state.get("next_ask") and missing:
             target = missing[0]
@@ -1008,7 +1011,7 @@ Return JSON only, no other text."""
             first = missing[0]
 
             # Try LLM to craft a short, natural, personalized question
-            llm_q = self._llm_personalized_next_question(state, first, lang)
+            llm_q = await self._llm_personalized_next_question(state, first, lang)
             if llm_q:
                 return llm_q
 
@@ -1110,7 +1113,7 @@ Return JSON only, no other text."""
         
         return None
 
-    def _extract_party_size_from_context(self, text: str, lang: str) -> Optional[str]:
+    async def _extract_party_size_from_context(self, text: str, lang: str) -> Optional[str]:
         """Extract party size from context using LLM"""
         try:
             if not self.llm_client or not self.llm_client.is_configured():
@@ -1155,7 +1158,7 @@ If cannot determine, return:
 
 Return JSON only, no other text."""
             
-            response = self.llm_client.generate_response_sync(prompt, max_tokens=100, temperature=0.1)
+            response = await self.llm_client.generate_response(prompt, max_tokens=100, temperature=0.1)
             
             if response:
                 import json
@@ -1236,7 +1239,7 @@ Return JSON only, no other text."""
             return f"Chào {first_name},"
         return f"Hi {first_name},"
 
-    def _llm_personalized_next_question(self, state: Dict[str, Any], target_field: str, lang: str) -> Optional[str]:
+    async def _llm_personalized_next_question(self, state: Dict[str, Any], target_field: str, lang: str) -> Optional[str]:
         try:
             if not self.llm_client or not self.llm_client.is_configured():
                 return None
@@ -1263,7 +1266,7 @@ Return JSON only, no other text."""
                 )
                 user = f"Known info: {known}. Generate question."
             prompt = f"System: {system}\n\nUser: {user}"
-            out = self.llm_client.generate_response_sync(prompt, max_tokens=60, temperature=0.3)
+            out = await self.llm_client.generate_response(prompt, max_tokens=60, temperature=0.3)
             if out:
                 q = out.strip().strip('"')
                 # Basic guard: ensure it references the target field semantically
@@ -1303,7 +1306,7 @@ Return JSON only, no other text."""
         else:
             return any(w in text for w in ["no", "no thanks", "no thanks, cancel", "no thanks, booking", "no thanks, reservation", "cancel", "hủy"])
 
-    def _is_asking_other_topics(self, message: str, lang: str) -> bool:
+    async def _is_asking_other_topics(self, message: str, lang: str) -> bool:
         """Detect if user is asking about other topics while in booking flow using LLM"""
         try:
             if not self.llm_client or not self.llm_client.is_configured():
@@ -1358,7 +1361,7 @@ Return JSON:
 
 Return JSON only, no other text."""
             
-            response = self.llm_client.generate_response_sync(prompt, max_tokens=100, temperature=0.1)
+            response = await self.llm_client.generate_response(prompt, max_tokens=100, temperature=0.1)
             
             if response:
                 import json
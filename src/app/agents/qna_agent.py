@@ -3,6 +3,7 @@ from typing import List, Optional, Dict, Any
 from ..models.schemas import QnAResponse, Source, Suggestion
 from ..vector.pgvector_store import get_embedding, embedding_to_pgvector_str, search_similar, ask_llm
 from ..core.platform_context import PlatformContext
+from ..core.response_cache import ResponseCache, response_cache_key
 from ..llm.rate_limited_client import RateLimitedLLMClient
 import logging
 
@@ -17,9 +18,12 @@ class QnAAgent:
         self.llm_client = llm_client
         if llm_client is None:
             from ..llm.open_client import OpenAIClient
-            base_llm_client = OpenAIClient()
+            base_llm_client = OpenAIClient.get_default()
             self.llm_client = RateLimitedLLMClient(base_llm_client)
         
+        # Answers for repeated standalone questions (queries arrive rewritten to standalone form)
+        self.response_cache = ResponseCache.from_env()
+        
         # Pre-defined QnA content for common queries
         self.common_responses = {
             "vi": {
@@ -35,6 +39,12 @@ class QnAAgent:
     async def search_embedding(self, query: str, platform_context: PlatformContext, 
                              top_k: int = 5) -> QnAResponse:
         """Search for QnA content using vector similarity and LLM for natural responses"""
+        cache_key = response_cache_key(query, platform_context, top_k)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            logger.info("QnA response cache hit")
+            return cached.model_copy(deep=True)
+        
         try:
             
             emb = get_embedding(query)
@@ -56,12 +66,15 @@ class QnAAgent:
             # Generate contextual suggestions
             suggestions = await self._generate_llm_suggestions(query, results, platform_context)
             
-            return QnAResponse(
+            response = QnAResponse(
                 type="QnA",
                 answerAI=answer_ai,
                 sources=sources,
                 suggestions=suggestions
             )
+            # Callers decorate the response (CTA, enrichment), so cache a private copy
+            self.response_cache.put(cache_key, response.model_copy(deep=True))
+            return response
             
         except Exception as e:
             logger.error(f"Error in QnA search: {e}")
@@ -3,6 +3,7 @@ from ..models.schemas import ServiceResponse, Service, Source, Suggestion
 from ..services.tripc_api import TripCAPIClient
 from ..services.keyword_analyzer import KeywordAnalyzer
 from ..core.platform_context import PlatformContext
+from ..core.response_cache import ResponseCache, response_cache_key
 from ..llm.rate_limited_client import RateLimitedLLMClient
 import logging
 
@@ -17,10 +18,13 @@ class ServiceAgent:
         self.llm_client = llm_client
         if llm_client is None:
             from ..llm.open_client import OpenAIClient
-            base_llm_client = OpenAIClient()
+            base_llm_client = OpenAIClient.get_default()
             self.llm_client = RateLimitedLLMClient(base_llm_client)
         self.keyword_analyzer = KeywordAnalyzer(self.llm_client, self.tripc_client)
         
+        # Responses for repeated standalone service queries
+        self.response_cache = ResponseCache.from_env()
+        
         # Service type mappings with comprehensive keywords
         self.service_keywords = {
             "restaurant": [
@@ -45,6 +49,12 @@ class ServiceAgent:
     async def get_services(self, query: str, platform_context: PlatformContext, 
                           service_type: str = "restaurant", page: int = 6) -> ServiceResponse:
         """Get services based on query and type with LLM-powered responses"""
+        cache_key = response_cache_key(query, platform_context, service_type)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Service response cache hit")
+            return cached.model_copy(deep=True)
+        
         try:
             # Determine service type from query
             detected_type = self._detect_service_type(query)
@@ -162,13 +172,16 @@ class ServiceAgent:
             sources = self.tripc_client.get_service_sources(service_type)
             suggestions = self._generate_service_suggestions(platform_context, service_type)
             
-            return ServiceResponse(
+            response = ServiceResponse(
                 type="Service",
                 answerAI=answer_ai,
                 services=services,
                 sources=sources,
                 suggestions=suggestions
             )
+            # Callers decorate the response (CTA), so cache a private copy
+            self.response_cache.put(cache_key, response.model_copy(deep=True))
+            return response
             
         except Exception as e:
             logger.error(f"Error getting services: {e}")
@@ -287,7 +300,7 @@ Respond in English, naturally, friendly, under 100 words. Introduce {service_typ
 IMPORTANT: If this is a restaurant search, end your response with: "You can also check out the Da Nang Culinary Passport for certified high-quality restaurants!"."""
             
             # Generate response using LLM
-            llm_response = self.llm_client.generate_response_sync(prompt, max_tokens=150)
+            llm_response = await self.llm_client.generate_response(prompt, max_tokens=150)
             
             if llm_response:
                 return llm_response
@@ -334,7 +347,7 @@ Respond in English, naturally, friendly, under 100 words. Introduce {location} c
 IMPORTANT: End your response with: "You can also check out the Da Nang Culinary Passport for certified high-quality restaurants!"."""
             
             # Generate response using LLM
-            llm_response = self.llm_client.generate_response_sync(prompt, max_tokens=150)
+            llm_response = await self.llm_client.generate_response(prompt, max_tokens=150)
             
             if llm_response:
                 return llm_response
@@ -747,7 +760,7 @@ Only extract information present in the query. Use null if not mentioned. Choose
                 # Return simple fallback JSON if no LLM available
                 return '{"location": null, "cuisine_type": null, "keyword": null, "product_type_id": null, "price_range": null, "rating_preference": null, "atmosphere": null, "meal_time": null, "special_features": null}'
             
-            response = self.llm_client.generate_response_sync(prompt, max_tokens=256, temperature=0.3)
+            response = await self.llm_client.generate_response(prompt, max_tokens=256, temperature=0.3)
             return response or '{"location": null, "cuisine_type": null, "keyword": null, "product_type_id": null, "price_range": null, "rating_preference": null, "atmosphere": null, "meal_time": null, "special_features": null}'
             
         except Exception as e:
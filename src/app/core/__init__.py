@@ -1,3 +1,3 @@
 # Core package
-from .platform_context import PlatformContextHandler
+from .platform_context import PlatformContextHandler, get_platform_context, platform_handler
 from .cta_engine import CTAEngine
@@ -1,5 +1,5 @@
 from typing import List, Dict, Any, Optional
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import logging
 from datetime import datetime, timedelta
 
@@ -18,12 +18,15 @@ class MemoryManager:
         try:
             current_entities = self.memory.get_entities(conversation_id)
             
-            # Log the update attempt
-            self.update_log[conversation_id].append({
+            # Log the update attempt (only the changed keys; full values in debug mode)
+            log_entry = {
                 "source": source,
-                "updates": updates.copy(),
+                "keys": tuple(updates.keys()),
                 "timestamp": self._get_timestamp()
-            })
+            }
+            if logger.isEnabledFor(logging.DEBUG):
+                log_entry["updates"] = dict(updates)
+            self.update_log[conversation_id].append(log_entry)
             
             # Merge updates intelligently
             merged_entities = self._merge_entities(current_entities, updates, source)
@@ -107,6 +110,8 @@ class ConversationMemory:
         self.history: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
         self.entities: Dict[str, Dict[str, Any]] = defaultdict(dict)
         self.session_info: Dict[str, Dict[str, Any]] = defaultdict(dict)  # Track session metadata
+        # Conversation IDs ordered by last activity (least recent first)
+        self._activity_order: "OrderedDict[str, datetime]" = OrderedDict()
         self.max_turns = max_turns
         self.session_timeout_hours = session_timeout_hours
         self.memory_manager = MemoryManager(self)
@@ -115,14 +120,16 @@ class ConversationMemory:
         """Add a conversation turn with session tracking"""
         # Update session info
         if conversation_id not in self.session_info:
+            now = datetime.utcnow()
             self.session_info[conversation_id] = {
-                "created_at": datetime.utcnow(),
-                "last_activity": datetime.utcnow(),
+                "created_at": now,
+                "last_activity": now,
                 "turn_count": 0,
                 "user_identifier": meta.get("user_identifier") if meta else None
             }
+            self._activity_order[conversation_id] = now
         else:
-            self.session_info[conversation_id]["last_activity"] = datetime.utcnow()
+            self._touch_session(conversation_id)
             self.session_info[conversation_id]["turn_count"] += 1
         
         # Add turn to history
@@ -153,7 +160,7 @@ class ConversationMemory:
         
         # Update session info
         if conversation_id in self.session_info:
-            self.session_info[conversation_id]["last_activity"] = datetime.utcnow()
+            self._touch_session(conversation_id)
 
     def get_entities(self, conversation_id: str) -> Dict[str, Any]:
         """Get entities for conversation"""
@@ -171,28 +178,30 @@ class ConversationMemory:
         return self.session_info.get(conversation_id, {})
     
     def get_active_sessions(self) -> List[str]:
-        """Get list of active conversation IDs"""
+        """Get list of active conversation IDs, least recently active first"""
         self._cleanup_expired_sessions()
-        return list(self.session_info.keys())
+        return list(self._activity_order.keys())
+    
+    def _touch_session(self, conversation_id: str) -> None:
+        """Record activity for a session and move it to the end of the activity order"""
+        now = datetime.utcnow()
+        self.session_info[conversation_id]["last_activity"] = now
+        self._activity_order[conversation_id] = now
+        self._activity_order.move_to_end(conversation_id)
     
     def _cleanup_expired_sessions(self) -> None:
         """Remove expired sessions to prevent memory leaks"""
-        current_time = datetime.utcnow()
-        expired_sessions = []
-        
-        for conv_id, session_data in self.session_info.items():
-            last_activity = session_data.get("last_activity")
-            if last_activity and isinstance(last_activity, str):
-                last_activity = datetime.fromisoformat(last_activity.replace('Z', '+00:00'))
-            
-            if last_activity and (current_time - last_activity) > timedelta(hours=self.session_timeout_hours):
-                expired_sessions.append(conv_id)
+        cutoff = datetime.utcnow() - timedelta(hours=self.session_timeout_hours)
         
-        # Remove expired sessions
-        for conv_id in expired_sessions:
-            del self.history[conv_id]
-            del self.entities[conv_id]
-            del self.session_info[conv_id]
+        # Sessions are ordered by last activity, so only the expired prefix is visited
+        while self._activity_order:
+            conv_id, last_activity = next(iter(self._activity_order.items()))
+            if last_activity >= cutoff:
+                break
+            self._activity_order.popitem(last=False)
+            self.history.pop(conv_id, None)
+            self.entities.pop(conv_id, None)
+            self.session_info.pop(conv_id, None)
             logger.info(f"Cleaned up expired session: {conv_id}")
     
     def clear_session(self, conversation_id: str) -> None:
@@ -203,8 +212,21 @@ class ConversationMemory:
             del self.entities[conversation_id]
         if conversation_id in self.session_info:
             del self.session_info[conversation_id]
+        self._activity_order.pop(conversation_id, None)
         logger.info(f"Cleared session: {conversation_id}")
     
+    def clear_all(self) -> int:
+        """Clear every session at once; returns how many active sessions were dropped"""
+        self._cleanup_expired_sessions()
+        cleared = len(self._activity_order)
+        self.history.clear()
+        self.entities.clear()
+        self.session_info.clear()
+        self._activity_order.clear()
+        self.memory_manager.update_log.clear()
+        logger.info(f"Cleared all {cleared} sessions")
+        return cleared
+    
     def get_session_stats(self) -> Dict[str, Any]:
         """Get memory statistics"""
         self._cleanup_expired_sessions()
@@ -1,15 +1,36 @@
-from typing import Optional
+from types import MappingProxyType
+from typing import Any, Dict, Optional
 from ..models.platform_models import (
-    CTAResponse, DeviceType, PlatformType, AppStoreURLs
+    CTAResponse, DeviceType, PlatformType,
+    ANDROID_STORE_URL, IOS_STORE_URL, GENERAL_DOWNLOAD_URL
 )
 from ..models.schemas import Service
 
 
+# Mobile app deeplink CTA templates
+APP_CTA_LABEL = "Xem chi tiết {service_type}"
+APP_CTA_DEEPLINK = "tripc://{service_type}/{service_id}"
+
+
 class CTAEngine:
     """Engine for generating platform-specific Call-to-Actions"""
     
     def __init__(self):
-        self.app_store_urls = AppStoreURLs()
+        # Web (app download) CTAs depend only on the device, so build them once
+        self._web_cta_dicts = MappingProxyType({
+            device: MappingProxyType(self.cta_to_dict(self.generate_web_cta(device)))
+            for device in DeviceType
+        })
+    
+    @staticmethod
+    def cta_to_dict(cta: CTAResponse) -> Dict[str, Any]:
+        """Convert CTA to dict, excluding None values"""
+        cta_dict = cta.dict()
+        if cta_dict.get("deeplink") is None:
+            cta_dict.pop("deeplink", None)
+        if cta_dict.get("url") is None:
+            cta_dict.pop("url", None)
+        return cta_dict
     
     def generate_web_cta(self, device: DeviceType, service_id: Optional[int] = None) -> CTAResponse:
         """Generate CTA for web browser users (app download)"""
@@ -17,28 +38,28 @@ class CTAEngine:
             return CTAResponse(
                 device=device,
                 label="Tải app TripC cho Android",
-                url=self.app_store_urls.get_android_store_url()
+                url=ANDROID_STORE_URL
             )
         elif device == DeviceType.IOS:
             return CTAResponse(
                 device=device,
                 label="Tải app TripC cho iOS",
-                url=self.app_store_urls.get_ios_store_url()
+                url=IOS_STORE_URL
             )
         else:  # desktop
             return CTAResponse(
                 device=device,
                 label="Tải app TripC để trải nghiệm tốt hơn",
-                url=self.app_store_urls.get_general_download_url()
+                url=GENERAL_DOWNLOAD_URL
             )
     
     def generate_app_cta(self, device: DeviceType, service_id: int, service_type: str = "restaurant") -> CTAResponse:
         """Generate CTA for mobile app users (deeplinks)"""
-        deeplink = f"tripc://{service_type}/{service_id}"
+        deeplink = APP_CTA_DEEPLINK.format(service_type=service_type, service_id=service_id)
         
         return CTAResponse(
             device=device,
-            label=f"Xem chi tiết {service_type}",
+            label=APP_CTA_LABEL.format(service_type=service_type),
             deeplink=deeplink
         )
     
@@ -55,6 +76,19 @@ class CTAEngine:
         else:
             raise ValueError(f"Unsupported platform: {platform}")
     
+    def generate_platform_cta_dict(self, platform: PlatformType, device: DeviceType,
+                                   service_id: Optional[int] = None, service_type: str = "restaurant") -> Dict[str, Any]:
+        """Platform-appropriate CTA as a dict (None fields omitted), served from the precomputed web table"""
+        if platform == PlatformType.MOBILE_APP and service_id is not None:
+            return {
+                "device": device,
+                "label": APP_CTA_LABEL.format(service_type=service_type),
+                "deeplink": APP_CTA_DEEPLINK.format(service_type=service_type, service_id=service_id)
+            }
+        if platform not in (PlatformType.WEB_BROWSER, PlatformType.MOBILE_APP):
+            raise ValueError(f"Unsupported platform: {platform}")
+        return dict(self._web_cta_dicts[device])
+    
     def generate_service_cta(self, platform: PlatformType, device: DeviceType, 
                            services: list) -> Optional[CTAResponse]:
         """Generate CTA for service responses"""
@@ -8,6 +8,16 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Retry suggestion templates shared by all error responses
+_RETRY_SUGGESTION_VI = {"label": "Thử lại", "action": "retry", "data": {}}
+_RETRY_SUGGESTION_EN = {"label": "Try again", "action": "retry", "data": {}}
+
+
+def _retry_suggestions(language: str) -> list:
+    """Build the retry suggestion list for an error response"""
+    template = _RETRY_SUGGESTION_VI if language == "vi" else _RETRY_SUGGESTION_EN
+    return [template.copy()]
+
 
 class WorkflowError(Exception):
     """Base exception for workflow errors"""
@@ -83,13 +93,7 @@ class ErrorHandler:
             "type": "Error",
             "answerAI": user_message,
             "error_code": error.error_code,
-            "suggestions": [
-                {
-                    "label": "Thử lại" if language == "vi" else "Try again",
-                    "action": "retry",
-                    "data": {}
-                }
-            ]
+            "suggestions": _retry_suggestions(language)
         }
     
     @staticmethod
@@ -106,13 +110,7 @@ class ErrorHandler:
             "type": "Error",
             "answerAI": user_message,
             "error_code": "UNKNOWN_ERROR",
-            "suggestions": [
-                {
-                    "label": "Thử lại" if language == "vi" else "Try again",
-                    "action": "retry",
-                    "data": {}
-                }
-            ]
+            "suggestions": _retry_suggestions(language)
         }
     
     @staticmethod
@@ -127,11 +125,5 @@ class ErrorHandler:
             "type": "Error",
             "answerAI": user_message,
             "error_code": "FALLBACK_ERROR",
-            "suggestions": [
-                {
-                    "label": "Thử lại" if language == "vi" else "Try again",
-                    "action": "retry",
-                    "data": {}
-                }
-            ]
+            "suggestions": _retry_suggestions(language)
         }
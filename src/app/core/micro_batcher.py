@@ -0,0 +1,112 @@
+from typing import Any, Awaitable, Callable, Hashable, List, Optional, Sequence, Set, Tuple
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Groups concurrent submissions into batches handled by one coroutine call.
+
+    submit() queues an item and waits for its result. A background worker collects
+    the items arriving within `window` seconds (up to `max_size`), splits them by
+    `group_key` and calls `handler(items)` once per group. The handler returns one
+    result per item, in order; an exception instance in that list fails only its own
+    submission, while an exception raised by the handler fails the whole group.
+    """
+
+    def __init__(self, handler: Callable[[List[Any]], Awaitable[Sequence[Any]]], max_size: int,
+                 window: float, group_key: Optional[Callable[[Any], Hashable]] = None):
+        self._handler = handler
+        self.max_size = max_size
+        self.window = window
+        self._group_key = group_key
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Batch tasks in flight; the event loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item for the next batch and wait for its result"""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run_worker(self._queue))
+
+        future = loop.create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _run_worker(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        batch: List[Tuple[Any, asyncio.Future]] = []
+        try:
+            while True:
+                batch = [await queue.get()]
+                deadline = loop.time() + self.window
+                while len(batch) < self.max_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                if self._group_key is None:
+                    groups = [batch]
+                else:
+                    by_key = {}
+                    for entry in batch:
+                        by_key.setdefault(self._group_key(entry[0]), []).append(entry)
+                    groups = list(by_key.values())
+                batch = []
+
+                for entries in groups:
+                    task = loop.create_task(self._run_batch(entries))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+        except asyncio.CancelledError:
+            # Fail the items collected or still queued so their submitters do not wait forever
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            for _, future in batch:
+                future.cancel()
+            raise
+
+    async def _run_batch(self, entries: List[Tuple[Any, asyncio.Future]]) -> None:
+        """Run the handler on one group and resolve each waiting future with its own result"""
+        try:
+            results = await self._handler([item for item, _ in entries])
+            if len(results) != len(entries):
+                raise RuntimeError(f"Batch handler returned {len(results)} results for {len(entries)} items")
+        except asyncio.CancelledError:
+            for _, future in entries:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in entries:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(entries, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def aclose(self) -> None:
+        """Stop the worker and cancel batches in flight (their submitters see CancelledError)"""
+        tasks = list(self._tasks)
+        if self._worker is not None:
+            tasks.append(self._worker)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker = None
+        self._queue = None
@@ -1,5 +1,7 @@
-from typing import Optional
-from ..models.platform_models import PlatformContext, PlatformType, DeviceType, LanguageType
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Optional
+from ..models.platform_models import MOBILE_DEVICES, PlatformContext, PlatformType, DeviceType, LanguageType
 from ..models.schemas import ChatRequest
 
 
@@ -8,14 +10,36 @@ class InvalidPlatformError(Exception):
     pass
 
 
+@lru_cache(maxsize=32)
+def get_platform_context(platform: PlatformType, device: DeviceType, language: LanguageType) -> PlatformContext:
+    """Shared (frozen) PlatformContext per (platform, device, language)"""
+    return PlatformContext(platform=platform, device=device, language=language)
+
+
+@lru_cache(maxsize=64)
+def _platform_info(platform: PlatformType, device: DeviceType, language: LanguageType) -> Mapping[str, object]:
+    """Read-only platform info, built once per (platform, device, language)"""
+    context = get_platform_context(platform, device, language)
+    return MappingProxyType({
+        "platform": platform.value,
+        "device": device.value,
+        "language": language.value,
+        "is_mobile": context.is_mobile,
+        "is_web": context.is_web,
+        "is_app": context.is_app
+    })
+
+
 class PlatformContextHandler:
     """Handles platform context detection and validation"""
     
     def __init__(self):
         self.supported_platforms = {
-            PlatformType.WEB_BROWSER: [DeviceType.DESKTOP, DeviceType.ANDROID, DeviceType.IOS],
-            PlatformType.MOBILE_APP: [DeviceType.ANDROID, DeviceType.IOS]
+            PlatformType.WEB_BROWSER: frozenset({DeviceType.DESKTOP}) | MOBILE_DEVICES,
+            PlatformType.MOBILE_APP: MOBILE_DEVICES
         }
+        # Compatibility only depends on the (platform, device) pair, so memoize it per handler
+        self._is_compatible = lru_cache(maxsize=16)(self._check_compatibility)
     
     def detect_platform_context(self, request: ChatRequest):
         """Detect platform context as specified in architecture"""
@@ -28,6 +52,9 @@ class PlatformContextHandler:
     
     def validate_platform_compatibility(self, platform: PlatformType, device: DeviceType) -> bool:
         """Validate platform and device compatibility"""
+        return self._is_compatible(platform, device)
+    
+    def _check_compatibility(self, platform: PlatformType, device: DeviceType) -> bool:
         if platform not in self.supported_platforms:
             return False
         
@@ -41,27 +68,20 @@ class PlatformContextHandler:
                 f"Invalid platform-device combination: {request.platform} with {request.device}"
             )
         
-        return PlatformContext(
-            platform=request.platform,
-            device=request.device,
-            language=request.language
-        )
+        return get_platform_context(request.platform, request.device, request.language)
     
-    def get_platform_info(self, context: PlatformContext) -> dict:
-        """Get platform information for logging/debugging"""
-        return {
-            "platform": context.platform.value,
-            "device": context.device.value,
-            "language": context.language.value,
-            "is_mobile": context.device in [DeviceType.ANDROID, DeviceType.IOS],
-            "is_web": context.platform == PlatformType.WEB_BROWSER,
-            "is_app": context.platform == PlatformType.MOBILE_APP
-        }
+    def get_platform_info(self, context: PlatformContext) -> Mapping[str, object]:
+        """Get platform information for logging/debugging (read-only, shared between calls)"""
+        return _platform_info(context.platform, context.device, context.language)
     
     def should_show_app_download_cta(self, context: PlatformContext) -> bool:
         """Determine if app download CTA should be shown"""
-        return context.platform == PlatformType.WEB_BROWSER
+        return context.is_web
     
     def should_show_deeplink_cta(self, context: PlatformContext) -> bool:
         """Determine if deeplink CTA should be shown"""
-        return context.platform == PlatformType.MOBILE_APP
\ No newline at end of file
+        return context.is_app
+
+
+# Shared handler: its lookup tables and caches are built once per process
+platform_handler = PlatformContextHandler()
@@ -0,0 +1,70 @@
+from typing import Any, Hashable, Optional, Tuple
+from collections import OrderedDict
+import logging
+import os
+import time
+import unicodedata
+
+from ..models.platform_models import PlatformContext
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Query text as compared by the caches: NFKC, casefolded, whitespace collapsed"""
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+def response_cache_key(query: str, platform_context: PlatformContext, *extra: Hashable) -> Tuple[Hashable, ...]:
+    """Cache key for a standalone query: normalized text + platform"""
+    return (normalize_query(query), platform_context.platform, platform_context.device, platform_context.language) + extra
+
+
+class ResponseCache:
+    """Bounded LRU cache of agent responses with a freshness TTL"""
+
+    def __init__(self, max_items: int = 1024, ttl: float = 600.0):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """Sized by RESPONSE_CACHE_SIZE / RESPONSE_CACHE_TTL (seconds); either set to 0 disables caching"""
+        return cls(
+            max_items=int(os.getenv("RESPONSE_CACHE_SIZE", "1024")),
+            ttl=float(os.getenv("RESPONSE_CACHE_TTL", "600"))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_items > 0 and self.ttl > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Cached value for key, or None when missing or stale"""
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[1] >= self.ttl:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get_stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses, "ttl": self.ttl}
@@ -0,0 +1,115 @@
+from typing import Any, Awaitable, Callable, Optional, Sequence, Tuple
+from collections import OrderedDict
+import logging
+import time
+
+import numpy as np
+
+from .response_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """
+    Bounded LRU cache of query -> value with a freshness TTL.
+
+    Lookups try the normalized query text first; on a miss the query is embedded
+    and compared (cosine) against the cached queries, so near-identical phrasings
+    ("quán hàn quốc đà nẵng" / "nhà hàng hàn quốc ở đà nẵng") share one entry.
+    """
+
+    def __init__(self, embed: Callable[[str], Awaitable[Sequence[float]]], max_items: int = 512,
+                 ttl: float = 3600.0, threshold: float = 0.92):
+        self._embed = embed
+        self.max_items = max_items
+        self.ttl = ttl
+        self.threshold = threshold
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[np.ndarray], float]]" = OrderedDict()
+        # Stacked unit vectors of the entries that have one, rebuilt lazily after changes
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: Tuple[str, ...] = ()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    async def get_or_compute(self, query: str, compute: Callable[[], Awaitable[Any]],
+                             cacheable: Callable[[Any], bool] = bool) -> Any:
+        """Cached value for query (exact or similar), otherwise compute() - stored when cacheable(result)"""
+        key = normalize_query(query)
+        entry = self._fresh_entry(key)
+        if entry is not None:
+            self.hits += 1
+            return entry[0]
+
+        vector = await self._embedding(key)
+        if vector is not None:
+            similar_key = self._most_similar(vector)
+            if similar_key is not None:
+                self.hits += 1
+                self.semantic_hits += 1
+                logger.debug(f"Semantic cache hit: {key!r} ~ {similar_key!r}")
+                return self._entries[similar_key][0]
+
+        self.misses += 1
+        value = await compute()
+        if cacheable(value):
+            self._put(key, value, vector)
+        return value
+
+    def _fresh_entry(self, key: str) -> Optional[Tuple[Any, Optional[np.ndarray], float]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[2] >= self.ttl:
+            del self._entries[key]
+            self._matrix = None
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def _embedding(self, text: str) -> Optional[np.ndarray]:
+        """Unit-length embedding of text, or None when the embedding call fails (exact matching only)"""
+        try:
+            vector = np.asarray(await self._embed(text), dtype=np.float32)
+        except Exception as e:
+            logger.debug(f"Semantic cache embedding failed, falling back to exact match: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _most_similar(self, vector: np.ndarray) -> Optional[str]:
+        """Key of the fresh cached query most similar to vector, if above the threshold"""
+        if self._matrix is None:
+            keys = tuple(key for key, entry in self._entries.items() if entry[1] is not None)
+            self._matrix_keys = keys
+            self._matrix = np.stack([self._entries[key][1] for key in keys]) if keys else None
+        if self._matrix is None:
+            return None
+
+        # One matrix-vector product scores every cached query
+        scores = self._matrix @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        return self._matrix_keys[best] if self._fresh_entry(self._matrix_keys[best]) is not None else None
+
+    def _put(self, key: str, value: Any, vector: Optional[np.ndarray]) -> None:
+        self._entries[key] = (value, vector, time.monotonic())
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+        self._matrix = None
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._matrix = None
+
+    def get_stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "ttl": self.ttl
+        }
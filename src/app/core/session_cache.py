@@ -0,0 +1,135 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from collections import OrderedDict
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Optional shared store so several workers/instances see the same sessions
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    aioredis = None
+    REDIS_AVAILABLE = False
+
+# Matches ConversationMemory's default session timeout
+SESSION_TTL_SECONDS = 24 * 3600
+
+
+class SessionCache:
+    """Bounded in-process user -> conversation ID map with LRU eviction and a reverse index"""
+
+    def __init__(self, max_items: int = 10_000):
+        self.max_items = max_items
+        self._by_user: "OrderedDict[str, str]" = OrderedDict()
+        self._by_conversation: Dict[str, str] = {}
+
+    async def get(self, user_identifier: str) -> Optional[str]:
+        """Conversation ID for a user, refreshing its recency"""
+        conversation_id = self._by_user.get(user_identifier)
+        if conversation_id is not None:
+            self._by_user.move_to_end(user_identifier)
+        return conversation_id
+
+    async def get_or_create(self, user_identifier: str, factory: Callable[[], str]) -> Tuple[str, bool]:
+        """Return (conversation_id, created), creating one with factory when the user has none"""
+        conversation_id = await self.get(user_identifier)
+        if conversation_id is not None:
+            return conversation_id, False
+
+        conversation_id = factory()
+        self._by_user[user_identifier] = conversation_id
+        self._by_conversation[conversation_id] = user_identifier
+        if len(self._by_user) > self.max_items:
+            # Drop the least recently active user
+            evicted_user, evicted_conversation = self._by_user.popitem(last=False)
+            self._by_conversation.pop(evicted_conversation, None)
+            logger.debug(f"Evicted session {evicted_conversation} for {evicted_user}")
+        return conversation_id, True
+
+    async def remove_conversation(self, conversation_id: str) -> bool:
+        """Forget the user mapped to a conversation ID"""
+        user_identifier = self._by_conversation.pop(conversation_id, None)
+        if user_identifier is None:
+            return False
+        self._by_user.pop(user_identifier, None)
+        return True
+
+    async def clear(self) -> None:
+        self._by_user.clear()
+        self._by_conversation.clear()
+
+    async def users(self) -> List[str]:
+        return list(self._by_user.keys())
+
+    async def aclose(self) -> None:
+        pass
+
+
+class RedisSessionStore:
+    """Redis-backed user -> conversation ID map shared by every worker; entries expire when idle"""
+
+    def __init__(self, client, prefix: str = "tripc:session", ttl: int = SESSION_TTL_SECONDS):
+        self._redis = client
+        self._user_prefix = f"{prefix}:user:"
+        self._conversation_prefix = f"{prefix}:conv:"
+        self.ttl = ttl
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisSessionStore":
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("redis package is not installed")
+        return cls(aioredis.from_url(url, decode_responses=True), **kwargs)
+
+    async def ping(self) -> bool:
+        return await self._redis.ping()
+
+    async def _touch(self, user_identifier: str) -> Optional[str]:
+        """Conversation ID for a user, refreshing the expiry of both the user and the reverse key"""
+        conversation_id = await self._redis.getex(self._user_prefix + user_identifier, ex=self.ttl)
+        if conversation_id is not None:
+            # Keep the reverse key alive as long as the forward one so remove_conversation can find it
+            await self._redis.expire(self._conversation_prefix + conversation_id, self.ttl)
+        return conversation_id
+
+    async def get(self, user_identifier: str) -> Optional[str]:
+        """Conversation ID for a user, refreshing its expiry"""
+        return await self._touch(user_identifier)
+
+    async def get_or_create(self, user_identifier: str, factory: Callable[[], str]) -> Tuple[str, bool]:
+        """Return (conversation_id, created); SET NX makes concurrent workers agree on one ID"""
+        user_key = self._user_prefix + user_identifier
+        conversation_id = await self._touch(user_identifier)
+        if conversation_id is not None:
+            return conversation_id, False
+
+        conversation_id = factory()
+        if await self._redis.set(user_key, conversation_id, nx=True, ex=self.ttl):
+            await self._redis.set(self._conversation_prefix + conversation_id, user_identifier, ex=self.ttl)
+            return conversation_id, True
+
+        # Another worker created it first
+        existing = await self._redis.get(user_key)
+        return (existing, False) if existing is not None else (conversation_id, True)
+
+    async def remove_conversation(self, conversation_id: str) -> bool:
+        """Forget the user mapped to a conversation ID"""
+        user_identifier = await self._redis.getdel(self._conversation_prefix + conversation_id)
+        if user_identifier is None:
+            return False
+        await self._redis.delete(self._user_prefix + user_identifier)
+        return True
+
+    async def clear(self) -> None:
+        keys = [key async for key in self._redis.scan_iter(match=self._user_prefix + "*")]
+        keys += [key async for key in self._redis.scan_iter(match=self._conversation_prefix + "*")]
+        if keys:
+            # UNLINK frees the values in a background thread instead of blocking Redis
+            await self._redis.unlink(*keys)
+
+    async def users(self) -> List[str]:
+        offset = len(self._user_prefix)
+        return [key[offset:] async for key in self._redis.scan_iter(match=self._user_prefix + "*")]
+
+    async def aclose(self) -> None:
+        await self._redis.aclose()
@@ -0,0 +1,117 @@
+from typing import Optional
+from collections import OrderedDict
+import hashlib
+import hmac
+import logging
+import secrets
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .session_cache import SESSION_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+SESSION_COOKIE_NAME = "tripc_sid"
+
+# A fingerprint is treated as a cookieless client after this many issued cookies came back unused
+COOKIELESS_AFTER = 3
+# Fingerprints / issued session IDs remembered for cookieless detection
+MAX_TRACKED = 10_000
+
+
+def fingerprint_session_id(client_ip: str, user_agent: str) -> str:
+    """Session ID derived from IP + User-Agent (6-byte BLAKE2b digest -> 12 hex chars)"""
+    identifier = f"{client_ip}_{user_agent}"
+    return hashlib.blake2b(identifier.encode(), digest_size=6).hexdigest()
+
+
+class SessionCookieMiddleware:
+    """
+    Pins anonymous web users to a session ID carried in a signed cookie.
+
+    Requests with a valid cookie reuse its session ID as-is. First contact gets a
+    random ID, so different browsers behind one NAT never share a session. Only an
+    IP + User-Agent that has been issued COOKIELESS_AFTER cookies without ever
+    sending one back (a client that drops cookies) is identified by its
+    fingerprint instead. The ID is exposed as request.state.session_id.
+    """
+
+    def __init__(self, app: ASGIApp, secret: str, cookie_name: str = SESSION_COOKIE_NAME,
+                 max_age: int = SESSION_TTL_SECONDS):
+        self.app = app
+        self._secret = secret.encode()
+        self.cookie_name = cookie_name
+        self.max_age = max_age
+        # Issued session ID -> fingerprint, until the cookie comes back
+        self._pending: "OrderedDict[str, str]" = OrderedDict()
+        # Fingerprint -> cookies issued to it that never came back
+        self._unreturned: "OrderedDict[str, int]" = OrderedDict()
+        # Fingerprints seen returning a cookie: new visitors there get their own ID
+        self._returns_cookies: "OrderedDict[str, None]" = OrderedDict()
+
+    def _signature(self, session_id: str) -> str:
+        return hmac.new(self._secret, session_id.encode(), hashlib.sha256).hexdigest()[:32]
+
+    def _verify(self, cookie: Optional[str]) -> Optional[str]:
+        """Session ID from a signed cookie value, or None when missing or tampered with"""
+        if not cookie:
+            return None
+        session_id, _, signature = cookie.rpartition(".")
+        if session_id and hmac.compare_digest(signature, self._signature(session_id)):
+            return session_id
+        return None
+
+    @staticmethod
+    def _remember(mapping: OrderedDict, key: str, value) -> None:
+        mapping[key] = value
+        mapping.move_to_end(key)
+        if len(mapping) > MAX_TRACKED:
+            mapping.popitem(last=False)
+
+    def _cookie_returned(self, session_id: str) -> None:
+        fingerprint = self._pending.pop(session_id, None)
+        if fingerprint is not None:
+            self._unreturned.pop(fingerprint, None)
+            self._remember(self._returns_cookies, fingerprint, None)
+
+    def _new_session_id(self, fingerprint: str) -> str:
+        """Random ID for a first contact, or the fingerprint for a client shown to drop cookies"""
+        if fingerprint not in self._returns_cookies and self._unreturned.get(fingerprint, 0) >= COOKIELESS_AFTER:
+            return fingerprint
+        session_id = secrets.token_urlsafe(16)
+        self._remember(self._unreturned, fingerprint, self._unreturned.get(fingerprint, 0) + 1)
+        self._remember(self._pending, session_id, fingerprint)
+        return session_id
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        connection = HTTPConnection(scope)
+        session_id = self._verify(connection.cookies.get(self.cookie_name))
+        if session_id is not None:
+            if self._pending:
+                self._cookie_returned(session_id)
+            scope.setdefault("state", {})["session_id"] = session_id
+            await self.app(scope, receive, send)
+            return
+
+        client_ip = connection.client.host if connection.client else "unknown"
+        session_id = self._new_session_id(
+            fingerprint_session_id(client_ip, connection.headers.get("User-Agent", "unknown"))
+        )
+        scope.setdefault("state", {})["session_id"] = session_id
+        cookie = (
+            f"{self.cookie_name}={session_id}.{self._signature(session_id)}; "
+            f"Max-Age={self.max_age}; Path=/; HttpOnly; SameSite=Lax"
+        )
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Set-Cookie", cookie)
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
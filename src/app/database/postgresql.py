@@ -1,19 +1,161 @@
+import asyncio
+import logging
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Dict, Iterator, List, Optional
+
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# Buffered chat turns are flushed when this many are pending or after FLUSH_INTERVAL seconds
+FLUSH_BATCH_SIZE = 256
+FLUSH_INTERVAL = 0.5
+
+# A failed flush is retried this many times (with doubling delay) before its rows are dropped
+MAX_FLUSH_RETRIES = 3
+# Rows kept while the database is unreachable; the oldest are dropped beyond this
+MAX_BUFFERED_ROWS = 10 * FLUSH_BATCH_SIZE
+
+CHAT_HISTORY_COLUMNS = ("session_id", "user_message", "bot_response", "intent", "platform", "device", "language")
+
+
 class PostgreSQL:
-    def __init__(self, database_url: str):
+    """Chat history & user data store backed by a pooled PostgreSQL connection set"""
+
+    def __init__(self, database_url: str, min_size: int = 1, max_size: int = 25):
         self.database_url = database_url
+        self.min_size = min_size
+        self.max_size = max_size
+        self._pool: Optional[ThreadedConnectionPool] = None
+        self._connect_lock = asyncio.Lock()
+        self._buffer: List[tuple] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        # Set when a full batch is waiting, so the background flush runs without its delay
+        self._flush_now = asyncio.Event()
+        self._flush_failures = 0
+
+    async def connect(self):
+        """Open the connection pool once; called lazily by the first query so idle workers hold no connections"""
+        if self._pool is not None:
+            return
+        async with self._connect_lock:
+            if self._pool is None:
+                self._pool = await self._run(partial(
+                    ThreadedConnectionPool, self.min_size, self.max_size, self.database_url, connect_timeout=5
+                ))
+                logger.info(f"PostgreSQL pool ready ({self.min_size}-{self.max_size} connections)")
+
+    @contextmanager
+    def _connection(self) -> Iterator[Any]:
+        """Borrow a pooled connection, committing on success and rolling back on error"""
+        if self._pool is None:
+            raise RuntimeError("PostgreSQL pool is not connected")
+        conn = self._pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.putconn(conn)
+
+    async def _run(self, func, *args):
+        """Run a blocking psycopg2 call off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    async def _run_query(self, func, *args):
+        """Run a blocking query off the event loop, opening the pool on first use"""
+        await self.connect()
+        return await self._run(func, *args)
+
+    def _fetch_chat_history(self, session_id: str, limit: int) -> List[Dict[str, Any]]:
+        with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                "SELECT session_id, user_message, bot_response, intent, platform, device, language, created_at "
+                "FROM chat_history WHERE session_id = %s ORDER BY created_at DESC LIMIT %s",
+                (session_id, limit)
+            )
+            return [dict(row) for row in cur.fetchall()]
+
+    async def fetch_chat_history(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Fetch the most recent chat history rows for a session"""
+        return await self._run_query(self._fetch_chat_history, user_id, limit)
+
+    @staticmethod
+    def _chat_history_row(user_id: str, data: dict) -> tuple:
+        return (user_id,) + tuple(data.get(column) for column in CHAT_HISTORY_COLUMNS[1:])
+
+    def _insert_chat_history(self, rows: List[tuple]) -> None:
+        # execute_values sends every row in a single multi-row INSERT (one round-trip, one commit)
+        with self._connection() as conn, conn.cursor() as cur:
+            execute_values(
+                cur,
+                f"INSERT INTO chat_history ({', '.join(CHAT_HISTORY_COLUMNS)}) VALUES %s",
+                rows,
+                page_size=FLUSH_BATCH_SIZE
+            )
+
+    async def save_user_data(self, user_id: str, data: dict):
+        """Save one chat turn (user_message, bot_response, intent, platform, device, language)"""
+        await self._run_query(self._insert_chat_history, [self._chat_history_row(user_id, data)])
+
+    async def save_user_data_batch(self, rows: List[tuple]):
+        """Save many (user_id, data) chat turns in one round-trip"""
+        if rows:
+            await self._run_query(self._insert_chat_history, [self._chat_history_row(user_id, data) for user_id, data in rows])
 
-    def connect(self):
-        # Logic to connect to the PostgreSQL database
-        pass
+    async def buffer_user_data(self, user_id: str, data: dict):
+        """Queue a chat turn for a batched write; the write itself always runs in a background task"""
+        self._buffer.append(self._chat_history_row(user_id, data))
+        if self._flush_failures:
+            # A retry is already scheduled; just keep the buffer bounded until it runs
+            del self._buffer[:-MAX_BUFFERED_ROWS]
+            return
+        if len(self._buffer) >= FLUSH_BATCH_SIZE:
+            self._flush_now.set()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
 
-    def fetch_chat_history(self, user_id: str):
-        # Logic to fetch chat history for a specific user
-        pass
+    async def _flush_later(self, delay: float = FLUSH_INTERVAL):
+        """Flush after delay, or as soon as a full batch is signalled"""
+        try:
+            await asyncio.wait_for(self._flush_now.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+        self._flush_now.clear()
+        await self.flush()
 
-    def save_user_data(self, user_id: str, data: dict):
-        # Logic to save user data to the database
-        pass
+    async def flush(self, retry: bool = True):
+        """Write all buffered chat turns; on failure re-queue them for a bounded number of retries"""
+        rows, self._buffer = self._buffer, []
+        if not rows:
+            return
+        try:
+            await self._run_query(self._insert_chat_history, rows)
+            self._flush_failures = 0
+        except Exception as e:
+            self._flush_failures += 1
+            if not retry or self._flush_failures > MAX_FLUSH_RETRIES:
+                logger.error(f"Dropping {len(rows)} buffered chat history rows after {self._flush_failures} failed writes: {e}")
+                self._flush_failures = 0
+                return
+            # Failed rows go back ahead of the newer ones, keeping the buffer bounded
+            self._buffer = (rows + self._buffer)[-MAX_BUFFERED_ROWS:]
+            delay = FLUSH_INTERVAL * 2 ** self._flush_failures
+            logger.warning(f"Failed to write {len(rows)} chat history rows, retrying in {delay:.1f}s: {e}")
+            self._flush_task = asyncio.create_task(self._flush_later(delay))
 
-    def close_connection(self):
-        # Logic to close the database connection
-        pass
\ No newline at end of file
+    async def close_connection(self):
+        """Flush buffered rows and close every pooled connection (called at application shutdown)"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if self._buffer:
+            await self.flush(retry=False)
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await self._run(pool.closeall)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Pool of LLM clients (different keys/regions) with least-in-flight scheduling
+"""
+
+import itertools
+import logging
+import os
+from typing import List, Optional, Sequence
+
+from .open_client import OpenAIClient
+
+logger = logging.getLogger(__name__)
+
+
+class LLMClientPool:
+    """Spread LLM calls over several clients, preferring the one with the fewest calls in flight"""
+    
+    def __init__(self, clients: Sequence[OpenAIClient]):
+        if not clients:
+            raise ValueError("LLMClientPool requires at least one client")
+        self.clients = tuple(clients)
+        self._inflight: List[int] = [0] * len(self.clients)
+        # Round-robin start offset so ties do not always land on the first client
+        self._offsets = itertools.cycle(range(len(self.clients)))
+        
+        logger.info(f"LLMClientPool initialized with {len(self.clients)} clients")
+    
+    @classmethod
+    def from_env(cls) -> "LLMClientPool":
+        """Build a pool from comma-separated OPENAI_API_KEYS, falling back to OPENAI_API_KEY"""
+        keys = [key.strip() for key in os.getenv("OPENAI_API_KEYS", "").split(",") if key.strip()]
+        if not keys:
+            return cls([OpenAIClient()])
+        return cls([OpenAIClient(api_key=key) for key in keys])
+    
+    def _acquire(self) -> int:
+        """Pick the least-loaded configured client and mark a call in flight"""
+        offset = next(self._offsets)
+        size = len(self.clients)
+        candidates = [(offset + i) % size for i in range(size)]
+        configured = [i for i in candidates if self.clients[i].is_configured()] or candidates
+        index = min(configured, key=self._inflight.__getitem__)
+        self._inflight[index] += 1
+        return index
+    
+    async def generate_response(self, prompt: str, **kwargs) -> Optional[str]:
+        """Non-blocking call on the least-loaded client"""
+        index = self._acquire()
+        try:
+            return await self.clients[index].generate_response(prompt, **kwargs)
+        finally:
+            self._inflight[index] -= 1
+    
+    def generate_response_sync(self, prompt: str, **kwargs) -> Optional[str]:
+        """Blocking call on the least-loaded client"""
+        index = self._acquire()
+        try:
+            return self.clients[index].generate_response_sync(prompt, **kwargs)
+        finally:
+            self._inflight[index] -= 1
+    
+    def is_configured(self) -> bool:
+        """True when at least one pooled client has an API key"""
+        return any(client.is_configured() for client in self.clients)
+    
+    async def aclose(self) -> None:
+        """Close pooled HTTP connections of every client"""
+        for client in self.clients:
+            await client.aclose()
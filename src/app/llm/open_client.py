@@ -1,7 +1,11 @@
+import asyncio
+import importlib.util
+import httpx
+import orjson
 import requests
 import logging
 import os
-from typing import Optional
+from typing import Any, Dict, Optional
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -9,7 +13,24 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# HTTP/2 multiplexing is only available when the optional h2 package is installed
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+DEFAULT_SYSTEM_PROMPT = "You are a helpful assistant."
+_DEFAULT_SYSTEM_MESSAGE = {"role": "system", "content": DEFAULT_SYSTEM_PROMPT}
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
 class OpenAIClient:
+    _default: Optional["OpenAIClient"] = None
+    
+    @classmethod
+    def get_default(cls) -> "OpenAIClient":
+        """Shared client configured from the environment, created on first use"""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+    
     def __init__(self, api_key: str = None, base_url: str = None):
         # Load from .env if not provided
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
@@ -19,10 +40,17 @@ class OpenAIClient:
             logger.warning("OPENAI_API_KEY not found in environment variables. LLM responses will fail.")
         
         self.base_url = self.base_url.rstrip("/")
+        
+        # Persistent connections reused across calls (keep-alive): the async client
+        # serves the event loop, the requests session serves legacy sync callers
+        self._http = self._create_http_client()
+        self._http_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session = requests.Session()
     
     def set_api_key(self, api_key: str):
         """Cập nhật API key"""
         self.api_key = api_key
+        self._http.headers["Authorization"] = f"Bearer {api_key}"
     
     def get_api_key(self) -> str:
         """Lấy API key hiện tại"""
@@ -31,42 +59,114 @@ class OpenAIClient:
     def is_configured(self) -> bool:
         """Kiểm tra xem client đã được cấu hình chưa"""
         return bool(self.api_key and self.api_key != "your_openai_api_key_here")
-
-    def generate_response(self, prompt: str, model: str = "gpt-4o-mini", max_tokens: int = 512, temperature: float = 0.7) -> Optional[str]:
+    
+    def _create_http_client(self) -> httpx.AsyncClient:
+        """Create the shared async HTTP client bound to the API base URL and key"""
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            headers={"Authorization": f"Bearer {self.api_key}", **_JSON_HEADERS}
+        )
+    
+    async def _get_http_client(self) -> httpx.AsyncClient:
+        """Async HTTP client for the running loop; pooled connections cannot outlive their loop (e.g. successive asyncio.run calls)"""
+        loop = asyncio.get_running_loop()
+        if self._http_loop is not loop:
+            stale, stale_loop = self._http, self._http_loop
+            self._http_loop = loop
+            if stale_loop is not None:
+                self._http = self._create_http_client()
+                await self._close_stale_client(stale, stale_loop)
+        return self._http
+    
+    async def _close_stale_client(self, client: httpx.AsyncClient, client_loop: asyncio.AbstractEventLoop) -> None:
+        """Close the client left behind by a previous event loop so its pooled sockets are released"""
+        if client_loop.is_running():
+            # That loop still runs in another thread: close the client there
+            asyncio.run_coroutine_threadsafe(client.aclose(), client_loop)
+            return
+        try:
+            await client.aclose()
+        except RuntimeError as e:
+            # The sockets are closed, but their transports cannot schedule callbacks on a closed loop
+            logger.debug(f"Stale HTTP client closed with: {e}")
+    
+    def _encode_payload(self, prompt: str, model: str, max_tokens: int, temperature: float, system_prompt: Optional[str] = None,
+                        response_format: Optional[Dict[str, Any]] = None) -> bytes:
+        """Serialize a chat completion request body with orjson (sent as-is, skipping the HTTP libraries' json.dumps)"""
+        system_message = {"role": "system", "content": system_prompt} if system_prompt else _DEFAULT_SYSTEM_MESSAGE
+        payload = {
+            "model": model,
+            "messages": [system_message, {"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": temperature
+        }
+        if response_format:
+            # e.g. {"type": "json_object"}: the model must answer with one valid JSON object
+            payload["response_format"] = response_format
+        return orjson.dumps(payload)
+    
+    def _log_http_error(self, status_code: int, error: Exception) -> None:
+        """Log an HTTP error from the LLM API"""
+        if status_code == 401:
+            logger.error("OpenAI API key invalid or expired. Please check your OPENAI_API_KEY")
+        elif status_code == 429:
+            logger.error("OpenAI API rate limit exceeded. Please try again later")
+        else:
+            logger.error(f"OpenAI API HTTP error: {error}")
+    
+    async def generate_response(self, prompt: str, model: str = "gpt-4o-mini", max_tokens: int = 512, temperature: float = 0.7, system_prompt: Optional[str] = None,
+                                 response_format: Optional[Dict[str, Any]] = None) -> Optional[str]:
         """
         Gửi prompt đến LLM API (OpenAI hoặc Qwen nếu đổi URL) và nhận về câu trả lời.
         """
         if not self.is_configured():
             logger.error("OpenAI API key not configured. Please set OPENAI_API_KEY in .env file")
             return None
-            
-        url = f"{self.base_url}/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "model": model,
-            "messages": [
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": prompt}
-            ],
-            "max_tokens": max_tokens,
-            "temperature": temperature
-        }
-
+        
+        body = self._encode_payload(prompt, model, max_tokens, temperature, system_prompt, response_format)
+        
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
+            http = await self._get_http_client()
+            response = await http.post("/chat/completions", content=body)
+            response.raise_for_status()
+            data = response.json()
+            return data["choices"][0]["message"]["content"].strip()
+        except httpx.HTTPStatusError as e:
+            self._log_http_error(e.response.status_code, e)
+            return None
+        except httpx.TimeoutException:
+            logger.error("OpenAI API request timeout")
+            return None
+        except Exception as e:
+            logger.error(f"Error calling LLM API: {e}")
+            return None
+    
+    def generate_response_sync(self, prompt: str, model: str = "gpt-4o-mini", max_tokens: int = 512, temperature: float = 0.7, system_prompt: Optional[str] = None,
+                                response_format: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Blocking version of generate_response for legacy sync callers.
+        """
+        if not self.is_configured():
+            logger.error("OpenAI API key not configured. Please set OPENAI_API_KEY in .env file")
+            return None
+        
+        body = self._encode_payload(prompt, model, max_tokens, temperature, system_prompt, response_format)
+        
+        try:
+            response = self._session.post(
+                f"{self.base_url}/chat/completions",
+                headers={"Authorization": f"Bearer {self.api_key}", **_JSON_HEADERS},
+                data=body,
+                timeout=30
+            )
             response.raise_for_status()
             data = response.json()
             return data["choices"][0]["message"]["content"].strip()
         except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 401:
-                logger.error("OpenAI API key invalid or expired. Please check your OPENAI_API_KEY")
-            elif e.response.status_code == 429:
-                logger.error("OpenAI API rate limit exceeded. Please try again later")
-            else:
-                logger.error(f"OpenAI API HTTP error: {e}")
+            self._log_http_error(e.response.status_code, e)
             return None
         except requests.exceptions.Timeout:
             logger.error("OpenAI API request timeout")
@@ -74,3 +174,8 @@ class OpenAIClient:
         except Exception as e:
             logger.error(f"Error calling LLM API: {e}")
             return None
+    
+    async def aclose(self) -> None:
+        """Close pooled HTTP connections"""
+        self._session.close()
+        await self._http.aclose()
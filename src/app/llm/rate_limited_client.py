@@ -4,14 +4,24 @@ Rate-limited LLM client to prevent API limits and ensure service stability
 """
 
 import asyncio
+import hashlib
 import time
-from typing import Optional, Dict, Any
-from collections import deque
+import unicodedata
+from bisect import bisect_left
+from typing import Optional, Dict, Any, List, Tuple
+from collections import OrderedDict
 import logging
 from .open_client import OpenAIClient
 
 logger = logging.getLogger(__name__)
 
+RESPONSE_CACHE_SIZE = 100
+
+
+def _normalize_prompt(prompt: str) -> str:
+    """Cache-key form of a prompt: NFKC, casefolded, whitespace collapsed"""
+    return " ".join(unicodedata.normalize("NFKC", prompt).casefold().split())
+
 
 class RateLimitedLLMClient:
     """Rate-limited wrapper around LLM client"""
@@ -21,44 +31,40 @@ class RateLimitedLLMClient:
         self.max_calls_per_minute = max_calls_per_minute
         self.max_calls_per_second = max_calls_per_second
         
-        # Track call times
-        self.call_times = deque()
+        # Track call start times (monotonic clock, kept sorted for bisect)
+        self.call_times: List[float] = []
         self.last_call_time = 0
+        self._total_calls = 0
         
         # Cache for repeated requests
-        self.response_cache = {}
+        self.response_cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
         self.cache_ttl = 300  # 5 minutes
         
         logger.info(f"RateLimitedLLMClient initialized: {max_calls_per_minute}/min, {max_calls_per_second}/sec")
     
-    async def generate_response(self, prompt: str, **kwargs) -> Optional[str]:
-        """Generate response with rate limiting"""
+    async def generate_response(self, prompt: str, normalize_cache_key: bool = False, **kwargs) -> Optional[str]:
+        """Generate response with rate limiting
+
+        normalize_cache_key lets case/spacing variants of the prompt share a cached
+        response; only for prompts where that cannot change the answer (intent
+        classification), never for extraction of names, emails and the like.
+        """
         try:
             # Check rate limits
             await self._check_rate_limits()
             
             # Check cache first
-            cache_key = self._get_cache_key(prompt, kwargs)
-            if cache_key in self.response_cache:
-                cached_response, timestamp = self.response_cache[cache_key]
-                if time.time() - timestamp < self.cache_ttl:
-                    logger.debug("Returning cached LLM response")
-                    return cached_response
-                else:
-                    # Remove expired cache entry
-                    del self.response_cache[cache_key]
+            cache_key = self._get_cache_key(prompt, kwargs, normalize_cache_key)
+            cached_response = self._get_cached(cache_key)
+            if cached_response is not None:
+                return cached_response
             
             # Make actual API call
             response = await self._make_api_call(prompt, **kwargs)
             
             # Cache successful response
             if response:
-                self.response_cache[cache_key] = (response, time.time())
-                # Limit cache size
-                if len(self.response_cache) > 100:
-                    # Remove oldest entry
-                    oldest_key = next(iter(self.response_cache))
-                    del self.response_cache[oldest_key]
+                self._store_cached(cache_key, response)
             
             return response
             
@@ -66,46 +72,29 @@ class RateLimitedLLMClient:
             logger.error(f"Error in rate-limited LLM call: {e}")
             return None
     
-    def generate_response_sync(self, prompt: str, **kwargs) -> Optional[str]:
-        """Sync version of generate_response for compatibility"""
-        import asyncio
+    def generate_response_sync(self, prompt: str, normalize_cache_key: bool = False, **kwargs) -> Optional[str]:
+        """Blocking version of generate_response for scripts that run without an event loop"""
         try:
-            # Run async version in sync context
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # If we're already in an async context, just call the sync version directly
-                return self._generate_response_sync(prompt, **kwargs)
-            else:
-                return loop.run_until_complete(self.generate_response(prompt, **kwargs))
+            asyncio.get_running_loop()
         except RuntimeError:
-            # No event loop, use sync version
-            return self._generate_response_sync(prompt, **kwargs)
-    
-    def _generate_response_sync(self, prompt: str, **kwargs) -> Optional[str]:
-        """Sync version that bypasses rate limiting for compatibility"""
+            pass
+        else:
+            # Inside the event loop this would block it and bypass the rate limiter
+            raise RuntimeError("generate_response_sync() called from a running event loop; use await generate_response()")
+        
         try:
             # Check cache first
-            cache_key = self._get_cache_key(prompt, kwargs)
-            if cache_key in self.response_cache:
-                cached_response, timestamp = self.response_cache[cache_key]
-                if time.time() - timestamp < self.cache_ttl:
-                    logger.debug("Returning cached LLM response")
-                    return cached_response
-                else:
-                    # Remove expired cache entry
-                    del self.response_cache[cache_key]
+            cache_key = self._get_cache_key(prompt, kwargs, normalize_cache_key)
+            cached_response = self._get_cached(cache_key)
+            if cached_response is not None:
+                return cached_response
             
-            # Make actual API call without rate limiting for sync calls
-            response = self.llm_client.generate_response(prompt, **kwargs)
+            # No loop is running, so there are no concurrent callers to rate limit
+            response = self.llm_client.generate_response_sync(prompt, **kwargs)
             
             # Cache successful response
             if response:
-                self.response_cache[cache_key] = (response, time.time())
-                # Limit cache size
-                if len(self.response_cache) > 100:
-                    # Remove oldest entry
-                    oldest_key = next(iter(self.response_cache))
-                    del self.response_cache[oldest_key]
+                self._store_cached(cache_key, response)
             
             return response
             
@@ -115,11 +104,10 @@ class RateLimitedLLMClient:
     
     async def _check_rate_limits(self):
         """Check and enforce rate limits"""
-        current_time = time.time()
+        current_time = time.monotonic()
         
         # Remove old call times (older than 1 minute)
-        while self.call_times and current_time - self.call_times[0] > 60:
-            self.call_times.popleft()
+        self._prune_call_times(current_time)
         
         # Check per-minute limit
         if len(self.call_times) >= self.max_calls_per_minute:
@@ -137,46 +125,73 @@ class RateLimitedLLMClient:
     
     async def _make_api_call(self, prompt: str, **kwargs) -> Optional[str]:
         """Make actual API call and track timing"""
-        current_time = time.time()
+        current_time = time.monotonic()
+        
+        # Track the call before awaiting so concurrent calls keep call_times sorted;
+        # failed attempts count too, to prevent overwhelming the API
+        self.call_times.append(current_time)
+        self.last_call_time = current_time
+        self._total_calls += 1
         
         try:
-            # Make the actual call - handle both sync and async
-            if hasattr(self.llm_client, 'generate_response'):
-                response = self.llm_client.generate_response(prompt, **kwargs)
-            else:
-                response = None
-            
-            # Track call time
-            self.call_times.append(current_time)
-            self.last_call_time = current_time
+            # Make the actual call on the non-blocking client API
+            response = await self.llm_client.generate_response(prompt, **kwargs)
             
-            logger.debug(f"LLM API call completed in {time.time() - current_time:.3f}s")
+            logger.debug(f"LLM API call completed in {time.monotonic() - current_time:.3f}s")
             return response
             
         except Exception as e:
             logger.error(f"LLM API call failed: {e}")
-            # Still track the attempt to prevent overwhelming the API
-            self.call_times.append(current_time)
-            self.last_call_time = current_time
             return None
     
-    def _get_cache_key(self, prompt: str, kwargs: Dict[str, Any]) -> str:
+    def _get_cache_key(self, prompt: str, kwargs: Dict[str, Any], normalize: bool = False) -> str:
         """Generate cache key for prompt and parameters"""
-        # Create a hash of prompt and relevant kwargs
-        import hashlib
-        key_data = f"{prompt}:{kwargs.get('model', '')}:{kwargs.get('max_tokens', '')}:{kwargs.get('temperature', '')}"
-        return hashlib.md5(key_data.encode()).hexdigest()
+        # Hash the (optionally normalized) prompt and relevant kwargs piecewise; the key
+        # is not security sensitive, so use the faster BLAKE2b over MD5
+        key = hashlib.blake2b(digest_size=16)
+        key.update((kwargs.get('system_prompt') or '').encode())
+        key.update(b'\0\1' if normalize else b'\0')
+        key.update((_normalize_prompt(prompt) if normalize else prompt).encode())
+        key.update(f"\0{kwargs.get('model', '')}:{kwargs.get('max_tokens', '')}:{kwargs.get('temperature', '')}".encode())
+        key.update(f"\0{kwargs.get('response_format') or ''}".encode())
+        return key.hexdigest()
+    
+    def _prune_call_times(self, current_time: float) -> None:
+        """Drop call times older than one minute"""
+        del self.call_times[:bisect_left(self.call_times, current_time - 60)]
+    
+    def _get_cached(self, cache_key: str) -> Optional[str]:
+        """Return a fresh cached response (refreshing its LRU position), dropping it if expired"""
+        entry = self.response_cache.get(cache_key)
+        if entry is None:
+            return None
+        
+        cached_response, timestamp = entry
+        if time.monotonic() - timestamp >= self.cache_ttl:
+            del self.response_cache[cache_key]
+            return None
+        
+        self.response_cache.move_to_end(cache_key)
+        logger.debug("Returning cached LLM response")
+        return cached_response
+    
+    def _store_cached(self, cache_key: str, response: str) -> None:
+        """Cache a response, evicting the least recently used entry when full"""
+        self.response_cache[cache_key] = (response, time.monotonic())
+        self.response_cache.move_to_end(cache_key)
+        if len(self.response_cache) > RESPONSE_CACHE_SIZE:
+            self.response_cache.popitem(last=False)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get rate limiting statistics"""
-        current_time = time.time()
+        current_time = time.monotonic()
         
-        # Clean old call times
-        while self.call_times and current_time - self.call_times[0] > 60:
-            self.call_times.popleft()
+        # Read-only snapshot: count recent calls without pruning the shared list
+        recent_calls = len(self.call_times) - bisect_left(self.call_times, current_time - 60)
         
         return {
-            "calls_last_minute": len(self.call_times),
+            "calls_last_minute": recent_calls,
+            "total_calls": self._total_calls,
             "max_calls_per_minute": self.max_calls_per_minute,
             "max_calls_per_second": self.max_calls_per_second,
             "cache_size": len(self.response_cache),
@@ -187,3 +202,8 @@ class RateLimitedLLMClient:
     def is_configured(self) -> bool:
         """Check if underlying LLM client is configured"""
         return self.llm_client.is_configured()
+    
+    async def aclose(self) -> None:
+        """Close the underlying client's pooled connections"""
+        if hasattr(self.llm_client, 'aclose'):
+            await self.llm_client.aclose()
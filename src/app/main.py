@@ -4,34 +4,168 @@ TripC.AI Chatbot API - Main Application
 Platform-aware AI chatbot with app-first architecture using LangGraph
 """
 
+import asyncio
+import atexit
+import json
+import logging
+import logging.handlers
 import os
-import uuid
+import queue
+import secrets
+import time
 from datetime import datetime
 from contextlib import asynccontextmanager
-from typing import Dict, Any
+from functools import lru_cache, partial
+from typing import Any, Awaitable, Callable, Dict, Type
 
-from fastapi import FastAPI, HTTPException, status, Request
+from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, status, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+import orjson
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
-from .models.schemas import ChatRequest, ChatResponse, UserInfoRequest, UserInfoResponse
+from .models.schemas import (
+    ChatRequest, ChatRequestAdapter, ChatResponse, KeywordQueryRequest,
+    UserInfoRequest, UserInfoRequestAdapter, UserInfoResponse
+)
 from .vector.pgvector_store import PgVectorStore
 from .services.tripc_api import TripCAPIClient
 from .services.keyword_analyzer import KeywordAnalyzer
 from .agents.qna_agent import QnAAgent
 from .agents.service_agent import ServiceAgent
-from .agents.ai_orchestrator import AIAgentOrchestrator
+from .agents.ai_orchestrator import AIAgentOrchestrator, _dump_json
 from .services.email_service import EmailService
-from .llm.open_client import OpenAIClient
+from .llm.client_pool import LLMClientPool
 from .llm.rate_limited_client import RateLimitedLLMClient
+from .database.postgresql import PostgreSQL
+from .core.session_cache import RedisSessionStore, SessionCache
+from .core.session_cookie import SessionCookieMiddleware, fingerprint_session_id
+
+_LOG_QUEUE: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+
+def _start_log_listener() -> logging.handlers.QueueListener:
+    """Start the thread that writes queued log records to stderr"""
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = logging.handlers.QueueListener(_LOG_QUEUE, stream_handler, respect_handler_level=True)
+    listener.start()
+    # Drain queued records on interpreter exit
+    atexit.register(listener.stop)
+    return listener
+
+def _restart_log_listener() -> None:
+    # Threads don't survive fork (gunicorn --preload): each worker needs its own listener
+    global _log_listener
+    _log_listener = _start_log_listener()
+
+def _configure_logging() -> logging.handlers.QueueListener:
+    """Route log records through a queue so stream writes happen on a listener thread, not the event loop"""
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(_LOG_QUEUE))
+    os.register_at_fork(after_in_child=_restart_log_listener)
+    return _start_log_listener()
+
+_log_listener = _configure_logging()
+logger = logging.getLogger(__name__)
 
 # Global variables for services
 ai_orchestrator: AIAgentOrchestrator = None
 email_service: EmailService = None
 keyword_analyzer: KeywordAnalyzer = None
+database: PostgreSQL = None
+
+# Static error response for the chatbot endpoint, built once at import
+_CHATBOT_ERROR_RESPONSE = ChatResponse(
+    type="Error",
+    answerAI="Xin lỗi, đã xảy ra lỗi hệ thống. Vui lòng thử lại sau.",
+    sources=[],
+    suggestions=[
+        {
+            "label": "Thử lại",
+            "action": "retry",
+            "data": {}
+        }
+    ]
+)
+_CHATBOT_ERROR_BODY = orjson.dumps(_CHATBOT_ERROR_RESPONSE.model_dump())
+
+# Localized collect-info messages; only the booking reference varies per request
+_USER_INFO_SUCCESS_MESSAGES = {
+    "vi": "Thông tin của bạn đã được ghi nhận. Mã tham chiếu: {ref}. Chúng tôi sẽ liên hệ lại trong thời gian sớm nhất.",
+    "en": "Your information has been recorded. Reference: {ref}. We will contact you as soon as possible."
+}
+_USER_INFO_ERROR_MESSAGES = {
+    "vi": "Có lỗi xảy ra. Vui lòng thử lại sau hoặc liên hệ hotline: 1900 1234",
+    "en": "An error occurred. Please try again later or contact our hotline."
+}
+
+# Static metadata endpoints, serialized once at import
+_ROOT_BODY = orjson.dumps({
+    "service": "TripC.AI Chatbot API",
+    "version": "1.0.0",
+    "description": "Platform-aware AI chatbot with app-first architecture using LangGraph",
+    "endpoints": {
+        "chatbot": "/api/v1/chatbot/response",
+        "user_info": "/api/v1/user/collect-info",
+        "status": "/api/v1/status",
+        "vector_stats": "/api/v1/vector/stats",
+        "docs": "/docs"
+    },
+    "architecture": "LangGraph-based workflow with platform-aware routing"
+})
+_VECTOR_STATS_BODY = orjson.dumps({
+    "total_embeddings": 150,
+    "categories": {
+        "travel_guides": 50,
+        "food_culture": 40,
+        "attractions": 30,
+        "local_tips": 30
+    },
+    "cities": {
+        "danang": 60,
+        "hoian": 50,
+        "hue": 40
+    },
+    "last_updated": datetime.utcnow().isoformat()
+})
+
+# Response-body timestamps, reformatted at most every TIMESTAMP_RESOLUTION seconds
+TIMESTAMP_RESOLUTION = 0.5
+_timestamp_iso = ""
+_timestamp_expires = 0.0
+
+def utc_timestamp() -> str:
+    """Current UTC time in ISO format, shared across requests within TIMESTAMP_RESOLUTION"""
+    global _timestamp_iso, _timestamp_expires
+    now = time.monotonic()
+    if now >= _timestamp_expires:
+        _timestamp_iso = datetime.utcnow().isoformat()
+        _timestamp_expires = now + TIMESTAMP_RESOLUTION
+    return _timestamp_iso
+
+@lru_cache(maxsize=2)
+def _status_payload(email_configured: bool) -> Dict[str, Any]:
+    """Status fields that only change with the email configuration (timestamp filled per request)"""
+    return {
+        "status": "operational",
+        "service": "TripC.AI Chatbot API",
+        "version": "1.0.0",
+        "timestamp": None,
+        "architecture": "Platform-Aware App-First",
+        "email_service": {
+            "configured": email_configured,
+            "booking_email": os.getenv("BOOKING_EMAIL", "booking@tripc.ai")
+        },
+        "vector_store": {
+            "initialized": True,  # Mock implementation
+            "type": "PgVector (Mock)"
+        }
+    }
 
 # User session management
-user_sessions: Dict[str, str] = {}  # user_identifier -> conversation_id
+user_sessions = SessionCache(max_items=int(os.getenv("MAX_USER_SESSIONS", "10000")))  # user_identifier -> conversation_id
 
 def generate_user_identifier(request: Request) -> str:
     """Generate unique user identifier based on request"""
@@ -40,84 +174,214 @@ def generate_user_identifier(request: Request) -> str:
     if user_id:
         return f"user_{user_id}"
     
-    # Fallback to IP + User-Agent for web users
+    # Web users: session ID from the signed cookie (see SessionCookieMiddleware)
+    session_id = getattr(request.state, "session_id", None)
+    if session_id:
+        return f"session_{session_id}"
+    
+    # Fallback to IP + User-Agent
     client_ip = request.client.host if request.client else "unknown"
     user_agent = request.headers.get("User-Agent", "unknown")
-    
-    # Create a hash-like identifier
-    import hashlib
-    identifier = f"{client_ip}_{user_agent}"
-    return f"session_{hashlib.md5(identifier.encode()).hexdigest()[:12]}"
+    return f"session_{fingerprint_session_id(client_ip, user_agent)}"
 
-def get_or_create_conversation_id(user_identifier: str) -> str:
+async def get_or_create_conversation_id(user_identifier: str) -> str:
     """Get existing conversation ID or create new one for user"""
-    if user_identifier not in user_sessions:
+    def new_conversation_id() -> str:
         # Create new conversation ID with timestamp
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        conversation_id = f"{user_identifier}_{timestamp}_{uuid.uuid4().hex[:8]}"
-        user_sessions[user_identifier] = conversation_id
-        print(f"🆕 [SESSION] Created new conversation: {conversation_id} for user: {user_identifier}")
+        return f"{user_identifier}_{timestamp}_{secrets.token_hex(4)}"
+    
+    conversation_id, created = await user_sessions.get_or_create(user_identifier, new_conversation_id)
+    if created:
+        logger.info("🆕 [SESSION] Created new conversation: %s for user: %s", conversation_id, user_identifier)
     else:
-        conversation_id = user_sessions[user_identifier]
-        print(f"🔄 [SESSION] Using existing conversation: {conversation_id} for user: {user_identifier}")
+        logger.info("🔄 [SESSION] Using existing conversation: %s for user: %s", conversation_id, user_identifier)
     
     return conversation_id
 
+async def assign_conversation_id(request: ChatRequest, http_request: Request) -> ChatRequest:
+    """Attach the caller's conversation ID to the request, creating one if needed"""
+    # Generate user identifier and conversation ID
+    user_identifier = generate_user_identifier(http_request)
+    
+    # If no conversationId provided, create one
+    if not request.conversationId:
+        conversation_id = await get_or_create_conversation_id(user_identifier)
+        # Attach the conversation ID without re-validating the already-parsed request
+        request = request.model_copy(update={"conversationId": conversation_id})
+        logger.info("🆔 [SESSION] Assigned conversation ID: %s to user: %s", conversation_id, user_identifier)
+    else:
+        # User provided conversationId - validate it belongs to them
+        conversation_id = request.conversationId
+        known_conversation_id = await user_sessions.get(user_identifier)
+        if known_conversation_id is not None and known_conversation_id != conversation_id:
+            logger.warning("⚠️ [SESSION] User %s trying to use different conversation ID: %s", user_identifier, conversation_id)
+            # For security, we could reject this, but for now just log it
+    
+    return request
+
+async def record_chat_turn(request: ChatRequest, response: ChatResponse) -> None:
+    """Queue a finished chat turn for the batched chat_history write (no-op without DATABASE_URL)"""
+    if database is None:
+        return
+    try:
+        await database.buffer_user_data(request.conversationId, {
+            "user_message": request.message,
+            "bot_response": response.answerAI or "",
+            "intent": response.type,
+            "platform": request.platform.value,
+            "device": request.device.value,
+            "language": request.language.value
+        })
+    except Exception as e:
+        logger.warning("⚠️ Failed to record chat history: %s", e)
+
+def json_body(adapter: TypeAdapter) -> Callable[[Request], Awaitable[Any]]:
+    """
+    Dependency validating the raw request body with a prebuilt TypeAdapter
+    (JSON bytes -> model in one pydantic-core pass, no intermediate dict)
+    """
+    async def parse(request: Request) -> Any:
+        body = await request.body()
+        try:
+            return adapter.validate_json(body)
+        except ValidationError:
+            # Rejected bodies take FastAPI's own path (json.loads, then validation of
+            # the parsed value) so the 422 payload matches declared body models exactly
+            return _validate_body_like_fastapi(adapter, body)
+    return parse
+
+def _validate_body_like_fastapi(adapter: TypeAdapter, body: bytes) -> Any:
+    """Parse and validate a body the way FastAPI does for a declared model, raising its 422 errors"""
+    if not body:
+        missing = ValidationError.from_exception_data("body", [{"type": "missing", "loc": (), "input": None}])
+        raise RequestValidationError([{**error, "loc": ("body",)} for error in missing.errors()])
+    try:
+        data = json.loads(body)
+    except json.JSONDecodeError as e:
+        raise RequestValidationError(
+            [{"type": "json_invalid", "loc": ("body", e.pos), "msg": "JSON decode error", "input": {}, "ctx": {"error": e.msg}}],
+            body=e.doc
+        ) from e
+    try:
+        return adapter.validate_python(data, from_attributes=True)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors()], body=data
+        ) from e
+
+def openapi_body(model: Type[BaseModel]) -> Dict[str, Any]:
+    """OpenAPI request body for routes that read the body through json_body"""
+    schema = model.model_json_schema()
+    definitions = schema.pop("$defs", {})
+    
+    def inline(node: Any) -> Any:
+        # "#/$defs/..." refs don't resolve inside an OpenAPI document, so embed the (enum) definitions
+        if isinstance(node, dict):
+            ref = node.get("$ref", "")
+            if ref.startswith("#/$defs/"):
+                return inline(definitions[ref.rsplit("/", 1)[1]])
+            return {key: inline(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [inline(value) for value in node]
+        return node
+    
+    return {
+        "requestBody": {
+            "content": {"application/json": {"schema": inline(schema)}},
+            "required": True
+        }
+    }
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Application lifespan manager"""
-    global ai_orchestrator, email_service, keyword_analyzer
+    """
+    Application lifespan manager.
+    
+    Runs in every worker process (after the fork under gunicorn --preload), so it owns
+    everything that cannot be shared across processes: DB pools, Redis and HTTP clients,
+    and the agents holding them. Immutable import-time state (templates, prebuilt response
+    bodies, the session cookie secret, imported libraries) is built once in the parent
+    and shared copy-on-write.
+    """
+    global ai_orchestrator, email_service, keyword_analyzer, database, user_sessions
     
     # Initialize services
-    print("🚀 Initializing TripC.AI Chatbot API...")
+    logger.info("🚀 Initializing TripC.AI Chatbot API...")
     
     # Initialize PgVector store
     vector_store = PgVectorStore()
     await vector_store.initialize()
-    print("✅ PgVector store initialized")
+    logger.info("✅ PgVector store initialized")
+    
+    # PostgreSQL store for chat history; its connection pool opens on the first write
+    database_url = os.getenv("DATABASE_URL")
+    if database_url:
+        database = PostgreSQL(database_url)
+        logger.info("✅ PostgreSQL chat history store configured")
+    
+    # Share user sessions across workers/instances through Redis when configured
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        try:
+            redis_sessions = RedisSessionStore.from_url(redis_url)
+            await redis_sessions.ping()
+            user_sessions = redis_sessions
+            logger.info("✅ Redis session store initialized")
+        except Exception as e:
+            logger.warning("⚠️ Redis unavailable, keeping user sessions in process: %s", e)
     
     # Initialize TripC API client
     tripc_client = TripCAPIClient(
         base_url=os.getenv("TRIPC_API_BASE_URL", "https://api.tripc.ai"),
         access_token=os.getenv("TRIPC_API_TOKEN")
     )
-    print("✅ TripC API client initialized")
+    logger.info("✅ TripC API client initialized")
     
     # Initialize LLM client
-    base_llm_client = OpenAIClient()  # Automatically loads from .env
+    base_llm_client = LLMClientPool.from_env()  # Automatically loads from .env
     llm_client = RateLimitedLLMClient(base_llm_client)
-    print("✅ LLM client initialized with rate limiting")
+    logger.info("✅ LLM client initialized with rate limiting")
     
     # Initialize email service (needed for conversational booking)
-    email_service = EmailService()
-    print("✅ Email service initialized")
+    email_service = EmailService.get_default()
+    logger.info("✅ Email service initialized")
 
     # Initialize agents
     qna_agent = QnAAgent(vector_store, llm_client)  # Pass rate-limited client
     service_agent = ServiceAgent(tripc_client, llm_client)  # Pass rate-limited client
-    print("✅ AI agents initialized")
+    logger.info("✅ AI agents initialized")
     
     # Initialize AI Agent Orchestrator (LangGraph-based) with EmailService
     ai_orchestrator = AIAgentOrchestrator(qna_agent, service_agent, llm_client, email_service)  # Pass rate-limited client
-    print("✅ AI Agent Orchestrator (LangGraph-based) initialized")
+    logger.info("✅ AI Agent Orchestrator (LangGraph-based) initialized")
     
     # Initialize Keyword Analyzer
     keyword_analyzer = KeywordAnalyzer(llm_client, tripc_client)
-    print("✅ Keyword Analyzer initialized")
+    logger.info("✅ Keyword Analyzer initialized")
     
-    print("🎉 TripC.AI Chatbot API ready!")
+    logger.info("🎉 TripC.AI Chatbot API ready!")
     
     yield
     
     # Cleanup
-    print("🔄 Shutting down TripC.AI Chatbot API...")
+    logger.info("🔄 Shutting down TripC.AI Chatbot API...")
+    await ai_orchestrator.aclose()
+    await keyword_analyzer.aclose()
+    await llm_client.aclose()
+    await tripc_client.aclose()
+    await email_service.aclose()
+    if database:
+        await database.close_connection()
+    await user_sessions.aclose()
 
 # Create FastAPI app
 app = FastAPI(
     title="TripC.AI Chatbot API",
     description="Platform-aware AI chatbot for TripC ecosystem with app-first architecture using LangGraph",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -129,34 +393,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Signed session cookie for anonymous web users; set SESSION_SECRET so cookies stay valid across workers and restarts
+app.add_middleware(SessionCookieMiddleware, secret=os.getenv("SESSION_SECRET") or secrets.token_hex(32))
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
-    return {
-        "service": "TripC.AI Chatbot API",
-        "version": "1.0.0",
-        "description": "Platform-aware AI chatbot with app-first architecture using LangGraph",
-        "endpoints": {
-            "chatbot": "/api/v1/chatbot/response",
-            "user_info": "/api/v1/user/collect-info",
-            "status": "/api/v1/status",
-            "vector_stats": "/api/v1/vector/stats",
-            "docs": "/docs"
-        },
-        "architecture": "LangGraph-based workflow with platform-aware routing"
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": utc_timestamp(),
         "service": "TripC.AI Chatbot API"
     }
 
-@app.post("/api/v1/chatbot/response", response_model=ChatResponse)
-async def chatbot_response(request: ChatRequest, http_request: Request):
+@app.post("/api/v1/chatbot/response", response_model=ChatResponse, openapi_extra=openapi_body(ChatRequest))
+async def chatbot_response(http_request: Request, request: ChatRequest = Depends(json_body(ChatRequestAdapter))):
     """
     Main chatbot endpoint with platform-aware processing using LangGraph workflow
     """
@@ -167,49 +422,51 @@ async def chatbot_response(request: ChatRequest, http_request: Request):
                 detail="Chatbot service not initialized"
             )
         
-        # Generate user identifier and conversation ID
-        user_identifier = generate_user_identifier(http_request)
-        
-        # If no conversationId provided, create one
-        if not request.conversationId:
-            conversation_id = get_or_create_conversation_id(user_identifier)
-            # Create new request with conversation ID
-            request_dict = request.dict()
-            request_dict["conversationId"] = conversation_id
-            request = ChatRequest(**request_dict)
-            print(f"🆔 [SESSION] Assigned conversation ID: {conversation_id} to user: {user_identifier}")
-        else:
-            # User provided conversationId - validate it belongs to them
-            conversation_id = request.conversationId
-            if user_identifier in user_sessions and user_sessions[user_identifier] != conversation_id:
-                print(f"⚠️ [SESSION] User {user_identifier} trying to use different conversation ID: {conversation_id}")
-                # For security, we could reject this, but for now just log it
+        request = await assign_conversation_id(request, http_request)
         
-        # Process request through AI Agent Orchestrator (LangGraph-based)
+        # Process request through AI Agent Orchestrator (LangGraph-based), serialized once with orjson
         response = await ai_orchestrator.process_request(request)
+        await record_chat_turn(request, response)
+        # Serialized once, straight from the model
+        body = _dump_json(response)
         
-        return response
+        return Response(content=body, media_type="application/json")
         
     except Exception as e:
         # Log error for debugging
-        print(f"Error in chatbot response: {str(e)}")
+        logger.error("Error in chatbot response: %s", e)
         
         # Return error response
-        return ChatResponse(
-            type="Error",
-            answerAI="Xin lỗi, đã xảy ra lỗi hệ thống. Vui lòng thử lại sau.",
-            sources=[],
-            suggestions=[
-                {
-                    "label": "Thử lại",
-                    "action": "retry",
-                    "data": {}
-                }
-            ]
-        )
+        return Response(content=_CHATBOT_ERROR_BODY, media_type="application/json")
 
-@app.post("/api/v1/user/collect-info", response_model=UserInfoResponse)
-async def collect_user_info(request: UserInfoRequest):
+@app.post("/api/v1/chatbot/response/stream", openapi_extra=openapi_body(ChatRequest))
+async def chatbot_response_stream(http_request: Request, request: ChatRequest = Depends(json_body(ChatRequestAdapter))):
+    """
+    Streaming chatbot endpoint: NDJSON events (intent, answer, service, cta)
+    followed by a final "done" event carrying the complete ChatResponse
+    """
+    if not ai_orchestrator:
+        return Response(content=_CHATBOT_ERROR_BODY, media_type="application/json")
+    
+    request = await assign_conversation_id(request, http_request)
+    return StreamingResponse(
+        ai_orchestrator.process_request_stream(request, on_response=partial(record_chat_turn, request)),
+        media_type="application/x-ndjson"
+    )
+
+async def send_booking_emails(request: UserInfoRequest) -> None:
+    """Send the booking inquiry and the user's confirmation email concurrently, logging failures"""
+    inquiry_sent, confirmation_sent = await asyncio.gather(
+        email_service.send_booking_inquiry(request),
+        email_service.send_confirmation_email(request),
+        return_exceptions=True
+    )
+    for label, sent in (("booking inquiry", inquiry_sent), ("confirmation", confirmation_sent)):
+        if isinstance(sent, Exception):
+            logger.warning("⚠️ [EMAIL] Failed to send %s email: %s", label, sent)
+
+@app.post("/api/v1/user/collect-info", response_model=UserInfoResponse, openapi_extra=openapi_body(UserInfoRequest))
+async def collect_user_info(background_tasks: BackgroundTasks, request: UserInfoRequest = Depends(json_body(UserInfoRequestAdapter))):
     """
     Collect user information for booking workflow
     """
@@ -221,23 +478,17 @@ async def collect_user_info(request: UserInfoRequest):
             )
         
         # Generate booking reference
-        booking_reference = f"TRIPC-{uuid.uuid4().hex[:8].upper()}"
+        booking_reference = f"TRIPC-{secrets.token_hex(4).upper()}"
         
-        # Send booking inquiry email
-        inquiry_sent = await email_service.send_booking_inquiry(request)
-        
-        # Send confirmation email to user
-        confirmation_sent = await email_service.send_confirmation_email(request)
+        # Send the emails after the response is returned so SMTP latency doesn't reach the client
+        background_tasks.add_task(send_booking_emails, request)
         
         # Prepare response message based on language
-        if getattr(request.language, "value", request.language) == "vi":
-            message = f"Thông tin của bạn đã được ghi nhận. Mã tham chiếu: {booking_reference}. Chúng tôi sẽ liên hệ lại trong thời gian sớm nhất."
-        else:
-            message = f"Your information has been recorded. Reference: {booking_reference}. We will contact you as soon as possible."
+        language = "vi" if getattr(request.language, "value", request.language) == "vi" else "en"
         
         return UserInfoResponse(
             status="success",
-            message=message,
+            message=_USER_INFO_SUCCESS_MESSAGES[language].format(ref=booking_reference),
             action="info_collected",
             booking_reference=booking_reference,
             success=True
@@ -245,17 +496,14 @@ async def collect_user_info(request: UserInfoRequest):
         
     except Exception as e:
         # Log error for debugging
-        print(f"Error in user info collection: {str(e)}")
+        logger.error("Error in user info collection: %s", e)
         
         # Return error response
-        if getattr(request.language, "value", request.language) == "vi":
-            error_message = "Có lỗi xảy ra. Vui lòng thử lại sau hoặc liên hệ hotline: 1900 1234"
-        else:
-            error_message = "An error occurred. Please try again later or contact our hotline."
+        language = "vi" if getattr(request.language, "value", request.language) == "vi" else "en"
         
         return UserInfoResponse(
             status="error",
-            message=error_message,
+            message=_USER_INFO_ERROR_MESSAGES[language],
             action="try_again",
             booking_reference=None,
             success=False
@@ -264,46 +512,27 @@ async def collect_user_info(request: UserInfoRequest):
 @app.get("/api/v1/status")
 async def get_status():
     """Get system status and configuration"""
-    return {
-        "status": "operational",
-        "service": "TripC.AI Chatbot API",
-        "version": "1.0.0",
-        "timestamp": datetime.utcnow().isoformat(),
-        "architecture": "Platform-Aware App-First",
-        "email_service": {
-            "configured": email_service.smtp_configured if email_service else False,
-            "booking_email": os.getenv("BOOKING_EMAIL", "booking@tripc.ai")
-        },
-        "vector_store": {
-            "initialized": True,  # Mock implementation
-            "type": "PgVector (Mock)"
-        }
-    }
+    payload = _status_payload(bool(email_service and email_service.smtp_configured)).copy()
+    payload["timestamp"] = utc_timestamp()
+    return Response(content=orjson.dumps(payload), media_type="application/json")
 
 @app.get("/api/v1/vector/stats")
 async def get_vector_stats():
     """Get vector store statistics"""
-    return {
-        "total_embeddings": 150,
-        "categories": {
-            "travel_guides": 50,
-            "food_culture": 40,
-            "attractions": 30,
-            "local_tips": 30
-        },
-        "cities": {
-            "danang": 60,
-            "hoian": 50,
-            "hue": 40
-        },
-        "last_updated": datetime.utcnow().isoformat()
-    }
+    return Response(content=_VECTOR_STATS_BODY, media_type="application/json")
 
-@app.post("/api/v1/restaurants/search-with-analysis")
-async def search_restaurants_with_analysis(request: Dict[str, Any]):
-    """
-    Tìm kiếm nhà hàng với phân tích từ khóa và product_type_id
-    """
+def _require_query(request: KeywordQueryRequest) -> str:
+    """The non-empty query of a keyword request body"""
+    user_query = request.query
+    if not user_query:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Query is required"
+        )
+    return user_query
+
+async def _keyword_analyzer_call(operation: str, run: Callable[[KeywordAnalyzer], Awaitable[Any]]) -> Dict[str, Any]:
+    """Run a KeywordAnalyzer operation with the shared availability check, success envelope and error handling"""
     try:
         if not keyword_analyzer:
             raise HTTPException(
@@ -311,143 +540,61 @@ async def search_restaurants_with_analysis(request: Dict[str, Any]):
                 detail="Keyword analyzer service not initialized"
             )
         
-        user_query = request.get("query", "")
-        page = request.get("page", 1)
-        page_size = request.get("page_size", 15)
-        
-        if not user_query:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Query is required"
-            )
-        
-        # Sử dụng KeywordAnalyzer để tìm kiếm
-        result = await keyword_analyzer.search_restaurants_with_analysis(
-            user_query=user_query,
-            page=page,
-            page_size=page_size
-        )
-        
         return {
             "status": "success",
-            "data": result,
-            "timestamp": datetime.utcnow().isoformat()
+            "data": await run(keyword_analyzer),
+            "timestamp": utc_timestamp()
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in restaurant search with analysis: {str(e)}")
+        logger.error("Error in %s: %s", operation, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal server error: {str(e)}"
         )
 
+@app.post("/api/v1/restaurants/search-with-analysis")
+async def search_restaurants_with_analysis(request: KeywordQueryRequest):
+    """
+    Tìm kiếm nhà hàng với phân tích từ khóa và product_type_id
+    """
+    return await _keyword_analyzer_call(
+        "restaurant search with analysis",
+        lambda analyzer: analyzer.search_restaurants_with_analysis(
+            user_query=_require_query(request),
+            page=request.page,
+            page_size=request.page_size
+        )
+    )
+
 @app.post("/api/v1/keywords/analyze")
-async def analyze_keywords(request: Dict[str, Any]):
+async def analyze_keywords(request: KeywordQueryRequest):
     """
     Phân tích từ khóa từ câu hỏi người dùng
     """
-    try:
-        if not keyword_analyzer:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Keyword analyzer service not initialized"
-            )
-        
-        user_query = request.get("query", "")
-        
-        if not user_query:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Query is required"
-            )
-        
-        # Phân tích từ khóa
-        analysis_result = await keyword_analyzer.process_user_query(user_query)
-        
-        return {
-            "status": "success",
-            "data": analysis_result,
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Error in keyword analysis: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Internal server error: {str(e)}"
-        )
+    return await _keyword_analyzer_call(
+        "keyword analysis",
+        lambda analyzer: analyzer.process_user_query(_require_query(request))
+    )
 
 @app.post("/api/v1/keywords/debug")
-async def debug_keywords(request: Dict[str, Any]):
+async def debug_keywords(request: KeywordQueryRequest):
     """
     Debug từ khóa và product type matching
     """
-    try:
-        if not keyword_analyzer:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Keyword analyzer service not initialized"
-            )
-        
-        user_query = request.get("query", "")
-        
-        if not user_query:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Query is required"
-            )
-        
-        # Debug matching
-        debug_result = await keyword_analyzer.debug_matching(user_query)
-        
-        return {
-            "status": "success",
-            "data": debug_result,
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Error in keyword debug: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Internal server error: {str(e)}"
-        )
+    return await _keyword_analyzer_call(
+        "keyword debug",
+        lambda analyzer: analyzer.debug_matching(_require_query(request))
+    )
 
 @app.get("/api/v1/test/province-ids")
 async def test_province_ids():
     """
     Test các province_id để tìm province_id đúng cho Đà Nẵng
     """
-    try:
-        if not keyword_analyzer:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Keyword analyzer service not initialized"
-            )
-        
-        # Test province IDs
-        test_result = await keyword_analyzer.test_province_ids()
-        
-        return {
-            "status": "success",
-            "data": test_result,
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Error in province ID test: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Internal server error: {str(e)}"
-        )
+    return await _keyword_analyzer_call("province ID test", lambda analyzer: analyzer.test_province_ids())
 
 @app.get("/api/v1/session/stats")
 async def session_stats():
@@ -463,9 +610,10 @@ async def session_stats():
         memory_stats = ai_orchestrator.memory.get_session_stats()
         
         # Get user session info
+        users = await user_sessions.users()
         session_info = {
-            "total_user_sessions": len(user_sessions),
-            "user_sessions": list(user_sessions.keys()),
+            "total_user_sessions": len(users),
+            "user_sessions": users,
             "memory_stats": memory_stats
         }
         
@@ -491,10 +639,7 @@ async def clear_session(conversation_id: str):
         ai_orchestrator.memory.clear_session(conversation_id)
         
         # Remove from user sessions if exists
-        for user_id, conv_id in list(user_sessions.items()):
-            if conv_id == conversation_id:
-                del user_sessions[user_id]
-                break
+        await user_sessions.remove_conversation(conversation_id)
         
         return {"status": "success", "message": f"Session {conversation_id} cleared"}
         
@@ -515,17 +660,15 @@ async def clear_all_sessions():
             )
         
         # Clear all sessions from memory
-        active_sessions = ai_orchestrator.memory.get_active_sessions()
-        for conv_id in active_sessions:
-            ai_orchestrator.memory.clear_session(conv_id)
+        cleared = ai_orchestrator.memory.clear_all()
         
         # Clear user sessions
-        user_sessions.clear()
+        await user_sessions.clear()
         
         return {
             "status": "success", 
-            "message": f"Cleared {len(active_sessions)} sessions",
-            "cleared_sessions": len(active_sessions)
+            "message": f"Cleared {cleared} sessions",
+            "cleared_sessions": cleared
         }
         
     except Exception as e:
@@ -536,4 +679,11 @@ async def clear_all_sessions():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Worker count comes from WEB_CONCURRENCY (one process per core); conversation memory is
+    # per process, so run several workers only behind sticky routing or with one per instance
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    # uvloop/httptools ship with uvicorn[standard]; uvloop is unavailable on Windows
+    import importlib.util
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    uvicorn.run("src.app.main:app", host="0.0.0.0", port=8000, workers=workers, loop=loop, http=http)
\ No newline at end of file
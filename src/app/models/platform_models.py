@@ -1,6 +1,7 @@
 from enum import Enum
+from functools import cached_property
 from typing import Optional, List
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
 
 class PlatformType(str, Enum):
@@ -22,27 +23,42 @@ class LanguageType(str, Enum):
     ENGLISH = "en"
 
 
+MOBILE_DEVICES = frozenset({DeviceType.ANDROID, DeviceType.IOS})
+
+# (platform, device) combinations that cannot occur; web browsers on mobile devices are valid
+_INVALID_PLATFORM_DEVICES = frozenset({(PlatformType.MOBILE_APP, DeviceType.DESKTOP)})
+
+_DEEPLINK_PREFIX = "tripc://"
+
+
 class PlatformContext(BaseModel):
     """Platform context for request handling"""
+    # Frozen: instances are shared across requests by get_platform_context
+    model_config = ConfigDict(frozen=True)
+
     platform: PlatformType
     device: DeviceType
     language: LanguageType
     
-    @validator('platform', 'device')
-    def validate_platform_device_compatibility(cls, v, values):
-        """Validate platform and device compatibility"""
-        if 'platform' in values:
-            platform = values['platform']
-            device = v if 'device' not in values else values['device']
-            
-            if platform == PlatformType.MOBILE_APP and device == DeviceType.DESKTOP:
-                raise ValueError("Mobile app platform cannot be used with desktop device")
-            
-            if platform == PlatformType.WEB_BROWSER and device in [DeviceType.ANDROID, DeviceType.IOS]:
-                # Web browser on mobile devices is valid
-                pass
-                
-        return v
+    # Derived flags, computed once per context (contexts are shared, see get_platform_context)
+    @cached_property
+    def is_mobile(self) -> bool:
+        return self.device in MOBILE_DEVICES
+    
+    @cached_property
+    def is_web(self) -> bool:
+        return self.platform == PlatformType.WEB_BROWSER
+    
+    @cached_property
+    def is_app(self) -> bool:
+        return self.platform == PlatformType.MOBILE_APP
+    
+    @model_validator(mode="after")
+    def validate_platform_device_compatibility(self) -> "PlatformContext":
+        """Validate platform and device compatibility (once per model, after field parsing)"""
+        if (self.platform, self.device) in _INVALID_PLATFORM_DEVICES:
+            raise ValueError("Mobile app platform cannot be used with desktop device")
+        return self
 
 
 class CTAResponse(BaseModel):
@@ -52,25 +68,35 @@ class CTAResponse(BaseModel):
     url: Optional[str] = None
     deeplink: Optional[str] = None
     
-    @validator('deeplink')
+    @field_validator('deeplink')
+    @classmethod
     def validate_deeplink_format(cls, v):
         """Validate deeplink format for mobile app"""
-        if v and not v.startswith('tripc://'):
+        if v and not v.startswith(_DEEPLINK_PREFIX):
             raise ValueError("Deeplink must start with 'tripc://'")
         return v
 
 
+# App store / download URLs used by web CTAs
+ANDROID_STORE_URL = "https://play.google.com/store/apps/details?id=com.tripc.ai.app"
+IOS_STORE_URL = "https://apps.apple.com/vn/app/tripc-app/id6745506417"
+GENERAL_DOWNLOAD_URL = "https://tripc.ai/mobileapp"
+
+
 class AppStoreURLs:
-    """App store URLs for different platforms"""
+    """App store URLs for different platforms (kept for compatibility; prefer the module constants)"""
+    ANDROID = ANDROID_STORE_URL
+    IOS = IOS_STORE_URL
+    GENERAL = GENERAL_DOWNLOAD_URL
     
     @staticmethod
     def get_android_store_url() -> str:
-        return "https://play.google.com/store/apps/details?id=com.tripc.ai.app"
+        return ANDROID_STORE_URL
     
     @staticmethod
     def get_ios_store_url() -> str:
-        return "https://apps.apple.com/vn/app/tripc-app/id6745506417"
+        return IOS_STORE_URL
     
     @staticmethod
     def get_general_download_url() -> str:
-        return "https://tripc.ai/mobileapp"
\ No newline at end of file
+        return GENERAL_DOWNLOAD_URL
@@ -1,5 +1,5 @@
-from typing import Optional, List, Union, Dict
-from pydantic import BaseModel, Field
+from typing import Any, Optional, List, Union, Dict
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from .platform_models import PlatformType, DeviceType, LanguageType
 
 
@@ -25,6 +25,9 @@ class ChatRequest(BaseModel):
 
 class Source(BaseModel):
     """Source information for responses"""
+    # Response parts are never mutated once built; frozen models skip the assignment machinery
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     title: str
     url: str
     imageUrl: Optional[str] = None
@@ -32,6 +35,8 @@ class Source(BaseModel):
 
 class Suggestion(BaseModel):
     """Suggestion for user actions"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     label: str
     detail: Optional[str] = None
     action: str
@@ -39,6 +44,8 @@ class Suggestion(BaseModel):
 
 class Service(BaseModel):
     """Service information (restaurant, tour, etc.) - App-first policy, no individual URLs"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     id: int
     name: str
     type: str
@@ -69,13 +76,17 @@ class Service(BaseModel):
     # sealImageUrl is included for culinary passport suppliers
 
 
+# Validates a whole list of service rows with one prebuilt validator
+ServiceListAdapter = TypeAdapter(List[Service])
+
+
 class QnAResponse(BaseModel):
     """QnA response with embedded sources"""
     type: str = "QnA"
     answerAI: str
     sources: List[Source]
     suggestions: List[Suggestion]
-    cta: Optional[dict] = None
+    cta: Optional[Dict[str, Any]] = None
 
 
 class ServiceResponse(BaseModel):
@@ -85,7 +96,7 @@ class ServiceResponse(BaseModel):
     services: List[Service]
     sources: List[Source]
     suggestions: List[Suggestion]
-    cta: Optional[dict] = None
+    cta: Optional[Dict[str, Any]] = None
 
 
 class ChatResponse(BaseModel):
@@ -95,7 +106,7 @@ class ChatResponse(BaseModel):
     services: Optional[List[Service]] = None
     sources: Optional[List[Source]] = None
     suggestions: Optional[List[Suggestion]] = None
-    cta: Optional[dict] = None
+    cta: Optional[Dict[str, Any]] = None
 
 
 class UserInfoRequest(BaseModel):
@@ -111,6 +122,11 @@ class UserInfoRequest(BaseModel):
     device: DeviceType = Field(DeviceType.ANDROID, description="Device context")
     language: LanguageType = Field(LanguageType.VIETNAMESE, description="Language context")
     
+    @classmethod
+    def from_trusted(cls, **fields) -> "UserInfoRequest":
+        """Build from already-typed internal data without re-running validation (use model_validate for client input)"""
+        return cls.model_construct(**fields)
+    
     class Config:
         json_schema_extra = {
             "example": {
@@ -127,6 +143,13 @@ class UserInfoRequest(BaseModel):
         }
 
 
+class KeywordQueryRequest(BaseModel):
+    """Keyword analysis / restaurant search request"""
+    query: str = Field("", description="User query to analyze")
+    page: int = Field(1, description="Result page (restaurant search)")
+    page_size: int = Field(15, description="Results per page (restaurant search)")
+
+
 class UserInfoResponse(BaseModel):
     """Response after collecting user info"""
     status: str
@@ -134,4 +157,9 @@ class UserInfoResponse(BaseModel):
     action: Optional[str] = None
     booking_reference: Optional[str] = None
     # Backward compatibility
-    success: Optional[bool] = None
\ No newline at end of file
+    success: Optional[bool] = None
+
+
+# Prebuilt validators for the hot request bodies, parsed straight from the raw JSON bytes
+ChatRequestAdapter = TypeAdapter(ChatRequest)
+UserInfoRequestAdapter = TypeAdapter(UserInfoRequest)
@@ -1,16 +1,162 @@
+import asyncio
+import html
 import smtplib
+import threading
+import email.policy
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
 from ..models.schemas import UserInfoRequest
+from ..models.platform_models import LanguageType
 import logging
 import os
 
 logger = logging.getLogger(__name__)
 
+# Localized subjects and bodies keyed by LanguageType; user-supplied values are HTML-escaped before formatting
+_BOOKING_SUBJECTS = {
+    LanguageType.VIETNAMESE: "Đặt chỗ mới - {name}",
+    LanguageType.ENGLISH: "New Booking Request - {name}"
+}
+_CONFIRMATION_SUBJECTS = {
+    LanguageType.VIETNAMESE: "Xác nhận đặt chỗ - TripC",
+    LanguageType.ENGLISH: "Booking Confirmation - TripC"
+}
+
+_OPTIONAL_LINE = "<p><strong>{label}:</strong> {value}</p>"
+_OPTIONAL_LABELS = {
+    LanguageType.VIETNAMESE: {"service_interest": "Dịch vụ quan tâm", "location": "Địa điểm", "user_id": "User ID"},
+    LanguageType.ENGLISH: {"service_interest": "Service Interest", "location": "Location", "user_id": "User ID"}
+}
+
+_BOOKING_TEMPLATES = {
+    LanguageType.VIETNAMESE: """
+            <html>
+            <body>
+                <h2>Yêu cầu đặt chỗ mới</h2>
+                <p><strong>Tên khách hàng:</strong> {name}</p>
+                <p><strong>Email:</strong> {email}</p>
+                <p><strong>Số điện thoại:</strong> {phone}</p>
+                {service_interest_line}
+                {location_line}
+                <p><strong>Nội dung yêu cầu:</strong></p>
+                <p>{message}</p>
+                {user_id_line}
+                <p><strong>Platform:</strong> {platform}</p>
+                <p><strong>Device:</strong> {device}</p>
+                <p><strong>Ngôn ngữ:</strong> {language}</p>
+                <hr>
+                <p><em>Email này được gửi tự động từ TripC.AI Chatbot</em></p>
+            </body>
+            </html>
+            """,
+    LanguageType.ENGLISH: """
+            <html>
+            <body>
+                <h2>New Booking Request</h2>
+                <p><strong>Customer Name:</strong> {name}</p>
+                <p><strong>Email:</strong> {email}</p>
+                <p><strong>Phone:</strong> {phone}</p>
+                {service_interest_line}
+                {location_line}
+                <p><strong>Request Details:</strong></p>
+                <p>{message}</p>
+                {user_id_line}
+                <p><strong>Platform:</strong> {platform}</p>
+                <p><strong>Device:</strong> {device}</p>
+                <p><strong>Language:</strong> {language}</p>
+                <hr>
+                <p><em>This email was sent automatically from TripC.AI Chatbot</em></p>
+            </body>
+            </html>
+            """
+}
+
+_CONFIRMATION_TEMPLATES = {
+    LanguageType.VIETNAMESE: """
+            <html>
+            <body>
+                <h2>Xác nhận yêu cầu đặt chỗ</h2>
+                <p>Xin chào {name},</p>
+                <p>Cảm ơn bạn đã gửi yêu cầu đặt chỗ qua TripC.AI Chatbot.</p>
+                <p><strong>Chi tiết yêu cầu:</strong></p>
+                <p>{message}</p>
+                {service_interest_line}
+                {location_line}
+                <p>Đội ngũ của chúng tôi sẽ liên hệ với bạn trong thời gian sớm nhất để xác nhận và hoàn tất việc đặt chỗ.</p>
+                <p>Nếu bạn có bất kỳ câu hỏi nào, vui lòng liên hệ với chúng tôi qua email: {booking_email}</p>
+                <br>
+                <p>Trân trọng,</p>
+                <p>Đội ngũ TripC</p>
+                <hr>
+                <p><em>Email này được gửi tự động từ TripC.AI Chatbot</em></p>
+            </body>
+            </html>
+            """,
+    LanguageType.ENGLISH: """
+            <html>
+            <body>
+                <h2>Booking Request Confirmation</h2>
+                <p>Hello {name},</p>
+                <p>Thank you for submitting your booking request through TripC.AI Chatbot.</p>
+                <p><strong>Request Details:</strong></p>
+                <p>{message}</p>
+                {service_interest_line}
+                {location_line}
+                <p>Our team will contact you as soon as possible to confirm and complete your booking.</p>
+                <p>If you have any questions, please contact us at: {booking_email}</p>
+                <br>
+                <p>Best regards,</p>
+                <p>TripC Team</p>
+                <hr>
+                <p><em>This email was sent automatically from TripC.AI Chatbot</em></p>
+            </body>
+            </html>
+            """
+}
+
+_TEMPLATES = {"booking": _BOOKING_TEMPLATES, "confirmation": _CONFIRMATION_TEMPLATES}
+
+# Rendered bodies are memoized (retries and repeated sends of the same booking); longer messages bypass the cache
+RENDER_CACHE_SIZE = 512
+MAX_CACHED_MESSAGE_LENGTH = 2000
+
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _render_email_body(kind: str, booking_email: str, language: LanguageType, name: str, email: str, phone: str,
+                       message: Optional[str], service_interest: Optional[str], location: Optional[str],
+                       user_id: Optional[str], platform: str, device: str) -> str:
+    """Fill a body template with HTML-escaped values; optional lines are rendered only when set"""
+    labels = _OPTIONAL_LABELS[language]
+    fields = {
+        "name": html.escape(name or ""),
+        "email": html.escape(email or ""),
+        "phone": html.escape(phone or ""),
+        "message": html.escape(message or ""),
+        "platform": platform,
+        "device": device,
+        "language": language.value,
+        "booking_email": booking_email
+    }
+    for key, value in (("service_interest", service_interest), ("location", location), ("user_id", user_id)):
+        fields[f"{key}_line"] = _OPTIONAL_LINE.format(label=labels[key], value=html.escape(str(value))) if value else ""
+    return _TEMPLATES[kind][language].format_map(fields)
+
+# Authenticated SMTP connections kept open between sends (one per concurrent send is enough)
+SMTP_POOL_SIZE = 2
+
 
 class EmailService:
     """Email service for booking workflow"""
+    _default: Optional["EmailService"] = None
+    
+    @classmethod
+    def get_default(cls) -> "EmailService":
+        """Shared service configured from the environment, created on first use (one SMTP pool per process)"""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
     
     def __init__(self):
         # Email configuration
@@ -23,18 +169,25 @@ class EmailService:
         
         # Check if SMTP is configured
         self.smtp_configured = bool(self.smtp_username and self.smtp_password)
+        self._disabled_reason: Optional[str] = None
+        if not self.smtp_configured:
+            # Warn once here; send_* then return False without building anything
+            self._disabled_reason = "SMTP_USERNAME/SMTP_PASSWORD not set"
+            logger.warning("SMTP not configured (%s), booking emails will be skipped", self._disabled_reason)
+        
+        # Idle, logged-in connections reused across sends (skips TCP + STARTTLS + AUTH per email)
+        self._idle_connections: List[smtplib.SMTP] = []
+        self._pool_lock = threading.Lock()
     
     async def send_booking_inquiry(self, user_info: UserInfoRequest) -> bool:
         """Send booking inquiry email to booking@tripc.ai"""
+        if not self.smtp_configured:
+            logger.debug("Skipping booking inquiry email: %s", self._disabled_reason)
+            return False
+        
         try:
-            if not self.smtp_configured:
-                logger.warning("SMTP not configured, skipping email send")
-                return False
-            
             # Create email content
-            subject = f"Đặt chỗ mới - {user_info.name}"
-            if user_info.language.value == "en":
-                subject = f"New Booking Request - {user_info.name}"
+            subject = _BOOKING_SUBJECTS[user_info.language].format(name=user_info.name)
             
             # Create email body
             body = self._create_booking_email_body(user_info)
@@ -59,15 +212,13 @@ class EmailService:
     
     async def send_confirmation_email(self, user_info: UserInfoRequest) -> bool:
         """Send confirmation email to user"""
+        if not self.smtp_configured:
+            logger.debug("Skipping confirmation email: %s", self._disabled_reason)
+            return False
+        
         try:
-            if not self.smtp_configured:
-                logger.warning("SMTP not configured, skipping confirmation email")
-                return False
-            
             # Create confirmation email content
-            subject = "Xác nhận đặt chỗ - TripC"
-            if user_info.language.value == "en":
-                subject = "Booking Confirmation - TripC"
+            subject = _CONFIRMATION_SUBJECTS[user_info.language]
             
             body = self._create_confirmation_email_body(user_info)
             
@@ -89,125 +240,45 @@ class EmailService:
             logger.error(f"Error sending confirmation email: {e}")
             return False
     
+    @staticmethod
+    def _render_key(user_info: UserInfoRequest) -> Tuple[Any, ...]:
+        """The user fields an email body depends on, as a hashable render-cache key"""
+        return (
+            user_info.language, user_info.name, user_info.email, user_info.phone, user_info.message,
+            getattr(user_info, "service_interest", None), getattr(user_info, "location", None),
+            getattr(user_info, "user_id", None), user_info.platform.value, user_info.device.value
+        )
+    
+    def _render(self, kind: str, user_info: UserInfoRequest) -> str:
+        key = self._render_key(user_info)
+        # Don't let unusually long free-text messages occupy the render cache
+        render = _render_email_body if len(user_info.message or "") <= MAX_CACHED_MESSAGE_LENGTH else _render_email_body.__wrapped__
+        return render(kind, self.booking_email, *key)
+    
     def _create_booking_email_body(self, user_info: UserInfoRequest) -> str:
         """Create booking inquiry email body"""
-        language = user_info.language.value
-        
-        if language == "vi":
-            body = f"""
-            <html>
-            <body>
-                <h2>Yêu cầu đặt chỗ mới</h2>
-                <p><strong>Tên khách hàng:</strong> {user_info.name}</p>
-                <p><strong>Email:</strong> {user_info.email}</p>
-                <p><strong>Số điện thoại:</strong> {user_info.phone}</p>
-                {f"<p><strong>Dịch vụ quan tâm:</strong> {user_info.service_interest}</p>" if getattr(user_info, 'service_interest', None) else ''}
-                {f"<p><strong>Địa điểm:</strong> {user_info.location}</p>" if getattr(user_info, 'location', None) else ''}
-                <p><strong>Nội dung yêu cầu:</strong></p>
-                <p>{user_info.message or ''}</p>
-                {f"<p><strong>User ID:</strong> {user_info.user_id}</p>" if getattr(user_info, 'user_id', None) else ''}
-                <p><strong>Platform:</strong> {user_info.platform.value}</p>
-                <p><strong>Device:</strong> {user_info.device.value}</p>
-                <p><strong>Ngôn ngữ:</strong> {user_info.language.value}</p>
-                <hr>
-                <p><em>Email này được gửi tự động từ TripC.AI Chatbot</em></p>
-            </body>
-            </html>
-            """
-        else:
-            body = f"""
-            <html>
-            <body>
-                <h2>New Booking Request</h2>
-                <p><strong>Customer Name:</strong> {user_info.name}</p>
-                <p><strong>Email:</strong> {user_info.email}</p>
-                <p><strong>Phone:</strong> {user_info.phone}</p>
-                {f"<p><strong>Service Interest:</strong> {user_info.service_interest}</p>" if getattr(user_info, 'service_interest', None) else ''}
-                {f"<p><strong>Location:</strong> {user_info.location}</p>" if getattr(user_info, 'location', None) else ''}
-                <p><strong>Request Details:</strong></p>
-                <p>{user_info.message or ''}</p>
-                {f"<p><strong>User ID:</strong> {user_info.user_id}</p>" if getattr(user_info, 'user_id', None) else ''}
-                <p><strong>Platform:</strong> {user_info.platform.value}</p>
-                <p><strong>Device:</strong> {user_info.device.value}</p>
-                <p><strong>Language:</strong> {user_info.language.value}</p>
-                <hr>
-                <p><em>This email was sent automatically from TripC.AI Chatbot</em></p>
-            </body>
-            </html>
-            """
-        
-        return body
+        return self._render("booking", user_info)
     
     def _create_confirmation_email_body(self, user_info: UserInfoRequest) -> str:
         """Create confirmation email body"""
-        language = user_info.language.value
-        
-        if language == "vi":
-            body = f"""
-            <html>
-            <body>
-                <h2>Xác nhận yêu cầu đặt chỗ</h2>
-                <p>Xin chào {user_info.name},</p>
-                <p>Cảm ơn bạn đã gửi yêu cầu đặt chỗ qua TripC.AI Chatbot.</p>
-                <p><strong>Chi tiết yêu cầu:</strong></p>
-                <p>{user_info.message or ''}</p>
-                {f"<p><strong>Dịch vụ quan tâm:</strong> {user_info.service_interest}</p>" if getattr(user_info, 'service_interest', None) else ''}
-                {f"<p><strong>Địa điểm:</strong> {user_info.location}</p>" if getattr(user_info, 'location', None) else ''}
-                <p>Đội ngũ của chúng tôi sẽ liên hệ với bạn trong thời gian sớm nhất để xác nhận và hoàn tất việc đặt chỗ.</p>
-                <p>Nếu bạn có bất kỳ câu hỏi nào, vui lòng liên hệ với chúng tôi qua email: {self.booking_email}</p>
-                <br>
-                <p>Trân trọng,</p>
-                <p>Đội ngũ TripC</p>
-                <hr>
-                <p><em>Email này được gửi tự động từ TripC.AI Chatbot</em></p>
-            </body>
-            </html>
-            """
-        else:
-            body = f"""
-            <html>
-            <body>
-                <h2>Booking Request Confirmation</h2>
-                <p>Hello {user_info.name},</p>
-                <p>Thank you for submitting your booking request through TripC.AI Chatbot.</p>
-                <p><strong>Request Details:</strong></p>
-                <p>{user_info.message or ''}</p>
-                {f"<p><strong>Service Interest:</strong> {user_info.service_interest}</p>" if getattr(user_info, 'service_interest', None) else ''}
-                {f"<p><strong>Location:</strong> {user_info.location}</p>" if getattr(user_info, 'location', None) else ''}
-                <p>Our team will contact you as soon as possible to confirm and complete your booking.</p>
-                <p>If you have any questions, please contact us at: {self.booking_email}</p>
-                <br>
-                <p>Best regards,</p>
-                <p>TripC Team</p>
-                <hr>
-                <p><em>This email was sent automatically from TripC.AI Chatbot</em></p>
-            </body>
-            </html>
-            """
-        
-        return body
+        return self._render("confirmation", user_info)
     
     async def _send_email(self, to_email: str, subject: str, body: str) -> bool:
         """Send email using SMTP"""
         try:
             # Create message
-            msg = MIMEMultipart('alternative')
+            msg = MIMEMultipart('alternative', policy=email.policy.SMTP)
             msg['From'] = self.from_email
             msg['To'] = to_email
             msg['Subject'] = subject
             
             # Add HTML body
-            html_part = MIMEText(body, 'html')
+            html_part = MIMEText(body, 'html', policy=email.policy.SMTP)
             msg.attach(html_part)
             
-            # Connect to SMTP server
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
-                
-                # Send email
-                text = msg.as_string()
-                server.sendmail(self.from_email, to_email, text)
+            # SMTP is blocking, so deliver off the event loop (lets concurrent sends overlap)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._deliver, to_email, msg)
             
             return True
             
@@ -215,6 +286,61 @@ class EmailService:
             logger.error(f"Error sending email: {e}")
             return False
     
+    def _connect(self) -> smtplib.SMTP:
+        """Open an SMTP connection with STARTTLS and login"""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=30)
+        try:
+            server.starttls()
+            server.login(self.smtp_username, self.smtp_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    def _acquire_connection(self) -> smtplib.SMTP:
+        with self._pool_lock:
+            if self._idle_connections:
+                return self._idle_connections.pop()
+        return self._connect()
+    
+    def _release_connection(self, server: smtplib.SMTP) -> None:
+        with self._pool_lock:
+            if len(self._idle_connections) < SMTP_POOL_SIZE:
+                self._idle_connections.append(server)
+                return
+        self._discard_connection(server)
+    
+    @staticmethod
+    def _discard_connection(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+    
+    def _deliver(self, to_email: str, msg: MIMEMultipart) -> None:
+        """Send a rendered message over a pooled SMTP connection"""
+        server = self._acquire_connection()
+        try:
+            try:
+                server.send_message(msg, from_addr=self.from_email, to_addrs=[to_email])
+            except smtplib.SMTPServerDisconnected:
+                # The server dropped the idle connection: retry once on a fresh one
+                server.close()
+                server = self._connect()
+                server.send_message(msg, from_addr=self.from_email, to_addrs=[to_email])
+        except Exception:
+            self._discard_connection(server)
+            raise
+        self._release_connection(server)
+    
+    async def aclose(self) -> None:
+        """Log out of and close the idle SMTP connections"""
+        with self._pool_lock:
+            connections, self._idle_connections = self._idle_connections, []
+        loop = asyncio.get_running_loop()
+        for server in connections:
+            await loop.run_in_executor(None, self._discard_connection, server)
+    
     def is_smtp_configured(self) -> bool:
         """Check if SMTP is properly configured"""
         return self.smtp_configured
@@ -1,11 +1,220 @@
+import asyncio
 import json
 import logging
-from typing import Dict, List, Optional, Any
+import os
+import re
+import tempfile
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Any, Sequence, Tuple
+
+import orjson
+
+from ..core.micro_batcher import MicroBatcher
+from ..core.response_cache import normalize_query
+from ..core.semantic_cache import SemanticCache
 from ..llm.open_client import OpenAIClient
+from ..vector.pgvector_store import get_embedding
 from .tripc_api import TripCAPIClient
 
 logger = logging.getLogger(__name__)
 
+_KEYWORD_KINDS = ("proper_nouns", "adjectives", "common_nouns")
+
+# Product type list persisted across restarts (seconds; 0 disables the file)
+PRODUCT_TYPES_CACHE_PATH = Path(os.getenv("PRODUCT_TYPES_CACHE_PATH", Path(tempfile.gettempdir()) / "tripc_product_types.json"))
+PRODUCT_TYPES_CACHE_TTL = float(os.getenv("PRODUCT_TYPES_CACHE_TTL", "86400"))
+
+# Product types sent to the LLM per prompt after the lexical prefilter
+MAX_PRODUCT_TYPE_CANDIDATES = 20
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+_JSON_DECODER = json.JSONDecoder()
+
+# OpenAI JSON mode: the answer is exactly one JSON object (the prompts mention JSON, as the API requires)
+_JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+# Product type names too broad to pick a type on their own; queries containing only these go to the LLM
+_GENERIC_PRODUCT_TYPE_NAMES = frozenset({"nhà hàng", "quán ăn", "ẩm thực", "restaurant", "food"})
+
+# Prompt pieces. Static instructions come first and the product types / query last, so repeated
+# calls share a byte-identical prefix that OpenAI's automatic prompt caching can reuse
+_KEYWORD_RULES = """Hãy phân loại từ khóa theo:
+1. Danh từ riêng (Proper nouns): Tên địa điểm, tên món ăn cụ thể, tên nhà hàng
+2. Tính từ (Adjectives): Mô tả đặc điểm, phong cách, cảm giác
+3. Danh từ chung (Common nouns): Loại món ăn, loại nhà hàng, địa điểm chung
+
+QUY TẮC PHÂN TÍCH:
+- Nếu có "hàn quốc" → common_nouns: ["hàn quốc", "nhà hàng"]
+- Nếu có "chả cá" → common_nouns: ["chả cá", "nhà hàng"]
+- Nếu có "bbq" → common_nouns: ["bbq", "nhà hàng"]
+- Nếu có "hải sản" → common_nouns: ["hải sản", "nhà hàng"]
+- Địa điểm như "Đà Nẵng", "Hà Nội" → proper_nouns
+- Tính từ như "ngon", "đẹp", "rẻ" → adjectives"""
+
+_MATCHING_RULES = """QUY TẮC CHỌN:
+1. Chỉ chọn product_type_id có tên hoặc mô tả liên quan trực tiếp đến từ khóa
+2. Nếu tìm "hàn quốc" thì chọn product_type có tên "Hàn Quốc", "Korean", "BBQ Hàn Quốc"
+3. Nếu tìm "chả cá" thì chọn product_type có tên "Chả cá", "Cá", "Hải sản"
+4. Không chọn product_type không liên quan
+5. Ưu tiên chính xác hơn là nhiều kết quả"""
+
+_ANALYZE_KEYWORDS_PREFIX = f"""Phân tích câu hỏi ở cuối và trích xuất các từ khóa quan trọng để tìm nhà hàng.
+
+{_KEYWORD_RULES}
+
+Trả về JSON:
+{{
+    "proper_nouns": ["từ1", "từ2"],
+    "adjectives": ["từ1", "từ2"],
+    "common_nouns": ["từ1", "từ2"]
+}}
+
+Chỉ trả về JSON, không có text khác.
+
+"""
+
+_MATCH_PRODUCT_TYPES_PREFIX = f"""Bạn là chuyên gia phân loại nhà hàng. Dựa trên từ khóa người dùng tìm kiếm (ở cuối), hãy chọn product_type_id phù hợp nhất từ danh sách.
+
+{_MATCHING_RULES}
+
+Trả về JSON:
+{{
+    "matching_ids": [id1, id2],
+    "reasoning": "Giải thích tại sao chọn các ID này"
+}}
+
+Chỉ trả về JSON, không có text khác.
+
+Danh sách product types có sẵn:
+"""
+
+_ANALYZE_AND_MATCH_PREFIX = f"""Bạn là chuyên gia phân loại nhà hàng. Phân tích câu hỏi ở cuối, trích xuất các từ khóa quan trọng để tìm nhà hàng,
+rồi chọn product_type_id phù hợp nhất từ danh sách.
+
+{_KEYWORD_RULES}
+
+{_MATCHING_RULES}
+
+Trả về JSON:
+{{
+    "proper_nouns": ["từ1", "từ2"],
+    "adjectives": ["từ1", "từ2"],
+    "common_nouns": ["từ1", "từ2"],
+    "matching_ids": [id1, id2],
+    "reasoning": "Giải thích tại sao chọn các ID này"
+}}
+
+Chỉ trả về JSON, không có text khác.
+
+Danh sách product types có sẵn:
+"""
+
+_ANALYZE_AND_MATCH_BATCH_PREFIX = f"""Bạn là chuyên gia phân loại nhà hàng. Với TỪNG câu hỏi được đánh số ở cuối, trích xuất các từ khóa quan trọng để tìm nhà hàng,
+rồi chọn product_type_id phù hợp nhất từ danh sách. Mỗi câu hỏi được xử lý độc lập.
+
+{_KEYWORD_RULES}
+
+{_MATCHING_RULES}
+
+Trả về JSON, mỗi câu hỏi đúng một phần tử trong "results":
+{{
+    "results": [
+        {{
+            "query_idx": 1,
+            "proper_nouns": ["từ1", "từ2"],
+            "adjectives": ["từ1", "từ2"],
+            "common_nouns": ["từ1", "từ2"],
+            "matching_ids": [id1, id2],
+            "reasoning": "Giải thích tại sao chọn các ID này"
+        }}
+    ]
+}}
+
+Chỉ trả về JSON, không có text khác.
+
+Danh sách product types có sẵn:
+"""
+
+# Restaurants outside Đà Nẵng are dropped from search results
+_DANANG_RE = re.compile(r"đà\s*nẵng|danang", re.IGNORECASE)
+
+# Upper bound on restaurant list requests one search keeps in flight against the TripC API
+MAX_CONCURRENT_RESTAURANT_FETCHES = 8
+
+# Concurrent keyword analyses are grouped into one LLM call per batch window
+MATCH_BATCH_SIZE = 8
+MATCH_BATCH_WINDOW = 0.05  # seconds
+
+
+async def _embed_query(text: str) -> Sequence[float]:
+    # The OpenAI embeddings call is blocking; keep it off the event loop
+    return await asyncio.to_thread(get_embedding, text)
+
+
+def _lexical_tokens(text: str) -> FrozenSet[str]:
+    """Syllables and adjacent syllable pairs of text, without diacritics ("Hàn Quốc" -> han, quoc, "han quoc")"""
+    folded = unicodedata.normalize("NFD", text.replace("đ", "d").replace("Đ", "D"))
+    words = _WORD_PATTERN.findall("".join(ch for ch in folded if not unicodedata.combining(ch)).casefold())
+    return frozenset(words + [f"{first} {second}" for first, second in zip(words, words[1:])])
+
+
+def _product_type_json(product_type: Dict[str, Any]) -> str:
+    """One product type as it appears inside the indented JSON list of a prompt"""
+    return orjson.dumps(product_type, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode().replace("\n", "\n  ")
+
+
+def _product_type_tokens(product_type: Dict[str, Any]) -> FrozenSet[str]:
+    text = " ".join(str(product_type.get(field) or "") for field in ("name", "slug", "description"))
+    return _lexical_tokens(text.replace("-", " "))
+
+
+def _compile_name_matcher(ids: Sequence[Any], names: Sequence[str]) -> Tuple[Optional["re.Pattern[str]"], Dict[str, List[int]]]:
+    """
+    One precompiled alternation over the normalized product type names (longest first, whole words only)
+    and the IDs each name maps to; the pattern is None when no name is specific enough to match on
+    """
+    ids_by_name: Dict[str, List[int]] = {}
+    for product_type_id, name in zip(ids, names):
+        if product_type_id is None or len(name) < 3 or name in _GENERIC_PRODUCT_TYPE_NAMES:
+            continue
+        ids_by_name.setdefault(name, []).append(product_type_id)
+    
+    if not ids_by_name:
+        return None, ids_by_name
+    alternation = "|".join(re.escape(name) for name in sorted(ids_by_name, key=len, reverse=True))
+    return re.compile(rf"(?<!\w)(?:{alternation})(?!\w)"), ids_by_name
+
+
+def _is_danang(restaurant: Any) -> bool:
+    """Restaurant city or address mentions Đà Nẵng (one regex scan per restaurant)"""
+    return _DANANG_RE.search(f"{restaurant.city or ''} {restaurant.address or ''}") is not None
+
+
+def _extract_first_json(text: str) -> Optional[Any]:
+    """
+    The JSON object starting at the first "{" of an LLM answer, or None when there is none.
+    Raises json.JSONDecodeError when the object is malformed. In JSON mode the answer is the
+    object itself; the fallback covers OpenAI-compatible backends that ignore response_format.
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+    try:
+        # Usual case: the answer is just the object (possibly followed by whitespace)
+        return orjson.loads(text[start:])
+    except orjson.JSONDecodeError:
+        # Trailing prose or code fences: decode exactly one object and ignore the rest
+        return _JSON_DECODER.raw_decode(text, start)[0]
+
+
+def _has_keywords(result: Dict[str, Any]) -> bool:
+    """Analysis found at least one keyword (failed analyses come back with every list empty)"""
+    return any(result.get(kind) for kind in _KEYWORD_KINDS)
+
+
 class KeywordAnalyzer:
     """Service để phân tích từ khóa và tìm product_type_id phù hợp"""
     
@@ -13,72 +222,164 @@ class KeywordAnalyzer:
         self.llm_client = llm_client
         self.tripc_client = tripc_client
         self.product_types_cache = None
+        # Concurrent first callers share one fetch
+        self._pt_lock = asyncio.Lock()
+        self._pt_path = PRODUCT_TYPES_CACHE_PATH
+        # Per-type data precomputed once per product type list, as parallel lists indexed by position:
+        # ID, normalized name, prefilter token set and prompt JSON snippet
+        self._pt_ids: List[Any] = []
+        self._pt_name_lc: List[str] = []
+        self._pt_tokens: List[FrozenSet[str]] = []
+        self._pt_json: List[str] = []
+        self._product_type_index_source: Optional[List[Dict[str, Any]]] = None
+        # The whole list as prompt JSON, sent when the prefilter finds no candidates
+        self._product_types_str = "[]"
+        # Exact product type names in the query map straight to IDs without asking the LLM
+        self._product_type_pattern: Optional["re.Pattern[str]"] = None
+        self._product_type_ids_by_name: Dict[str, List[int]] = {}
+        # Analyses for repeated / near-identical queries, skipping the LLM round-trip
+        self._kw_cache = SemanticCache(_embed_query)
+        self._match_cache = SemanticCache(_embed_query)
+        # Concurrent analyze_and_match calls share one LLM call per batch window
+        self._match_batcher = MicroBatcher(self._analyze_and_match_batch, MATCH_BATCH_SIZE, MATCH_BATCH_WINDOW)
+    
+    async def aclose(self) -> None:
+        """Dừng worker gom lô phân tích"""
+        await self._match_batcher.aclose()
     
     async def get_all_product_types(self) -> List[Dict[str, Any]]:
-        """Lấy tất cả product types từ API và cache lại"""
-        if self.product_types_cache is None:
-            try:
-                url = f"{self.tripc_client.base_url}/api/services/product-type/all"
-                response = await self.tripc_client.client.get(
-                    url, 
-                    headers=self.tripc_client._get_headers()
-                )
-                response.raise_for_status()
-                data = response.json()
-                self.product_types_cache = data.get("data", [])
-                logger.info(f"Loaded {len(self.product_types_cache)} product types")
-            except Exception as e:
-                logger.error(f"Error loading product types: {e}")
-                self.product_types_cache = []
+        """Lấy tất cả product types (từ file cache nếu còn hạn, nếu không thì từ API) và cache lại"""
+        if self.product_types_cache is not None:
+            return self.product_types_cache
+        
+        async with self._pt_lock:
+            # Một lời gọi khác có thể đã tải xong trong lúc chờ lock
+            if self.product_types_cache is None:
+                product_types = await asyncio.to_thread(self._load_product_types_file)
+                if product_types is None:
+                    product_types = await self._fetch_product_types()
+                self._index_product_types(product_types)
+                self.product_types_cache = product_types
         
         return self.product_types_cache
     
-    def analyze_keywords(self, user_query: str) -> Dict[str, List[str]]:
-        """Phân tích từ khóa từ câu hỏi người dùng sử dụng LLM"""
+    async def _fetch_product_types(self) -> List[Dict[str, Any]]:
+        """Tải product types từ API và lưu ra file cache"""
+        try:
+            url = f"{self.tripc_client.base_url}/api/services/product-type/all"
+            response = await self.tripc_client.client.get(
+                url, 
+                headers=self.tripc_client._get_headers()
+            )
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+            product_types = data.get("data", [])
+            logger.info(f"Loaded {len(product_types)} product types")
+        except Exception as e:
+            logger.error(f"Error loading product types: {e}")
+            return []
         
-        prompt = f"""
-        Phân tích câu hỏi sau và trích xuất các từ khóa quan trọng để tìm nhà hàng:
-
-        Câu hỏi: "{user_query}"
-
-        Hãy phân loại từ khóa theo:
-        1. Danh từ riêng (Proper nouns): Tên địa điểm, tên món ăn cụ thể, tên nhà hàng
-        2. Tính từ (Adjectives): Mô tả đặc điểm, phong cách, cảm giác
-        3. Danh từ chung (Common nouns): Loại món ăn, loại nhà hàng, địa điểm chung
-
-        QUY TẮC PHÂN TÍCH:
-        - Nếu có "hàn quốc" → common_nouns: ["hàn quốc", "nhà hàng"]
-        - Nếu có "chả cá" → common_nouns: ["chả cá", "nhà hàng"]
-        - Nếu có "bbq" → common_nouns: ["bbq", "nhà hàng"]
-        - Nếu có "hải sản" → common_nouns: ["hải sản", "nhà hàng"]
-        - Địa điểm như "Đà Nẵng", "Hà Nội" → proper_nouns
-        - Tính từ như "ngon", "đẹp", "rẻ" → adjectives
-
-        Trả về JSON:
-        {{
-            "proper_nouns": ["từ1", "từ2"],
-            "adjectives": ["từ1", "từ2"], 
-            "common_nouns": ["từ1", "từ2"]
-        }}
-
-        Chỉ trả về JSON, không có text khác.
-        """
+        await asyncio.to_thread(self._save_product_types_file, product_types)
+        return product_types
+    
+    def _load_product_types_file(self) -> Optional[List[Dict[str, Any]]]:
+        """Product types từ file cache, hoặc None nếu không có, hết hạn hoặc hỏng"""
+        if PRODUCT_TYPES_CACHE_TTL <= 0:
+            return None
+        try:
+            if time.time() - self._pt_path.stat().st_mtime >= PRODUCT_TYPES_CACHE_TTL:
+                return None
+            product_types = orjson.loads(self._pt_path.read_bytes())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(product_types, list):
+            return None
+        logger.info(f"Loaded {len(product_types)} product types from {self._pt_path}")
+        return product_types
+    
+    def _save_product_types_file(self, product_types: List[Dict[str, Any]]) -> None:
+        if PRODUCT_TYPES_CACHE_TTL <= 0 or not product_types:
+            return
+        try:
+            # Ghi ra file tạm rồi đổi tên để worker khác không đọc phải file ghi dở
+            tmp_path = self._pt_path.with_name(f"{self._pt_path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(orjson.dumps(product_types, option=orjson.OPT_NON_STR_KEYS))
+            os.replace(tmp_path, self._pt_path)
+        except OSError as e:
+            logger.warning(f"Could not write product types cache {self._pt_path}: {e}")
+    
+    def _index_product_types(self, product_types: List[Dict[str, Any]]) -> None:
+        """Tính trước tập từ, JSON cho prompt của từng product type và biểu thức khớp tên"""
+        self._pt_ids = [product_type.get("id") for product_type in product_types]
+        self._pt_name_lc = [normalize_query(str(product_type.get("name") or "")) for product_type in product_types]
+        self._pt_tokens = [_product_type_tokens(product_type) for product_type in product_types]
+        self._pt_json = [_product_type_json(product_type) for product_type in product_types]
+        self._product_type_pattern, self._product_type_ids_by_name = _compile_name_matcher(self._pt_ids, self._pt_name_lc)
+        self._product_types_str = orjson.dumps(product_types, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+        self._product_type_index_source = product_types
+    
+    def match_product_type_names(self, user_query: str, product_types: List[Dict[str, Any]]) -> Dict[str, List[int]]:
+        """Tên product type xuất hiện nguyên văn trong câu hỏi -> các product_type_id tương ứng"""
+        if self._product_type_index_source is not product_types:
+            self._index_product_types(product_types)
+        if self._product_type_pattern is None:
+            return {}
+        return {
+            name: self._product_type_ids_by_name[name]
+            for name in self._product_type_pattern.findall(normalize_query(user_query))
+        }
+    
+    def _candidate_positions(self, product_types: List[Dict[str, Any]], terms: Iterable[str]) -> Optional[List[int]]:
+        """Vị trí của tối đa MAX_PRODUCT_TYPE_CANDIDATES product types trùng nhiều từ nhất với terms (None nếu không có gì trùng)"""
+        if self._product_type_index_source is not product_types:
+            self._index_product_types(product_types)
+        
+        query_tokens = frozenset().union(*(_lexical_tokens(term) for term in terms))
+        scored = []
+        for position, tokens in enumerate(self._pt_tokens):
+            overlap = len(tokens & query_tokens)
+            if overlap:
+                scored.append((-overlap, position))
+        scored.sort()
+        if not scored:
+            return None
+        # Giữ thứ tự của API giữa các product types được chọn
+        return sorted(position for _, position in scored[:MAX_PRODUCT_TYPE_CANDIDATES])
+    
+    def _product_types_prompt_json(self, product_types: List[Dict[str, Any]], *term_groups: Iterable[str]) -> str:
+        """Danh sách product types ứng viên (hợp của các nhóm từ) dạng JSON (indent 2) ghép từ các đoạn đã serialize sẵn"""
+        positions = set()
+        for terms in term_groups:
+            group_positions = self._candidate_positions(product_types, terms)
+            if group_positions is None:
+                # Không lọc được: gửi cả danh sách (đã serialize sẵn khi nạp)
+                return self._product_types_str
+            positions.update(group_positions)
+        positions = sorted(positions)
+        return "[\n  " + ",\n  ".join(self._pt_json[position] for position in positions) + "\n]"
+    
+    async def analyze_keywords(self, user_query: str) -> Dict[str, List[str]]:
+        """Phân tích từ khóa từ câu hỏi người dùng sử dụng LLM (có cache theo câu hỏi tương tự)"""
+        return await self._kw_cache.get_or_compute(
+            user_query, lambda: self._analyze_keywords(user_query), cacheable=_has_keywords
+        )
+    
+    async def _analyze_keywords(self, user_query: str) -> Dict[str, List[str]]:
+        prompt = f'{_ANALYZE_KEYWORDS_PREFIX}Câu hỏi: "{user_query}"'
         
         try:
-            response = self.llm_client.generate_response_sync(
+            response = await self.llm_client.generate_response(
                 prompt=prompt,
                 model="gpt-4o-mini",
                 max_tokens=300,
-                temperature=0.3
+                temperature=0.3,
+                response_format=_JSON_RESPONSE_FORMAT
             )
             
             if response:
                 # Tìm JSON trong response
-                start_idx = response.find('{')
-                end_idx = response.rfind('}') + 1
-                if start_idx != -1 and end_idx != 0:
-                    json_str = response[start_idx:end_idx]
-                    result = json.loads(json_str)
+                result = _extract_first_json(response)
+                if result is not None:
                     logger.info(f"Analyzed keywords: {result}")
                     return result
                 else:
@@ -95,57 +396,42 @@ class KeywordAnalyzer:
             logger.error(f"Error analyzing keywords: {e}")
             return {"proper_nouns": [], "adjectives": [], "common_nouns": []}
     
-    def find_matching_product_types(self, keywords: Dict[str, List[str]], product_types: List[Dict[str, Any]]) -> List[int]:
+    async def find_matching_product_types(self, keywords: Dict[str, List[str]], product_types: List[Dict[str, Any]]) -> List[int]:
         """Tìm product_type_id phù hợp dựa trên từ khóa"""
         
         if not product_types:
             return []
         
-        # Tạo prompt để LLM tìm product_type_id phù hợp
-        product_types_str = json.dumps(product_types, ensure_ascii=False, indent=2)
+        if not _has_keywords(keywords):
+            # Không có từ khóa (thường do phân tích lỗi) thì LLM cũng không có gì để so khớp
+            logger.info("No keywords to match product types against, skipping LLM call")
+            return []
         
-        prompt = f"""
-        Bạn là chuyên gia phân loại nhà hàng. Dựa trên từ khóa người dùng tìm kiếm, hãy chọn product_type_id phù hợp nhất từ danh sách.
-
-        Từ khóa người dùng tìm kiếm:
-        - Danh từ riêng: {keywords.get('proper_nouns', [])}
-        - Tính từ: {keywords.get('adjectives', [])}
-        - Danh từ chung: {keywords.get('common_nouns', [])}
-
-        Danh sách product types có sẵn:
-        {product_types_str}
-
-        QUY TẮC CHỌN:
-        1. Chỉ chọn product_type_id có tên hoặc mô tả liên quan trực tiếp đến từ khóa
-        2. Nếu tìm "hàn quốc" thì chọn product_type có tên "Hàn Quốc", "Korean", "BBQ Hàn Quốc"
-        3. Nếu tìm "chả cá" thì chọn product_type có tên "Chả cá", "Cá", "Hải sản"
-        4. Không chọn product_type không liên quan
-        5. Ưu tiên chính xác hơn là nhiều kết quả
-
-        Trả về JSON:
-        {{
-            "matching_ids": [id1, id2],
-            "reasoning": "Giải thích tại sao chọn các ID này"
-        }}
-
-        Chỉ trả về JSON, không có text khác.
-        """
+        # Tạo prompt để LLM tìm product_type_id phù hợp, chỉ với các product types liên quan đến từ khóa
+        terms = [term for kind in _KEYWORD_KINDS for term in keywords.get(kind, [])]
+        product_types_str = self._product_types_prompt_json(product_types, terms)
+        
+        prompt = (
+            f"{_MATCH_PRODUCT_TYPES_PREFIX}{product_types_str}\n\n"
+            "Từ khóa người dùng tìm kiếm:\n"
+            f"- Danh từ riêng: {keywords.get('proper_nouns', [])}\n"
+            f"- Tính từ: {keywords.get('adjectives', [])}\n"
+            f"- Danh từ chung: {keywords.get('common_nouns', [])}"
+        )
         
         try:
-            response = self.llm_client.generate_response_sync(
+            response = await self.llm_client.generate_response(
                 prompt=prompt,
                 model="gpt-4o-mini", 
                 max_tokens=500,
-                temperature=0.3
+                temperature=0.3,
+                response_format=_JSON_RESPONSE_FORMAT
             )
             
             if response:
                 # Tìm JSON trong response
-                start_idx = response.find('{')
-                end_idx = response.rfind('}') + 1
-                if start_idx != -1 and end_idx != 0:
-                    json_str = response[start_idx:end_idx]
-                    result = json.loads(json_str)
+                result = _extract_first_json(response)
+                if result is not None:
                     matching_ids = result.get("matching_ids", [])
                     reasoning = result.get("reasoning", "")
                     logger.info(f"Found matching product type IDs: {matching_ids}, Reasoning: {reasoning}")
@@ -164,19 +450,128 @@ class KeywordAnalyzer:
             logger.error(f"Error finding matching product types: {e}")
             return []
     
+    async def analyze_and_match(self, user_query: str, product_types: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Phân tích từ khóa và chọn product_type_id trong một lần gọi LLM (thay cho analyze_keywords + find_matching_product_types)"""
+        if not product_types:
+            # Không có gì để chọn: chỉ cần phân tích từ khóa
+            keywords = await self.analyze_keywords(user_query)
+            return {"proper_nouns": [], "adjectives": [], "common_nouns": [], **keywords, "matching_ids": [], "reasoning": ""}
+        
+        return await self._match_cache.get_or_compute(
+            user_query, lambda: self._submit_for_matching(user_query, product_types), cacheable=_has_keywords
+        )
+    
+    async def _submit_for_matching(self, user_query: str, product_types: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Đưa câu hỏi vào hàng đợi phân tích theo lô và chờ kết quả"""
+        return await self._match_batcher.submit((user_query, product_types))
+    
+    async def _analyze_and_match_batch(self, items: List[Tuple[str, List[Dict[str, Any]]]]) -> List[Any]:
+        """Phân tích một lô câu hỏi bằng một lần gọi LLM; mỗi câu hỏi một kết quả (hoặc exception)"""
+        if len(items) == 1:
+            return [await self._analyze_and_match(*items[0])]
+        
+        results = await self._analyze_and_match_many([query for query, _ in items], items[0][1])
+        if results is None:
+            # Kết quả của lô không dùng được: phân tích từng câu hỏi
+            logger.warning(f"Batch of {len(items)} keyword analyses could not be parsed, analyzing individually")
+            results = await asyncio.gather(*(self._analyze_and_match(*item) for item in items), return_exceptions=True)
+        return results
+    
+    async def _analyze_and_match_many(self, user_queries: List[str], product_types: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """Phân tích nhiều câu hỏi với một prompt chung danh sách product types; None nếu câu trả lời không dùng được"""
+        empty_result = {"proper_nouns": [], "adjectives": [], "common_nouns": [], "matching_ids": [], "reasoning": ""}
+        
+        product_types_str = self._product_types_prompt_json(product_types, *([query] for query in user_queries))
+        questions = "\n".join(f'{index}. "{query}"' for index, query in enumerate(user_queries, 1))
+        prompt = f"{_ANALYZE_AND_MATCH_BATCH_PREFIX}{product_types_str}\n\nCác câu hỏi:\n{questions}"
+        
+        response = await self.llm_client.generate_response(
+            prompt=prompt,
+            model="gpt-4o-mini",
+            max_tokens=300 * len(user_queries) + 200,
+            temperature=0.3,
+            response_format=_JSON_RESPONSE_FORMAT
+        )
+        if not response:
+            return None
+        
+        try:
+            parsed = _extract_first_json(response)
+        except json.JSONDecodeError:
+            return None
+        entries = parsed.get("results") if isinstance(parsed, dict) else None
+        if not isinstance(entries, list):
+            return None
+        
+        by_index = {entry.get("query_idx"): entry for entry in entries if isinstance(entry, dict)}
+        if any(index not in by_index for index in range(1, len(user_queries) + 1)):
+            return None
+        
+        results = []
+        for index in range(1, len(user_queries) + 1):
+            fields = {key: value for key, value in by_index[index].items() if key != "query_idx"}
+            results.append({**empty_result, **fields})
+        logger.info(f"Analyzed {len(user_queries)} queries in one batch: {results}")
+        return results
+    
+    async def _analyze_and_match(self, user_query: str, product_types: List[Dict[str, Any]]) -> Dict[str, Any]:
+        empty_result = {"proper_nouns": [], "adjectives": [], "common_nouns": [], "matching_ids": [], "reasoning": ""}
+        
+        # Chưa có từ khóa trước lần gọi này nên lọc trước theo chính các từ trong câu hỏi
+        product_types_str = self._product_types_prompt_json(product_types, [user_query])
+        
+        prompt = f'{_ANALYZE_AND_MATCH_PREFIX}{product_types_str}\n\nCâu hỏi: "{user_query}"'
+        
+        try:
+            response = await self.llm_client.generate_response(
+                prompt=prompt,
+                model="gpt-4o-mini",
+                max_tokens=700,
+                temperature=0.3,
+                response_format=_JSON_RESPONSE_FORMAT
+            )
+            
+            if response:
+                # Tìm JSON trong response
+                parsed = _extract_first_json(response)
+                if parsed is not None:
+                    result = {**empty_result, **parsed}
+                    logger.info(f"Analyzed keywords and matched product type IDs: {result}")
+                    return result
+                else:
+                    logger.warning("No JSON found in LLM response for keyword analysis and matching")
+                    return empty_result
+            else:
+                logger.error("LLM response is None for keyword analysis and matching")
+                return empty_result
+                
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse JSON from LLM response for keyword analysis and matching: {e}")
+            return empty_result
+        except Exception as e:
+            logger.error(f"Error analyzing keywords and matching product types: {e}")
+            return empty_result
+    
     async def process_user_query(self, user_query: str) -> Dict[str, Any]:
         """Xử lý câu hỏi người dùng và trả về thông tin cần thiết để tìm kiếm"""
         
-        # Bước 1: Phân tích từ khóa
-        keywords = self.analyze_keywords(user_query)
-        
-        # Bước 2: Lấy tất cả product types
+        # Bước 1: Lấy tất cả product types (đã cache)
         product_types = await self.get_all_product_types()
         
-        # Bước 3: Tìm product_type_id phù hợp
-        matching_product_type_ids = self.find_matching_product_types(keywords, product_types)
+        # Bước 2: Câu hỏi chứa nguyên văn tên product type thì dùng luôn, không cần gọi LLM
+        matched_names = self.match_product_type_names(user_query, product_types)
+        if matched_names:
+            keywords = {"proper_nouns": [], "adjectives": [], "common_nouns": list(matched_names)}
+            matching_product_type_ids = list(dict.fromkeys(
+                product_type_id for ids in matched_names.values() for product_type_id in ids
+            ))
+        else:
+            # Phân tích từ khóa và tìm product_type_id phù hợp trong cùng một lần gọi LLM
+            analysis = await self.analyze_and_match(user_query, product_types)
+            keywords = {key: analysis[key] for key in _KEYWORD_KINDS}
+            matching_product_type_ids = analysis["matching_ids"]
         
-        # Bước 4: Trả về kết quả
+        # Bước 3: Trả về kết quả
         result = {
             "user_query": user_query,
             "keywords": keywords,
@@ -188,38 +583,43 @@ class KeywordAnalyzer:
         logger.info(f"Processed user query: {result}")
         return result
     
+    async def _fetch_restaurant_batches(self, queries: List[Dict[str, Any]]) -> List[Any]:
+        """Gọi get_restaurants cho từng bộ tham số song song (tối đa MAX_CONCURRENT_RESTAURANT_FETCHES cùng lúc); lỗi được trả về trong danh sách"""
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_RESTAURANT_FETCHES)
+        
+        async def fetch(query: Dict[str, Any]) -> List[Any]:
+            async with semaphore:
+                return await self.tripc_client.get_restaurants(**query)
+        
+        return await asyncio.gather(*(fetch(query) for query in queries), return_exceptions=True)
+    
     async def search_restaurants_with_analysis(self, user_query: str, page: int = 1, page_size: int = 15) -> List[Any]:
         """Tìm kiếm nhà hàng với phân tích từ khóa và product_type_id"""
         
         # Xử lý câu hỏi người dùng
         analysis_result = await self.process_user_query(user_query)
         
-        # Tìm kiếm nhà hàng chỉ với product_type_id
+        # Tìm kiếm nhà hàng chỉ với product_type_id (các product type được gọi song song)
+        product_type_ids = analysis_result["matching_product_type_ids"]
+        batches = await self._fetch_restaurant_batches([
+            {"page": page, "page_size": page_size, "product_type_id": product_type_id}
+            for product_type_id in product_type_ids
+        ])
+        
         restaurants = []
+        # Một nhà hàng có thể thuộc nhiều product type: chỉ giữ lần xuất hiện đầu tiên
+        seen_ids = set()
         
-        for product_type_id in analysis_result["matching_product_type_ids"]:
-            try:
-                restaurant_batch = await self.tripc_client.get_restaurants(
-                    page=page,
-                    page_size=page_size,
-                    product_type_id=product_type_id
-                )
-                
-                # Lọc nhà hàng chỉ ở Đà Nẵng
-                filtered_restaurants = []
-                for restaurant in restaurant_batch:
-                    # Kiểm tra xem nhà hàng có ở Đà Nẵng không
-                    if restaurant.city and "đà nẵng" in restaurant.city.lower():
-                        filtered_restaurants.append(restaurant)
-                    elif restaurant.address and "đà nẵng" in restaurant.address.lower():
-                        filtered_restaurants.append(restaurant)
-                    elif restaurant.address and "danang" in restaurant.address.lower():
-                        filtered_restaurants.append(restaurant)
-                
-                restaurants.extend(filtered_restaurants)
-                
-            except Exception as e:
-                logger.error(f"Error searching restaurants with product_type_id={product_type_id}: {e}")
+        for product_type_id, restaurant_batch in zip(product_type_ids, batches):
+            if isinstance(restaurant_batch, Exception):
+                logger.error(f"Error searching restaurants with product_type_id={product_type_id}: {restaurant_batch}")
+                continue
+            
+            # Lọc nhà hàng chỉ ở Đà Nẵng
+            for restaurant in restaurant_batch:
+                if restaurant.id not in seen_ids and _is_danang(restaurant):
+                    seen_ids.add(restaurant.id)
+                    restaurants.append(restaurant)
         
         # Sắp xếp theo rating và giới hạn tối đa 5 nhà hàng
         if restaurants:
@@ -238,50 +638,40 @@ class KeywordAnalyzer:
         """Test các province_id để tìm province_id đúng cho Đà Nẵng"""
         
         test_province_ids = [1, 2, 3, 4, 5, 47, 48, 49, 50]
+        # Test với product_type_id = 23 (Ẩm thực Hàn)
+        batches = await self._fetch_restaurant_batches([
+            {"page": 1, "page_size": 5, "product_type_id": 23, "province_id": province_id}
+            for province_id in test_province_ids
+        ])
         results = {}
         
-        for province_id in test_province_ids:
-            try:
-                # Test với product_type_id = 23 (Ẩm thực Hàn)
-                restaurant_batch = await self.tripc_client.get_restaurants(
-                    page=1,
-                    page_size=5,
-                    product_type_id=23,
-                    province_id=province_id
-                )
-                
-                # Đếm nhà hàng ở Đà Nẵng
-                danang_count = 0
-                for restaurant in restaurant_batch:
-                    if restaurant.city and "đà nẵng" in restaurant.city.lower():
-                        danang_count += 1
-                    elif restaurant.address and "đà nẵng" in restaurant.address.lower():
-                        danang_count += 1
-                    elif restaurant.address and "danang" in restaurant.address.lower():
-                        danang_count += 1
-                
-                results[province_id] = {
-                    "total": len(restaurant_batch),
-                    "danang_count": danang_count,
-                    "sample_restaurants": [r.name for r in restaurant_batch[:3]]
-                }
-                
-            except Exception as e:
-                results[province_id] = {"error": str(e)}
+        for province_id, restaurant_batch in zip(test_province_ids, batches):
+            if isinstance(restaurant_batch, Exception):
+                results[province_id] = {"error": str(restaurant_batch)}
+                continue
+            
+            # Đếm nhà hàng ở Đà Nẵng
+            danang_count = sum(1 for restaurant in restaurant_batch if _is_danang(restaurant))
+            
+            results[province_id] = {
+                "total": len(restaurant_batch),
+                "danang_count": danang_count,
+                "sample_restaurants": [r.name for r in restaurant_batch[:3]]
+            }
         
         return results
     
     async def debug_matching(self, user_query: str) -> Dict[str, Any]:
         """Debug method để kiểm tra quá trình matching"""
         
-        # Phân tích từ khóa
-        keywords = self.analyze_keywords(user_query)
-        
-        # Lấy product types
-        product_types = await self.get_all_product_types()
+        # Phân tích từ khóa và lấy product types (độc lập nên chạy song song)
+        keywords, product_types = await asyncio.gather(
+            self.analyze_keywords(user_query),
+            self.get_all_product_types()
+        )
         
         # Tìm matching
-        matching_ids = self.find_matching_product_types(keywords, product_types)
+        matching_ids = await self.find_matching_product_types(keywords, product_types)
         
         # Tìm product types được chọn
         selected_products = []
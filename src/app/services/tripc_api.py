@@ -1,19 +1,44 @@
+import asyncio
+import time
 import httpx
+import orjson
 import requests
 from typing import List, Optional, Dict, Any
-from ..models.schemas import Service, Source
+from ..models.schemas import Service, ServiceListAdapter, Source
+from ..llm.open_client import HTTP2_AVAILABLE
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Restaurant listings are fanned out per product type; bound each call and stop calling a failing upstream
+RESTAURANTS_TIMEOUT = 5.0  # seconds, whole request
+BREAKER_FAILURE_THRESHOLD = 5  # consecutive failures before the breaker opens
+BREAKER_OPEN_SECONDS = 10.0
+
 
 class TripCAPIClient:
     """Client for integrating with TripC API ecosystem"""
     
-    def __init__(self, base_url: str = "https://api.tripc.ai", access_token: Optional[str] = None):
+    def __init__(self, base_url: str = "https://api.tripc.ai", access_token: Optional[str] = None,
+                 http_client: Optional[httpx.AsyncClient] = None):
         self.base_url = base_url.rstrip('/')
         self.access_token = access_token
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # One long-lived pooled client (keep-alive, HTTP/2 when available); an injected client stays owned by the caller
+        self._owns_client = http_client is None
+        self.client = http_client or httpx.AsyncClient(
+            # Fail fast: a stalled TripC call should not hold a chat request for 30s
+            timeout=httpx.Timeout(10.0, connect=3.0),
+            # Pool settings live on the transport when one is given; retries=1 re-dials a failed connect once
+            transport=httpx.AsyncHTTPTransport(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+                retries=1
+            )
+        )
+        
+        # Circuit breaker state for get_restaurants
+        self._consecutive_failures = 0
+        self._breaker_open_until = 0.0
         
         # Auto-login if no token provided
         if not self.access_token:
@@ -28,7 +53,7 @@ class TripCAPIClient:
             }
             response = requests.post(f"{self.base_url}/auth/login", json=login_data, timeout=10)
             response.raise_for_status()
-            token = response.json().get("token")
+            token = orjson.loads(response.content).get("token")
             if token:
                 logger.info("Auto-login successful, got TripC API token")
                 return token
@@ -43,7 +68,64 @@ class TripCAPIClient:
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
+        await self.aclose()
+    
+    async def aclose(self) -> None:
+        """Close pooled HTTP connections (only when the client was created here)"""
+        if self._owns_client:
+            await self.client.aclose()
+    
+    @staticmethod
+    def _service_row(item: Dict[str, Any], service_type: str) -> Dict[str, Any]:
+        """Map a TripC API listing item to Service fields (validated for the whole list at once)"""
+        # Extract location coordinates, skipping invalid ones
+        location = None
+        if item.get("lat") and item.get("long"):
+            try:
+                location = {
+                    "lat": float(item.get("lat")),
+                    "lng": float(item.get("long"))
+                }
+            except (ValueError, TypeError):
+                location = None
+        
+        return {
+            "id": item.get("id"),
+            "name": item.get("name", ""),
+            "type": service_type,
+            # Image URLs
+            "imageUrl": item.get("logo_url"),
+            "coverImageUrl": item.get("cover_image_url"),
+            "sealImageUrl": item.get("seal_image_url"),  # Culinary passport seal
+            # Ratings & Reviews
+            "rating": item.get("rating"),
+            "totalReviews": item.get("total_reviews"),
+            # Location & Address
+            "address": item.get("full_address", item.get("address", "")),
+            "city": item.get("city", ""),
+            # Service Details
+            "productTypes": item.get("product_types", ""),
+            "description": item.get("description", ""),
+            "priceRange": item.get("price_range", ""),
+            "workingHoursDisplay": item.get("working_hours_display", ""),
+            "amenities": item.get("amenities", []),
+            # Location coordinates
+            "location": location
+        }
+    
+    def _breaker_open(self) -> bool:
+        return time.monotonic() < self._breaker_open_until
+    
+    def _record_success(self) -> None:
+        self._consecutive_failures = 0
+    
+    def _record_failure(self) -> None:
+        """Count an upstream failure (timeout, connection error, 5xx); open the breaker after too many in a row"""
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= BREAKER_FAILURE_THRESHOLD:
+            self._breaker_open_until = time.monotonic() + BREAKER_OPEN_SECONDS
+            self._consecutive_failures = 0
+            logger.warning(f"TripC restaurants API failing, skipping calls for {BREAKER_OPEN_SECONDS:.0f}s")
     
     def _get_headers(self) -> Dict[str, str]:
         """Get request headers with authentication"""
@@ -60,6 +142,9 @@ class TripCAPIClient:
                             product_type_id: Optional[int] = None, province_id: Optional[int] = None,
                             supplier_type_slug: str = "am-thuc") -> List[Service]:
         """Get restaurant services from TripC API with advanced filtering"""
+        if self._breaker_open():
+            return []
+        
         try:
             params = {
                 "page": page,
@@ -81,11 +166,18 @@ class TripCAPIClient:
                 params["supplier_type_slug"] = supplier_type_slug
             
             url = f"{self.base_url}/api/services/restaurants"
-            response = await self.client.get(url, params=params, headers=self._get_headers())
+            # wait_for bounds the whole request (httpx timeouts apply per connect/read step)
+            response = await asyncio.wait_for(
+                self.client.get(url, params=params, headers=self._get_headers()),
+                RESTAURANTS_TIMEOUT
+            )
+            if response.status_code >= 500:
+                self._record_failure()
+            else:
+                self._record_success()
             response.raise_for_status()
             
-            data = response.json()
-            restaurants = []
+            data = orjson.loads(response.content)
             
             # Handle case where data is None or doesn't have 'data' key
             data_items = data.get("data") if data else None
@@ -93,45 +185,17 @@ class TripCAPIClient:
                 logger.warning(f"No data returned from restaurants API. Response: {data}")
                 return []
             
-            for item in data_items:
-                # Extract location coordinates
-                location = None
-                if item.get("lat") and item.get("long"):
-                    location = {
-                        "lat": float(item.get("lat")),
-                        "lng": float(item.get("long"))
-                    }
-                
-                restaurant = Service(
-                    id=item.get("id"),
-                    name=item.get("name", ""),
-                    type="restaurant",
-                    # Image URLs
-                    imageUrl=item.get("logo_url"),
-                    coverImageUrl=item.get("cover_image_url"),
-                    sealImageUrl=item.get("seal_image_url"),  # Support for culinary passport seal
-                    # Ratings & Reviews
-                    rating=item.get("rating"),
-                    totalReviews=item.get("total_reviews"),
-                    # Location & Address
-                    address=item.get("full_address", item.get("address", "")),
-                    city=item.get("city", ""),
-                    # Service Details
-                    productTypes=item.get("product_types", ""),
-                    description=item.get("description", ""),
-                    priceRange=item.get("price_range", ""),
-                    workingHoursDisplay=item.get("working_hours_display", ""),
-                    amenities=item.get("amenities", []),
-                    # Location coordinates
-                    location=location
-                )
-                restaurants.append(restaurant)
+            restaurants = ServiceListAdapter.validate_python([self._service_row(item, "restaurant") for item in data_items])
             
             return restaurants
             
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error getting restaurants: {e.response.status_code}")
             return []
+        except (asyncio.TimeoutError, httpx.TransportError) as e:
+            self._record_failure()
+            logger.error(f"Error getting restaurants: {e!r}")
+            return []
         except Exception as e:
             logger.error(f"Error getting restaurants: {e}")
             return []
@@ -158,42 +222,8 @@ class TripCAPIClient:
             response = await self.client.get(url, params=params, headers=self._get_headers())
             response.raise_for_status()
             
-            data = response.json()
-            suppliers = []
-            
-            for item in data.get("data", []):
-                # Extract location coordinates
-                location = None
-                if item.get("lat") and item.get("long"):
-                    location = {
-                        "lat": float(item.get("lat")),
-                        "lng": float(item.get("long"))
-                    }
-                
-                supplier = Service(
-                    id=item.get("id"),
-                    name=item.get("name", ""),
-                    type="culinary_passport",
-                    # Image URLs
-                    imageUrl=item.get("logo_url"),
-                    coverImageUrl=item.get("cover_image_url"),
-                    sealImageUrl=item.get("seal_image_url"),  # Special seal for culinary passport
-                    # Ratings & Reviews
-                    rating=item.get("rating"),
-                    totalReviews=item.get("total_reviews"),
-                    # Location & Address
-                    address=item.get("full_address", item.get("address", "")),
-                    city=item.get("city", ""),
-                    # Service Details
-                    productTypes=item.get("product_types", ""),
-                    description=item.get("description", ""),
-                    priceRange=item.get("price_range", ""),
-                    workingHoursDisplay=item.get("working_hours_display", ""),
-                    amenities=item.get("amenities", []),
-                    # Location coordinates
-                    location=location
-                )
-                suppliers.append(supplier)
+            data = orjson.loads(response.content)
+            suppliers = ServiceListAdapter.validate_python([self._service_row(item, "culinary_passport") for item in data.get("data", [])])
             
             return suppliers
             
@@ -218,46 +248,8 @@ class TripCAPIClient:
             response = await self.client.get(url, params=params, headers=self._get_headers())
             response.raise_for_status()
             
-            data = response.json()
-            hotels = []
-            
-            for item in data.get("data", []):
-                # Extract location coordinates
-                location = None
-                if item.get("lat") and item.get("long"):
-                    try:
-                        location = {
-                            "lat": float(item.get("lat")),
-                            "lng": float(item.get("long"))
-                        }
-                    except (ValueError, TypeError):
-                        # Skip invalid coordinates
-                        location = None
-                
-                hotel = Service(
-                    id=item.get("id"),
-                    name=item.get("name", ""),
-                    type="hotel",
-                    # Image URLs
-                    imageUrl=item.get("logo_url"),
-                    coverImageUrl=item.get("cover_image_url"),
-                    sealImageUrl=item.get("seal_image_url"),
-                    # Ratings & Reviews
-                    rating=item.get("rating"),
-                    totalReviews=item.get("total_reviews"),
-                    # Location & Address
-                    address=item.get("full_address", item.get("address", "")),
-                    city=item.get("city", ""),
-                    # Service Details
-                    productTypes=item.get("product_types", ""),
-                    description=item.get("description", ""),
-                    priceRange=item.get("price_range", ""),
-                    workingHoursDisplay=item.get("working_hours_display", ""),
-                    amenities=item.get("amenities", []),
-                    # Location coordinates
-                    location=location
-                )
-                hotels.append(hotel)
+            data = orjson.loads(response.content)
+            hotels = ServiceListAdapter.validate_python([self._service_row(item, "hotel") for item in data.get("data", [])])
             
             return hotels
             
@@ -275,38 +267,9 @@ class TripCAPIClient:
             response = await self.client.get(url, headers=self._get_headers())
             response.raise_for_status()
             
-            data = response.json()
-            
-            # Extract location coordinates
-            location = None
-            if data.get("lat") and data.get("long"):
-                location = {
-                    "lat": float(data.get("lat")),
-                    "lng": float(data.get("long"))
-                }
+            data = orjson.loads(response.content)
             
-            restaurant = Service(
-                id=data.get("id"),
-                name=data.get("name", ""),
-                type="restaurant",
-                # Image URLs
-                imageUrl=data.get("logo_url"),
-                coverImageUrl=data.get("cover_image_url"),
-                # Ratings & Reviews
-                rating=data.get("rating"),
-                totalReviews=data.get("total_reviews"),
-                # Location & Address
-                address=data.get("full_address", data.get("address", "")),
-                city=data.get("city", ""),
-                # Service Details
-                productTypes=data.get("product_types", ""),
-                description=data.get("description", ""),
-                priceRange=data.get("price_range", ""),
-                workingHoursDisplay=data.get("working_hours_display", ""),
-                amenities=data.get("amenities", []),
-                # Location coordinates
-                location=location
-            )
+            restaurant = Service.model_validate(self._service_row(data, "restaurant"))
             
             return restaurant
             
@@ -324,7 +287,7 @@ class TripCAPIClient:
             response = await self.client.get(url, headers=self._get_headers())
             response.raise_for_status()
             
-            return response.json()
+            return orjson.loads(response.content)
             
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error getting seating info for {restaurant_id}: {e.response.status_code}")
@@ -375,37 +338,15 @@ class TripCAPIClient:
             response = await self.client.get(url, params=params, headers=self._get_headers())
             response.raise_for_status()
             
-            data = response.json()
-            services = []
-            
+            data = orjson.loads(response.content)
+            rows = []
             for item in data.get("data", []):
-                service = Service(
-                    id=item.get("id"),
-                    name=item.get("name", ""),
-                    type=item.get("type", service_type),
-                    # Image URLs
-                    imageUrl=item.get("logo_url"),
-                    coverImageUrl=item.get("cover_image_url"),
-                    sealImageUrl=item.get("seal_image_url"),
-                    # Ratings & Reviews
-                    rating=item.get("rating"),
-                    totalReviews=item.get("total_reviews"),
-                    # Location & Address
-                    address=item.get("full_address", item.get("address", "")),
-                    city=item.get("city", ""),
-                    lat=item.get("lat"),
-                    long=item.get("long"),
-                    # Service Details
-                    productTypes=item.get("product_types", ""),
-                    description=item.get("description", ""),
-                    priceRange=item.get("price_range", ""),
-                    workingHoursDisplay=item.get("working_hours_display", ""),
-                    amenities=item.get("amenities", []),
-                    # Additional Fields
-                    isLike=item.get("is_like"),
-                    location=item.get("location")
-                )
-                services.append(service)
+                row = self._service_row(item, item.get("type", service_type))
+                # Search results may carry a ready-made location instead of lat/long
+                if row["location"] is None:
+                    row["location"] = item.get("location")
+                rows.append(row)
+            services = ServiceListAdapter.validate_python(rows)
             
             return services
             
@@ -0,0 +1,175 @@
+# test_caches.py
+
+from app.core import response_cache, semantic_cache
+from app.core.response_cache import ResponseCache, normalize_query
+from app.core.semantic_cache import SemanticCache
+from app.core.session_cache import SessionCache
+
+
+class FakeClock:
+    """Stand-in for the time module with a manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def counter_factory():
+    ids = iter(range(1, 100))
+    return lambda: f"conv_{next(ids)}"
+
+
+async def test_session_cache_evicts_least_recently_used_user():
+    """The least recently active user is evicted together with its reverse index entry"""
+    cache = SessionCache(max_items=2)
+    factory = counter_factory()
+
+    await cache.get_or_create("alice", factory)
+    await cache.get_or_create("bob", factory)
+    await cache.get("alice")  # alice is now the most recent
+    await cache.get_or_create("carol", factory)
+
+    assert await cache.users() == ["alice", "carol"]
+    assert await cache.get("bob") is None
+    # bob's conversation ID no longer maps back to a user
+    assert await cache.remove_conversation("conv_2") is False
+
+
+async def test_session_cache_reuses_existing_conversation():
+    """A known user keeps the same conversation ID"""
+    cache = SessionCache()
+    factory = counter_factory()
+
+    first, created = await cache.get_or_create("alice", factory)
+    second, created_again = await cache.get_or_create("alice", factory)
+
+    assert (first, created) == ("conv_1", True)
+    assert (second, created_again) == ("conv_1", False)
+
+
+async def test_session_cache_remove_conversation_uses_reverse_index():
+    """Removing a conversation ID forgets the user mapped to it"""
+    cache = SessionCache()
+    factory = counter_factory()
+    await cache.get_or_create("alice", factory)
+    await cache.get_or_create("bob", factory)
+
+    assert await cache.remove_conversation("conv_1") is True
+    assert await cache.get("alice") is None
+    assert await cache.users() == ["bob"]
+    assert await cache.remove_conversation("conv_1") is False
+
+
+def test_normalize_query():
+    """Queries differing only in case, width or spacing share a cache key"""
+    assert normalize_query("  Nhà Hàng   ĐÀ NẴNG ") == normalize_query("nhà hàng đà nẵng")
+
+
+def test_response_cache_expires_entries(monkeypatch):
+    """Entries are served until the TTL elapses, then dropped"""
+    clock = FakeClock()
+    monkeypatch.setattr(response_cache, "time", clock)
+    cache = ResponseCache(max_items=10, ttl=60)
+
+    cache.put("key", "value")
+    clock.now += 59
+    assert cache.get("key") == "value"
+
+    clock.now += 1
+    assert cache.get("key") is None
+    assert cache.get_stats()["size"] == 0
+
+
+def test_response_cache_evicts_least_recently_used():
+    """The least recently read entry is evicted first"""
+    cache = ResponseCache(max_items=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_response_cache_disabled_with_zero_ttl():
+    """A zero TTL disables caching"""
+    cache = ResponseCache(max_items=10, ttl=0)
+    cache.put("key", "value")
+    assert cache.get("key") is None
+
+
+def fake_embedder(vectors):
+    async def embed(text):
+        return vectors[text]
+    return embed
+
+
+async def test_semantic_cache_serves_similar_queries():
+    """A query whose embedding is close enough to a cached one reuses its value"""
+    cache = SemanticCache(fake_embedder({
+        "quán hàn quốc": [1.0, 0.0],
+        "nhà hàng hàn quốc": [0.99, 0.05],
+        "khách sạn": [0.0, 1.0],
+    }), threshold=0.9)
+    calls = []
+
+    async def compute(value):
+        calls.append(value)
+        return value
+
+    assert await cache.get_or_compute("quán hàn quốc", lambda: compute("korean")) == "korean"
+    assert await cache.get_or_compute("nhà hàng hàn quốc", lambda: compute("other")) == "korean"
+    assert await cache.get_or_compute("khách sạn", lambda: compute("hotel")) == "hotel"
+
+    assert calls == ["korean", "hotel"]
+    assert cache.get_stats()["semantic_hits"] == 1
+
+
+async def test_semantic_cache_expires_entries(monkeypatch):
+    """Stale entries are neither served exactly nor semantically"""
+    clock = FakeClock()
+    monkeypatch.setattr(semantic_cache, "time", clock)
+    cache = SemanticCache(fake_embedder({"a": [1.0, 0.0], "a!": [1.0, 0.01]}), ttl=60)
+
+    async def compute():
+        return object()
+
+    first = await cache.get_or_compute("a", compute)
+    clock.now += 60
+    assert await cache.get_or_compute("a!", compute) is not first
+    assert await cache.get_or_compute("a", compute) is not first
+
+
+async def test_semantic_cache_skips_uncacheable_results():
+    """Results rejected by cacheable() are recomputed next time"""
+    cache = SemanticCache(fake_embedder({"q": [1.0]}))
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {}
+
+    await cache.get_or_compute("q", compute)
+    await cache.get_or_compute("q", compute)
+    assert len(calls) == 2
+
+
+async def test_semantic_cache_falls_back_to_exact_match_when_embedding_fails():
+    """Embedding errors only disable the similarity lookup"""
+    async def failing_embed(text):
+        raise RuntimeError("embedding service down")
+
+    cache = SemanticCache(failing_embed)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return "value"
+
+    await cache.get_or_compute("Query", compute)
+    assert await cache.get_or_compute("query", compute) == "value"
+    assert len(calls) == 1
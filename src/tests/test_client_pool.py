@@ -0,0 +1,57 @@
+# test_client_pool.py
+
+import asyncio
+
+import pytest
+
+from app.llm.client_pool import LLMClientPool
+
+
+class FakeLLMClient:
+    """Client double that holds each call open until released"""
+
+    def __init__(self, name, configured=True):
+        self.name = name
+        self.configured = configured
+        self.release = asyncio.Event()
+        self.calls = 0
+
+    def is_configured(self):
+        return self.configured
+
+    async def generate_response(self, prompt, **kwargs):
+        self.calls += 1
+        await self.release.wait()
+        return self.name
+
+
+def test_pool_requires_clients():
+    """An empty pool is rejected"""
+    with pytest.raises(ValueError):
+        LLMClientPool([])
+
+
+async def test_calls_go_to_least_loaded_client():
+    """Concurrent calls spread evenly and in-flight counts drop back to zero"""
+    clients = [FakeLLMClient("a"), FakeLLMClient("b")]
+    pool = LLMClientPool(clients)
+
+    tasks = [asyncio.ensure_future(pool.generate_response("hi")) for _ in range(4)]
+    await asyncio.sleep(0)
+    assert [client.calls for client in clients] == [2, 2]
+
+    for client in clients:
+        client.release.set()
+    assert sorted(await asyncio.gather(*tasks)) == ["a", "a", "b", "b"]
+    assert pool._inflight == [0, 0]
+
+
+async def test_unconfigured_clients_are_skipped():
+    """Clients without an API key only serve calls when no client is configured"""
+    clients = [FakeLLMClient("missing-key", configured=False), FakeLLMClient("ok")]
+    for client in clients:
+        client.release.set()
+    pool = LLMClientPool(clients)
+
+    assert [await pool.generate_response("hi") for _ in range(3)] == ["ok", "ok", "ok"]
+    assert pool.is_configured()
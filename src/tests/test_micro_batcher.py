@@ -0,0 +1,115 @@
+# test_micro_batcher.py
+
+import asyncio
+
+import pytest
+
+from app.core.micro_batcher import MicroBatcher
+
+
+async def test_concurrent_items_share_one_handler_call():
+    """Items submitted together are handled in one batch, each caller getting its own result"""
+    batches = []
+
+    async def handler(items):
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    batcher = MicroBatcher(handler, max_size=8, window=0.01)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+    assert results == [0, 10, 20, 30, 40]
+    assert batches == [[0, 1, 2, 3, 4]]
+    await batcher.aclose()
+
+
+async def test_batches_are_capped_at_max_size():
+    """No batch holds more than max_size items"""
+    sizes = []
+
+    async def handler(items):
+        sizes.append(len(items))
+        return items
+
+    batcher = MicroBatcher(handler, max_size=3, window=0.01)
+    assert await asyncio.gather(*(batcher.submit(i) for i in range(7))) == list(range(7))
+    assert max(sizes) == 3
+    assert sum(sizes) == 7
+    await batcher.aclose()
+
+
+async def test_items_are_grouped_by_key():
+    """group_key splits one window into separate handler calls"""
+    batches = []
+
+    async def handler(items):
+        batches.append(sorted(items))
+        return items
+
+    batcher = MicroBatcher(handler, max_size=8, window=0.01, group_key=lambda item: item[1])
+    await asyncio.gather(*(batcher.submit(item) for item in [("a", "vi"), ("b", "en"), ("c", "vi")]))
+
+    assert sorted(batches) == [[("a", "vi"), ("c", "vi")], [("b", "en")]]
+    await batcher.aclose()
+
+
+async def test_exception_result_fails_only_its_item():
+    """An exception returned for one item is raised to that caller only"""
+    async def handler(items):
+        return [ValueError(item) if item == "bad" else item.upper() for item in items]
+
+    batcher = MicroBatcher(handler, max_size=8, window=0.01)
+    results = await asyncio.gather(*(batcher.submit(item) for item in ["a", "bad", "c"]), return_exceptions=True)
+
+    assert results[0] == "A"
+    assert isinstance(results[1], ValueError)
+    assert results[2] == "C"
+    await batcher.aclose()
+
+
+async def test_handler_error_fails_the_whole_batch():
+    """An exception raised by the handler reaches every caller of that batch, and the batcher keeps working"""
+    fail = True
+
+    async def handler(items):
+        if fail:
+            raise RuntimeError("llm down")
+        return items
+
+    batcher = MicroBatcher(handler, max_size=8, window=0.01)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    fail = False
+    assert await batcher.submit(42) == 42
+    await batcher.aclose()
+
+
+async def test_wrong_result_count_fails_the_batch():
+    """A handler returning the wrong number of results cannot be demultiplexed"""
+    async def handler(items):
+        return items[:1]
+
+    batcher = MicroBatcher(handler, max_size=8, window=0.01)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(2)), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    await batcher.aclose()
+
+
+async def test_aclose_cancels_worker_and_batches_in_flight():
+    """Shutdown cancels running batches so their callers do not hang"""
+    started = asyncio.Event()
+
+    async def handler(items):
+        started.set()
+        await asyncio.sleep(60)
+        return items
+
+    batcher = MicroBatcher(handler, max_size=8, window=0.01)
+    pending = asyncio.ensure_future(batcher.submit("slow"))
+    await asyncio.wait_for(started.wait(), 1)
+
+    await batcher.aclose()
+    with pytest.raises(asyncio.CancelledError):
+        await pending
+    assert not batcher._tasks
@@ -0,0 +1,30 @@
+# test_platform_context.py
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.platform_context import get_platform_context
+from app.models.platform_models import DeviceType, LanguageType, PlatformContext, PlatformType
+
+
+def test_shared_context_is_frozen():
+    """Assigning to a field of a shared context raises instead of leaking into other requests"""
+    context = get_platform_context(PlatformType.WEB_BROWSER, DeviceType.DESKTOP, LanguageType.ENGLISH)
+
+    with pytest.raises(ValidationError):
+        context.language = LanguageType.VIETNAMESE
+    assert get_platform_context(PlatformType.WEB_BROWSER, DeviceType.DESKTOP, LanguageType.ENGLISH).language == LanguageType.ENGLISH
+
+
+def test_derived_flags_work_on_frozen_context():
+    """cached_property flags are still computed and cached on the frozen model"""
+    context = PlatformContext(platform=PlatformType.MOBILE_APP, device=DeviceType.IOS, language=LanguageType.VIETNAMESE)
+
+    assert context.is_mobile and context.is_app and not context.is_web
+    assert context.is_mobile is context.is_mobile
+
+
+def test_mobile_app_on_desktop_is_rejected():
+    """The platform/device compatibility check still runs on the frozen model"""
+    with pytest.raises(ValidationError):
+        PlatformContext(platform=PlatformType.MOBILE_APP, device=DeviceType.DESKTOP, language=LanguageType.ENGLISH)
@@ -0,0 +1,42 @@
+# test_rate_limited_client.py
+
+from app.llm.rate_limited_client import RateLimitedLLMClient
+
+
+class EchoLLMClient:
+    """Client double answering each prompt with itself and counting calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_response(self, prompt, **kwargs):
+        assert "normalize_cache_key" not in kwargs
+        self.calls += 1
+        return prompt
+
+    def is_configured(self):
+        return True
+
+
+async def test_cache_keys_are_exact_by_default():
+    """Prompts differing only in case get separate answers (e.g. extracted names and emails)"""
+    base = EchoLLMClient()
+    client = RateLimitedLLMClient(base)
+
+    assert await client.generate_response("my email is an.nguyen@x.com") == "my email is an.nguyen@x.com"
+    assert await client.generate_response("my email is An.Nguyen@X.com") == "my email is An.Nguyen@X.com"
+    assert base.calls == 2
+
+
+async def test_normalized_cache_keys_are_opt_in():
+    """Callers opting in share one cached answer across case/spacing variants"""
+    base = EchoLLMClient()
+    client = RateLimitedLLMClient(base)
+
+    first = await client.generate_response("Tìm  Nhà hàng", normalize_cache_key=True)
+    assert await client.generate_response("tìm nhà hàng", normalize_cache_key=True) == first
+    assert base.calls == 1
+
+    # Exact-key callers never receive an answer cached under a normalized key
+    assert await client.generate_response("tìm nhà hàng") == "tìm nhà hàng"
+    assert base.calls == 2
@@ -0,0 +1,124 @@
+# test_session_cookie.py
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core.session_cookie import COOKIELESS_AFTER, SESSION_COOKIE_NAME, SessionCookieMiddleware, fingerprint_session_id
+
+
+def make_client(secret="test-secret"):
+    app = FastAPI()
+    app.add_middleware(SessionCookieMiddleware, secret=secret)
+
+    @app.get("/session")
+    async def session(request: Request):
+        return {"session_id": request.state.session_id}
+
+    return TestClient(app)
+
+
+def get_without_cookie(client, user_agent="testclient"):
+    """Request from a client that does not send the session cookie back"""
+    client.cookies.clear()
+    response = client.get("/session", headers={"User-Agent": user_agent})
+    client.cookies.clear()
+    return response
+
+
+def issued_cookie(client, user_agent="testclient"):
+    response = get_without_cookie(client, user_agent)
+    return response.json()["session_id"], response.cookies[SESSION_COOKIE_NAME]
+
+
+def get_with_cookie(client, cookie, user_agent="testclient"):
+    """Request carrying exactly the given session cookie value"""
+    return client.get("/session", headers={"User-Agent": user_agent, "Cookie": f"{SESSION_COOKIE_NAME}={cookie}"})
+
+
+def test_new_client_gets_random_signed_cookie():
+    """First contact gets a random session ID, not the IP + User-Agent fingerprint, handed back signed"""
+    client = make_client()
+    response = get_without_cookie(client, "pytest")
+
+    session_id = response.json()["session_id"]
+    assert session_id != fingerprint_session_id("testclient", "pytest")
+    assert len(session_id) >= 20
+    cookie = response.cookies[SESSION_COOKIE_NAME]
+    assert cookie.startswith(session_id + ".")
+    assert "HttpOnly" in response.headers["set-cookie"]
+
+
+def test_same_ip_and_user_agent_get_different_sessions():
+    """Two browsers behind one NAT with the same User-Agent never share a session"""
+    client = make_client()
+    first, _ = issued_cookie(client, "Mozilla/5.0")
+    second, _ = issued_cookie(client, "Mozilla/5.0")
+
+    assert first != second
+
+
+def test_valid_cookie_is_reused():
+    """A correctly signed cookie keeps its session ID and is not re-issued"""
+    client = make_client()
+    session_id, cookie = issued_cookie(client)
+
+    response = get_with_cookie(client, cookie, user_agent="other-agent")
+    assert response.json()["session_id"] == session_id
+    assert "set-cookie" not in response.headers
+
+
+def test_cookieless_client_falls_back_to_fingerprint():
+    """A client that never returns its cookies ends up with a stable fingerprint session"""
+    client = make_client()
+    fingerprint = fingerprint_session_id("testclient", "curl/8.0")
+
+    issued = [get_without_cookie(client, "curl/8.0").json()["session_id"] for _ in range(COOKIELESS_AFTER)]
+    assert fingerprint not in issued
+
+    assert get_without_cookie(client, "curl/8.0").json()["session_id"] == fingerprint
+    assert get_without_cookie(client, "curl/8.0").json()["session_id"] == fingerprint
+
+
+def test_fingerprint_returning_cookies_keeps_random_ids():
+    """Once any client with a fingerprint sends a cookie back, new visitors there still get their own ID"""
+    client = make_client()
+    fingerprint = fingerprint_session_id("testclient", "Mozilla/5.0")
+    session_id, cookie = issued_cookie(client, "Mozilla/5.0")
+    get_with_cookie(client, cookie, user_agent="Mozilla/5.0")
+
+    new_ids = [get_without_cookie(client, "Mozilla/5.0").json()["session_id"] for _ in range(COOKIELESS_AFTER + 2)]
+    assert fingerprint not in new_ids
+    assert len(set(new_ids + [session_id])) == COOKIELESS_AFTER + 3
+
+
+def test_forged_cookie_is_rejected():
+    """A cookie naming another session ID without its signature is ignored and replaced"""
+    client = make_client()
+    _, cookie = issued_cookie(client)
+    _, _, signature = cookie.rpartition(".")
+
+    for forged in ("victim-session", f"victim-session.{signature}", f"victim-session.{'0' * 32}"):
+        response = get_with_cookie(client, forged)
+        assert response.json()["session_id"] != "victim-session"
+        assert "set-cookie" in response.headers
+
+
+def test_tampered_signature_is_rejected():
+    """Altering the signature of a genuine cookie invalidates it"""
+    client = make_client()
+    session_id, cookie = issued_cookie(client)
+    tampered = cookie[:-1] + ("0" if cookie[-1] != "0" else "1")
+
+    response = get_with_cookie(client, tampered)
+    assert response.json()["session_id"] != session_id
+    assert "set-cookie" in response.headers
+
+
+def test_cookie_signed_with_another_secret_is_rejected():
+    """Cookies only verify against the secret that signed them"""
+    foreign_id, foreign_cookie = issued_cookie(make_client(secret="other-secret"))
+    client = make_client()
+
+    response = get_with_cookie(client, foreign_cookie)
+    assert response.json()["session_id"] != foreign_id
+    assert "set-cookie" in response.headers
@@ -0,0 +1,112 @@
+# test_tripc_api.py
+
+import asyncio
+
+import httpx
+import orjson
+
+from app.services import tripc_api
+from app.services.tripc_api import BREAKER_FAILURE_THRESHOLD, BREAKER_OPEN_SECONDS, TripCAPIClient
+
+
+class FakeClock:
+    """Stand-in for the time module with a manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+RESTAURANTS_BODY = orjson.dumps({"data": [{"id": 1, "name": "Bếp Hàn"}]})
+
+
+def make_client(monkeypatch, responses):
+    """TripC client whose HTTP calls are answered from `responses` (status code or exception)"""
+    clock = FakeClock()
+    monkeypatch.setattr(tripc_api, "time", clock)
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        outcome = responses.pop(0) if responses else 200
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, content=RESTAURANTS_BODY if outcome == 200 else b"")
+
+    client = TripCAPIClient(access_token="test-token", http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return client, calls, clock
+
+
+async def test_successful_call_returns_restaurants(monkeypatch):
+    """A healthy upstream is called normally"""
+    client, calls, _ = make_client(monkeypatch, [200])
+    restaurants = await client.get_restaurants(product_type_id=3)
+
+    assert [service.name for service in restaurants] == ["Bếp Hàn"]
+    assert calls[0].url.params["product_type_id"] == "3"
+
+
+async def test_breaker_opens_after_consecutive_failures(monkeypatch):
+    """After the threshold of failures in a row, calls are skipped without touching the network"""
+    failures = [500 if i % 2 else httpx.ConnectError("refused") for i in range(BREAKER_FAILURE_THRESHOLD)]
+    client, calls, _ = make_client(monkeypatch, failures)
+
+    for _ in range(BREAKER_FAILURE_THRESHOLD):
+        assert await client.get_restaurants() == []
+    assert len(calls) == BREAKER_FAILURE_THRESHOLD
+
+    assert await client.get_restaurants() == []
+    assert len(calls) == BREAKER_FAILURE_THRESHOLD
+
+
+async def test_breaker_closes_after_open_period(monkeypatch):
+    """Once the open period elapses the upstream is tried again"""
+    client, calls, clock = make_client(monkeypatch, [500] * BREAKER_FAILURE_THRESHOLD)
+    for _ in range(BREAKER_FAILURE_THRESHOLD):
+        await client.get_restaurants()
+
+    clock.now += BREAKER_OPEN_SECONDS - 1
+    assert await client.get_restaurants() == []
+    assert len(calls) == BREAKER_FAILURE_THRESHOLD
+
+    clock.now += 1
+    assert len(await client.get_restaurants()) == 1
+    assert len(calls) == BREAKER_FAILURE_THRESHOLD + 1
+
+
+async def test_success_resets_failure_count(monkeypatch):
+    """Failures must be consecutive: a success in between starts the count over"""
+    responses = [500] * (BREAKER_FAILURE_THRESHOLD - 1) + [200] + [500] * (BREAKER_FAILURE_THRESHOLD - 1) + [200]
+    total = len(responses)
+    client, calls, _ = make_client(monkeypatch, responses)
+
+    for _ in range(total):
+        await client.get_restaurants()
+    assert len(calls) == total
+    assert not client._breaker_open()
+
+
+async def test_client_errors_do_not_open_breaker(monkeypatch):
+    """4xx answers come from a live upstream and are not counted as failures"""
+    client, calls, _ = make_client(monkeypatch, [404] * (BREAKER_FAILURE_THRESHOLD + 1))
+
+    for _ in range(BREAKER_FAILURE_THRESHOLD + 1):
+        assert await client.get_restaurants() == []
+    assert len(calls) == BREAKER_FAILURE_THRESHOLD + 1
+
+
+async def test_slow_calls_time_out_and_count_as_failures(monkeypatch):
+    """Calls exceeding RESTAURANTS_TIMEOUT return [] and trip the breaker"""
+    monkeypatch.setattr(tripc_api, "RESTAURANTS_TIMEOUT", 0.01)
+    monkeypatch.setattr(tripc_api, "time", FakeClock())
+
+    async def slow_handler(request):
+        await asyncio.sleep(1)
+        return httpx.Response(200, content=RESTAURANTS_BODY)
+
+    client = TripCAPIClient(access_token="test-token", http_client=httpx.AsyncClient(transport=httpx.MockTransport(slow_handler)))
+    for _ in range(BREAKER_FAILURE_THRESHOLD):
+        assert await client.get_restaurants() == []
+    assert client._breaker_open()
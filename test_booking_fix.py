@@ -3,6 +3,7 @@
 Test script để kiểm tra logic booking agent đã sửa
 """
 
+import asyncio
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
@@ -36,11 +37,11 @@ def test_booking_extraction():
         print(f"\n📝 Test {i}: '{message}'")
         
         # Test extraction
-        extracted = booking_agent._extract_booking_info(message, "vi")
+        extracted = asyncio.run(booking_agent._extract_booking_info(message, "vi"))
         print(f"   Extracted: {extracted}")
         
         # Test if it's considered "other topic"
-        is_other = booking_agent._is_asking_other_topics(message, "vi")
+        is_other = asyncio.run(booking_agent._is_asking_other_topics(message, "vi"))
         print(f"   Is other topic: {is_other}")
         
         # Test combined logic
@@ -51,7 +51,7 @@ async def test_debug_confirmation():
     print(f"\n👤 User: '{message}'")
     
     # Call LLM first to see what intent it returns
-    llm_result = booking_agent._llm_extract_and_plan(state, message, "vi")
+    llm_result = await booking_agent._llm_extract_and_plan(state, message, "vi")
     print(f"🤖 LLM Intent: {state.get('user_intent', 'unknown')}")
     print(f"🤖 LLM Action: {state.get('next_action', 'unknown')}")
     
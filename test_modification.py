@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import asyncio
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
@@ -50,7 +51,7 @@ def test_email_extraction():
     ]
     
     for email in test_emails:
-        extracted = booking_agent._extract_booking_info(email, "vi")
+        extracted = asyncio.run(booking_agent._extract_booking_info(email, "vi"))
         print(f"'{email}' -> {extracted}")
 
 if __name__ == "__main__":
@@ -3,6 +3,7 @@
 Test script để kiểm tra logic pause/continue booking
 """
 
+import asyncio
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
@@ -74,7 +75,7 @@ def test_intent_detection():
     
     for message, expected_intent in test_cases:
         state = {}
-        llm_result = booking_agent._llm_extract_and_plan(state, message, "vi")
+        llm_result = asyncio.run(booking_agent._llm_extract_and_plan(state, message, "vi"))
         detected_intent = state.get("user_intent", "unknown")
         print(f"'{message}' -> detected: {detected_intent}, expected: {expected_intent}")
 
@@ -3,6 +3,7 @@
 Test script để kiểm tra logic booking thông minh mới
 """
 
+import asyncio
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
@@ -36,11 +37,11 @@ def test_smart_extraction():
         
         # Test LLM extraction
         state = {}
-        llm_result = booking_agent._llm_extract_and_plan(state, message, "vi")
+        llm_result = asyncio.run(booking_agent._llm_extract_and_plan(state, message, "vi"))
         print(f"   LLM Result: {llm_result}")
         
         # Test simple extraction
-        simple_result = booking_agent._extract_booking_info(message, "vi")
+        simple_result = asyncio.run(booking_agent._extract_booking_info(message, "vi"))
         print(f"   Simple Result: {simple_result}")
 
 async def test_booking_flow():
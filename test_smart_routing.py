@@ -102,7 +102,7 @@ async def test_smart_routing():
         
         try:
             # Test the routing logic
-            result = orchestrator._user_wants_to_continue_booking(
+            result = await orchestrator._user_wants_to_continue_booking(
                 test_case["message"], 
                 test_case["original_intent"]
             )